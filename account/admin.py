@@ -23,7 +23,21 @@ class UserModelAdmin(BaseUserAdmin):
   filter_horizontal = ()
 
 
+class TransactionAdmin(admin.ModelAdmin):
+  list_display = ('id', 'user', 'stock', 'transaction_type', 'quantity', 'price_each', 'total_price', 'timestamp')
+  list_filter = ('transaction_type',)
+  list_select_related = ('user', 'stock')
+
+
+class HoldingAdmin(admin.ModelAdmin):
+  list_display = ('id', 'user', 'stock', 'quantity', 'cost_basis', 'updated_at')
+  list_select_related = ('user', 'stock')
+
+
 # Now register the new UserModelAdmin...
 admin.site.register(User, UserModelAdmin)
 admin.site.register(Stock)
-admin.site.register(Transaction)
\ No newline at end of file
+admin.site.register(Transaction, TransactionAdmin)
+admin.site.register(Holding, HoldingAdmin)
+admin.site.register(PriceTick)
+admin.site.register(IdempotencyKey)
\ No newline at end of file
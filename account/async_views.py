@@ -0,0 +1,165 @@
+import asyncio
+import functools
+import logging
+from abc import ABCMeta, abstractmethod
+
+from asgiref.sync import sync_to_async
+from django.db import DatabaseError
+from django.http import HttpResponse
+from django.utils.decorators import classonlymethod
+from django.views import View
+from rest_framework import status
+from rest_framework.exceptions import APIException, NotAuthenticated
+from rest_framework.request import Request
+
+from .authentication import StatelessJWTAuthentication
+from .cache import get_catalogue, get_symbol
+from .fastpath import row_builder
+from .filters import filter_stocks, filter_transactions
+from .metrics import timed
+from .models import Transaction
+from .pagination import TransactionCursorPagination
+from .renderers import dumps, has_error_detail
+from .serializers import TransactionListSerializer, TransactionSerializer
+
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncAPIView(View, metaclass=ABCMeta):
+    """
+    Read-only async counterpart of APIView for the hot list endpoints.
+
+    DRF 3.13 and Django 4.0 have no async views or async ORM, so this view
+    authenticates on the event loop with StatelessJWTAuthentication's
+    `aauthenticate` and only leaves the loop (via sync_to_async) for cache
+    and database I/O. Responses are byte-identical to the sync views,
+    including UserRenderer's {'errors': ...} wrapping of DRF exceptions.
+    """
+    http_method_names = ['get']
+    authenticator = StatelessJWTAuthentication()
+
+    @classonlymethod
+    def as_view(cls, **initkwargs):
+        # Django 4.0's View.as_view() is always sync; wrap it in a coroutine
+        # function so the handler runs the view on the event loop.
+        view = super().as_view(**initkwargs)
+
+        async def async_view(request, *args, **kwargs):
+            response = view(request, *args, **kwargs)
+            if asyncio.iscoroutine(response):
+                response = await response
+            return response
+
+        return functools.update_wrapper(async_view, view)
+
+    async def get(self, request, *args, **kwargs):
+        try:
+            auth = await self.authenticator.aauthenticate(request)
+            if auth is None:
+                raise NotAuthenticated()
+            user, _ = auth
+            return self.respond(*await self.fetch(Request(request), user))
+        except APIException as exc:
+            return self.respond_exception(exc)
+
+    @abstractmethod
+    async def fetch(self, request, user):
+        """
+        Load the response data for an authenticated request.
+
+        Returns:
+            tuple: (data, status_code)
+        """
+
+    def respond(self, data, status_code=status.HTTP_200_OK):
+        # Same rule as UserRenderer: only error payloads carrying ErrorDetail are wrapped.
+        if status_code >= 400 and has_error_detail(data):
+            data = {'errors': data}
+        return HttpResponse(dumps(data), status=status_code, content_type='application/json')
+
+    def respond_exception(self, exc):
+        data = exc.detail if isinstance(exc.detail, (list, dict)) else {'detail': exc.detail}
+        response = self.respond(data, exc.status_code)
+        if exc.status_code == status.HTTP_401_UNAUTHORIZED:
+            response['WWW-Authenticate'] = self.authenticator.authenticate_header(None)
+        return response
+
+
+class AsyncStockQueryView(AsyncAPIView):
+    """
+    GET /api/user/async/query-stocks/?symbol=&min_price=&max_price=&ordering=
+
+    Async version of StockQueryView; same parameters and responses.
+    """
+
+    async def fetch(self, request, user):
+        try:
+            symbol = request.query_params.get('symbol')
+            if symbol:
+                stocks = await sync_to_async(get_symbol)(symbol)
+            else:
+                stocks = await sync_to_async(get_catalogue)()
+            try:
+                stocks = filter_stocks(stocks, request.query_params)
+            except ValueError as ve:
+                return {"detail": str(ve)}, status.HTTP_400_BAD_REQUEST
+            return [stock['data'] for stock in stocks], status.HTTP_200_OK
+
+        except DatabaseError as db_err:
+            logger.error("Database error while querying stocks: %s", str(db_err))
+            return {"error": "A database error occurred while retrieving stock data."}, status.HTTP_500_INTERNAL_SERVER_ERROR
+
+        except Exception:
+            logger.exception("Unexpected error in AsyncStockQueryView")
+            return {"error": "An unexpected error occurred. Please try again later."}, status.HTTP_500_INTERNAL_SERVER_ERROR
+
+
+class AsyncTransactionListView(AsyncAPIView):
+    """
+    Async version of the cursor-paginated transaction lists. Rows come from
+    `values()` and are rendered by the same RowBuilder as FastListMixin.
+    """
+    serializer_class = TransactionSerializer
+    fast_exclude = ()
+    filtered = False
+
+    async def fetch(self, request, user):
+        queryset = Transaction.objects.filter(user_id=user.id)
+        if self.filtered:
+            try:
+                queryset = filter_transactions(queryset, request.query_params)
+            except ValueError as ve:
+                return {"error": str(ve)}, status.HTTP_400_BAD_REQUEST
+
+        paginator = TransactionCursorPagination()
+        builder = row_builder(self.serializer_class, tuple(self.fast_exclude))
+        columns = dict.fromkeys([*paginator.position_fields, *builder.columns])
+        try:
+            page = await sync_to_async(paginator.paginate_queryset)(queryset.values(*columns), request)
+        except DatabaseError as db_err:
+            logger.error(f"Database error listing transactions for user {user.id}: {db_err}")
+            page = []
+            paginator.next_position = None
+        with timed('serialize'):
+            data = [builder(row) for row in page]
+        return paginator.get_paginated_response(data).data, status.HTTP_200_OK
+
+
+class AsyncTransactionView(AsyncTransactionListView):
+    """
+    GET /api/user/async/transactions/
+
+    Async version of TransactionView's list.
+    """
+    fast_exclude = ('user_balance',)
+
+
+class AsyncQueryTransactionListView(AsyncTransactionListView):
+    """
+    GET /api/user/async/query-transactions/
+
+    Async version of QueryTransactionListView; same filters.
+    """
+    serializer_class = TransactionListSerializer
+    filtered = True
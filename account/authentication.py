@@ -0,0 +1,118 @@
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.functional import cached_property
+from django.utils.translation import gettext_lazy as _
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+
+from .models import User
+
+
+USER_STATUS_KEY = 'auth:user:{}'
+
+
+def get_user_status(user_id):
+    """
+    (is_active, is_admin) of a user, cached for AUTH_USER_CACHE_TTL seconds.
+    A missing user is reported as (False, False).
+    """
+    status = cache.get(USER_STATUS_KEY.format(user_id))
+    if status is None:
+        status = _load_user_status(user_id)
+    return status
+
+
+async def aget_user_status(user_id):
+    """
+    Async get_user_status(); only a cache miss leaves the event loop for the DB.
+    """
+    status = await cache.aget(USER_STATUS_KEY.format(user_id))
+    if status is None:
+        status = await sync_to_async(_load_user_status)(user_id)
+    return status
+
+
+def _load_user_status(user_id):
+    row = User.objects.filter(pk=user_id).values_list('is_active', 'is_admin').first()
+    status = tuple(row) if row else (False, False)
+    cache.set(USER_STATUS_KEY.format(user_id), status, timeout=getattr(settings, 'AUTH_USER_CACHE_TTL', 60))
+    return status
+
+
+def invalidate_user_status(user_id):
+    cache.delete(USER_STATUS_KEY.format(user_id))
+
+
+class ClaimsUser(TokenUser):
+    """
+    Stateless user backed by the access token's signed claims.
+
+    `is_admin` requires both the token claim and the cached DB flag, so an
+    admin whose rights are revoked loses them within the cache TTL instead of
+    at token expiry.
+    """
+
+    @cached_property
+    def is_admin(self):
+        return bool(self.token.get('is_admin', False)) and get_user_status(self.id)[1]
+
+
+class StatelessJWTAuthentication(JWTAuthentication):
+    """
+    JWT authentication that skips the per-request `User` lookup on read-only requests.
+
+    For safe methods (GET, HEAD, OPTIONS) the user is a `ClaimsUser` built
+    from the token; the only check is a cached is_active flag so deactivated
+    users are revoked within AUTH_USER_CACHE_TTL. Write requests still load
+    the real `User` row, since they need its balance.
+    """
+
+    def authenticate(self, request):
+        if request.method not in SAFE_METHODS:
+            return super().authenticate(request)
+
+        header = self.get_header(request)
+        if header is None:
+            return None
+
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+
+        validated_token = self.get_validated_token(raw_token)
+        return self.get_claims_user(validated_token), validated_token
+
+    async def aauthenticate(self, request):
+        """
+        Async authenticate() for read-only async views; takes a plain
+        HttpRequest and always returns a ClaimsUser.
+        """
+        header = self.get_header(request)
+        if header is None:
+            return None
+
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+
+        validated_token = self.get_validated_token(raw_token)
+        user = self._claims_user(validated_token)
+        if not (await aget_user_status(user.id))[0]:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+        return user, validated_token
+
+    def get_claims_user(self, validated_token):
+        user = self._claims_user(validated_token)
+        if not get_user_status(user.id)[0]:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+        return user
+
+    def _claims_user(self, validated_token):
+        if api_settings.USER_ID_CLAIM not in validated_token:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+        return ClaimsUser(validated_token)
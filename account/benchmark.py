@@ -0,0 +1,339 @@
+import json
+import random
+import statistics
+import threading
+import time
+from collections import Counter
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+
+from django.contrib.auth.hashers import make_password
+from django.db import connection
+from django.db.models import Sum
+from django.test import Client
+
+from .models import Holding, Stock, Transaction, User
+from .utils import get_tokens_for_user
+
+
+BENCH_EMAIL = 'bench-{}@bench.local'
+BENCH_EMAIL_SUFFIX = '@bench.local'
+REGISTER_EMAIL_PREFIX = 'bench-reg-'
+BENCH_PASSWORD = 'bench-password'
+BENCH_BALANCE = Decimal('10000000.00')
+BATCH_SIZE = 5000
+
+
+def percentile(ordered, fraction):
+    """
+    Nearest-rank percentile of an already sorted, non-empty list.
+    """
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def seed(users, stocks, transactions, seed=0):
+    """
+    Make sure the benchmark dataset exists: `users` bench users, `stocks`
+    bench stocks and `transactions` BUY transactions spread over them, with
+    matching holdings. Missing rows are created with bulk_create from a
+    seeded RNG, so repeated runs reuse the same dataset.
+
+    Returns:
+        dict: {'users', 'stocks', 'transactions'} counts after seeding.
+    """
+    rng = random.Random(seed)
+
+    symbols = [f"BN{i:05d}" for i in range(stocks)]
+    prices = {symbol: Decimal(rng.randint(100, 50000)) / 100 for symbol in symbols}
+    existing = set(Stock.objects.filter(symbol__in=symbols).values_list('symbol', flat=True))
+    Stock.objects.bulk_create(
+        [Stock(symbol=symbol, name=f"Bench {symbol}", last_price=prices[symbol]) for symbol in symbols if symbol not in existing],
+        batch_size=BATCH_SIZE,
+    )
+
+    emails = [BENCH_EMAIL.format(i) for i in range(users)]
+    existing = set(User.objects.filter(email__in=emails).values_list('email', flat=True))
+    password = make_password(BENCH_PASSWORD)
+    User.objects.bulk_create(
+        [
+            User(email=email, name='bench', password=password, current_balance=BENCH_BALANCE)
+            for email in emails if email not in existing
+        ],
+        batch_size=BATCH_SIZE,
+    )
+
+    user_ids = list(User.objects.filter(email__in=emails).order_by('id').values_list('id', flat=True))
+    stock_rows = list(Stock.objects.filter(symbol__in=symbols).order_by('id').values_list('id', 'last_price'))
+    missing = transactions - Transaction.objects.filter(user_id__in=user_ids).count()
+    if missing > 0 and user_ids and stock_rows:
+        batch = []
+        for _ in range(missing):
+            stock_id, price = rng.choice(stock_rows)
+            quantity = rng.randint(1, 10)
+            batch.append(Transaction(
+                user_id=rng.choice(user_ids),
+                stock_id=stock_id,
+                transaction_type=Transaction.BUY,
+                quantity=quantity,
+                price_each=price,
+                total_price=price * quantity,
+            ))
+            if len(batch) == BATCH_SIZE:
+                Transaction.objects.bulk_create(batch)
+                batch = []
+        Transaction.objects.bulk_create(batch)
+        _rebuild_holdings(user_ids)
+
+    return {
+        'users': len(user_ids),
+        'stocks': len(stock_rows),
+        'transactions': Transaction.objects.filter(user_id__in=user_ids).count(),
+    }
+
+
+def _rebuild_holdings(user_ids):
+    # Seeded histories are BUY-only, so a position is just the sum of its trades.
+    positions = (
+        Transaction.objects.filter(user_id__in=user_ids)
+        .values('user_id', 'stock_id')
+        .annotate(quantity=Sum('quantity'), cost_basis=Sum('total_price'))
+    )
+    Holding.objects.filter(user_id__in=user_ids).delete()
+    Holding.objects.bulk_create(
+        [
+            Holding(user_id=row['user_id'], stock_id=row['stock_id'], quantity=row['quantity'], cost_basis=row['cost_basis'])
+            for row in positions
+        ],
+        batch_size=BATCH_SIZE,
+    )
+
+
+def bench_users():
+    return (
+        User.objects.filter(email__startswith='bench-', email__endswith=BENCH_EMAIL_SUFFIX)
+        .exclude(email__startswith=REGISTER_EMAIL_PREFIX)
+    )
+
+
+def transaction_watermark():
+    return Transaction.objects.order_by('-id').values_list('id', flat=True).first() or 0
+
+
+def restore(watermark):
+    """
+    Undo a run's side effects so the next run starts from the same dataset:
+    registered users, trades booked after `watermark`, and the balances and
+    holdings those trades changed.
+    """
+    User.objects.filter(email__startswith=REGISTER_EMAIL_PREFIX, email__endswith=BENCH_EMAIL_SUFFIX).delete()
+    user_ids = list(bench_users().values_list('id', flat=True))
+    if Transaction.objects.filter(user_id__in=user_ids, id__gt=watermark).delete()[0]:
+        _rebuild_holdings(user_ids)
+    User.objects.filter(id__in=user_ids).update(current_balance=BENCH_BALANCE)
+
+
+class BenchContext:
+    """
+    Seeded users (with access tokens) and stocks the scenarios draw from.
+    """
+
+    def __init__(self, run_id, seed=0):
+        self.run_id = run_id
+        self.seed = seed
+        self.users = [(user.email, get_tokens_for_user(user)['access']) for user in bench_users().order_by('id')]
+        self.stocks = list(Stock.objects.filter(symbol__startswith='BN').order_by('id').values_list('symbol', 'last_price'))
+        if not self.users or not self.stocks:
+            raise ValueError("No benchmark data; seed it first.")
+
+    def rng(self, scenario, index):
+        return random.Random(f"{self.seed}:{scenario}:{index}")
+
+
+def _register(ctx, index, rng):
+    email = f"{REGISTER_EMAIL_PREFIX}{ctx.run_id}-{index}{BENCH_EMAIL_SUFFIX}"
+    body = {
+        'email': email, 'name': 'bench', 'password': BENCH_PASSWORD,
+        'confirm_password': BENCH_PASSWORD, 'current_balance': '1000.00',
+    }
+    return 'POST', '/api/user/register/', None, body
+
+
+def _login(ctx, index, rng):
+    email, _ = rng.choice(ctx.users)
+    return 'POST', '/api/user/login/', None, {'email': email, 'password': BENCH_PASSWORD}
+
+
+def _query_stocks(ctx, index, rng):
+    _, token = rng.choice(ctx.users)
+    return 'GET', '/api/user/query-stocks/?ordering=-last_price', token, None
+
+
+def _transactions_get(ctx, index, rng):
+    _, token = rng.choice(ctx.users)
+    return 'GET', '/api/user/transactions/?page_size=50', token, None
+
+
+def _transactions_post(ctx, index, rng):
+    _, token = rng.choice(ctx.users)
+    symbol, price = rng.choice(ctx.stocks)
+    body = {'stock': symbol, 'transaction_type': Transaction.BUY, 'quantity': 1, 'price_each': str(price)}
+    return 'POST', '/api/user/transactions/', token, body
+
+
+def _query_transactions(ctx, index, rng):
+    _, token = rng.choice(ctx.users)
+    symbol, _ = rng.choice(ctx.stocks)
+    return 'GET', f'/api/user/query-transactions/?stock={symbol}&transaction_type=BUY&page_size=50', token, None
+
+
+SCENARIOS = {
+    'register': _register,
+    'login': _login,
+    'query-stocks': _query_stocks,
+    'transactions-get': _transactions_get,
+    'transactions-post': _transactions_post,
+    'query-transactions': _query_transactions,
+}
+
+
+class InProcessDriver:
+    """
+    Sends requests through Django's test Client: the full middleware and view
+    stack against the configured database, without a server or network.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+
+    def request(self, method, path, token, body):
+        client = getattr(self._local, 'client', None)
+        if client is None:
+            # The test client's default Host (testserver) is not in ALLOWED_HOSTS.
+            client = self._local.client = Client(SERVER_NAME='localhost')
+        extra = {'HTTP_AUTHORIZATION': f'Bearer {token}'} if token else {}
+        data = json.dumps(body) if body is not None else ''
+        response = client.generic(method, path, data, content_type='application/json', **extra)
+        if response.streaming:
+            for _ in response.streaming_content:
+                pass
+        return response.status_code
+
+    def finish_thread(self):
+        connection.close()
+
+
+class HttpDriver:
+    """
+    Sends requests to a running server. Shared by the benchmark and loadtest
+    commands.
+    """
+
+    def __init__(self, base_url, timeout=30):
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+
+    def fetch(self, method, path, token=None, body=None):
+        """
+        Returns:
+            tuple: (status_code, content); status_code is 0 when the server
+            could not be reached.
+        """
+        headers = {'Accept': 'application/json', 'Content-Type': 'application/json'}
+        if token:
+            headers['Authorization'] = f'Bearer {token}'
+        data = json.dumps(body).encode() if body is not None else None
+        request = urllib.request.Request(self.base_url + path, data=data, headers=headers, method=method)
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                return response.status, response.read()
+        except urllib.error.HTTPError as exc:
+            return exc.code, exc.read()
+        except (urllib.error.URLError, OSError):
+            return 0, b''
+
+    def request(self, method, path, token, body):
+        return self.fetch(method, path, token, body)[0]
+
+    def finish_thread(self):
+        pass
+
+
+def run_requests(driver, build, requests, concurrency, warmup=0):
+    """
+    Send `requests` requests with `concurrency` threads; `build(index)`
+    returns each request as (method, path, token, body).
+
+    Returns:
+        dict: requests, errors (status 0 or >= 400), error_codes (count per
+        failing status, when there are errors), rps and p50/p95/p99 latency
+        in milliseconds of the successful requests.
+    """
+    def send(index):
+        method, path, token, body = build(index)
+        started = time.perf_counter()
+        status_code = driver.request(method, path, token, body)
+        return time.perf_counter() - started, status_code
+
+    def run_chunk(indexes):
+        try:
+            return [send(index) for index in indexes]
+        finally:
+            driver.finish_thread()
+
+    run_chunk(range(-warmup, 0))
+
+    chunks = [range(start, requests, concurrency) for start in range(concurrency)]
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = [result for chunk in pool.map(run_chunk, chunks) for result in chunk]
+    wall = time.perf_counter() - started
+
+    latencies = sorted(latency * 1000 for latency, status_code in results if 0 < status_code < 400)
+    error_codes = Counter(str(status_code) for _, status_code in results if not 0 < status_code < 400)
+    summary = {'requests': len(results), 'errors': len(results) - len(latencies), 'rps': round(len(latencies) / wall, 1)}
+    if error_codes:
+        summary['error_codes'] = dict(error_codes)
+    if latencies:
+        summary.update({
+            'p50_ms': round(statistics.median(latencies), 2),
+            'p95_ms': round(percentile(latencies, 0.95), 2),
+            'p99_ms': round(percentile(latencies, 0.99), 2),
+        })
+    return summary
+
+
+def run_scenario(driver, ctx, scenario, requests, concurrency, warmup=0):
+    """
+    Send `requests` requests of one scenario with `concurrency` threads.
+    See run_requests() for the result.
+    """
+    build = SCENARIOS[scenario]
+    return run_requests(
+        driver, lambda index: build(ctx, index, ctx.rng(scenario, index)), requests, concurrency, warmup=warmup,
+    )
+
+
+def compare(baseline, current, tolerance):
+    """
+    Compare two runs scenario by scenario.
+
+    A scenario regresses when its throughput drops, or its p95 latency
+    grows, by more than `tolerance` (a fraction), or when it has errors the
+    baseline did not.
+
+    Returns:
+        list[tuple]: (scenario, metric, baseline value, current value, regressed)
+    """
+    rows = []
+    for scenario, result in current.items():
+        base = baseline.get(scenario)
+        if base is None:
+            continue
+        if 'rps' in base:
+            rows.append((scenario, 'rps', base['rps'], result['rps'], result['rps'] < base['rps'] * (1 - tolerance)))
+        if 'p95_ms' in base and 'p95_ms' in result:
+            rows.append((scenario, 'p95_ms', base['p95_ms'], result['p95_ms'], result['p95_ms'] > base['p95_ms'] * (1 + tolerance)))
+        rows.append((scenario, 'errors', base['errors'], result['errors'], result['errors'] > base['errors']))
+    return rows
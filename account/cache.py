@@ -0,0 +1,179 @@
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+
+from .models import Stock
+
+
+CATALOGUE_KEY = 'stocks:catalogue'
+SYMBOL_KEY = 'stocks:symbol:{}'
+VERSION_KEY = 'stocks:version'
+PORTFOLIO_KEY = 'portfolio:{}:{}'
+PORTFOLIO_VERSION_KEY = 'portfolio:version:{}'
+
+# (expires_at, version): this process's copy of the catalogue version.
+_local_version = (0.0, None)
+
+
+def stock_cache():
+    """
+    The cache holding catalogue and symbol entries. Entries are keyed by the
+    shared version (see `version_cache`), so a process-local backend is fine
+    here: a stale entry is never read once the version has moved on.
+    """
+    return caches[getattr(settings, 'STOCK_CACHE_ALIAS', 'default')]
+
+
+def version_cache():
+    """
+    The cache holding the catalogue version. Every web worker and every
+    management command that changes stocks must see the same value, so
+    this must be a shared backend (Redis or the database cache).
+    """
+    return caches[getattr(settings, 'STOCK_VERSION_CACHE_ALIAS', 'shared')]
+
+
+def is_process_local(cache):
+    """
+    True if `cache` is only visible to the current process.
+    """
+    return isinstance(cache, (LocMemCache, DummyCache))
+
+
+def _timeout():
+    return getattr(settings, 'STOCK_CACHE_TIMEOUT', 300)
+
+
+def _local_version_ttl():
+    return getattr(settings, 'STOCK_VERSION_LOCAL_TTL', 2.0)
+
+
+def _fresh_version():
+    # Never reuse a small integer after the version key is evicted, or stale
+    # entries stored under that version could be served again. Bumps write a
+    # new value instead of incrementing, which is not atomic on every backend.
+    return time.time_ns()
+
+
+def _versions(*keys):
+    """
+    Current values of shared version keys, in one round trip when they all
+    exist. A missing key (never set, or evicted) gets a fresh value, which
+    only ever causes a miss.
+    """
+    cache = version_cache()
+    found = cache.get_many(keys)
+    for key in keys:
+        if found.get(key) is None:
+            cache.add(key, _fresh_version(), timeout=None)
+            found[key] = cache.get(key)
+    return [found[key] for key in keys]
+
+
+def _current_version():
+    """
+    The catalogue version, read from the shared cache at most once every
+    STOCK_VERSION_LOCAL_TTL seconds per process, so cached catalogue reads
+    cost no round trip to the version cache. A change made in another
+    process can take that long to show up here; one made in this process
+    shows up at once.
+    """
+    global _local_version
+    expires_at, version = _local_version
+    now = time.monotonic()
+    if version is None or now >= expires_at:
+        version = _versions(VERSION_KEY)[0]
+        _local_version = (now + _local_version_ttl(), version)
+    return version
+
+
+def forget_local_version():
+    """
+    Make the next catalogue read fetch the shared version.
+    """
+    global _local_version
+    _local_version = (0.0, None)
+
+
+def invalidate_stocks():
+    """
+    Drop every cached catalogue and symbol entry, in every process, by
+    moving the shared version on.
+    """
+    version_cache().set(VERSION_KEY, _fresh_version(), timeout=None)
+    forget_local_version()
+
+
+STOCK_COLUMNS = ('id', 'symbol', 'name', 'last_price', 'updated_at')
+
+
+def _entries(queryset):
+    from .fastpath import row_builder
+    from .serializers import StockSerializer
+
+    build = row_builder(StockSerializer)
+    return [
+        {'data': build(row), 'last_price': row['last_price'], 'updated_at': row['updated_at']}
+        for row in queryset.values(*STOCK_COLUMNS)
+    ]
+
+
+def get_catalogue():
+    """
+    All stocks as cached entries ({'data', 'last_price', 'updated_at'}), in id order.
+    """
+    cache = stock_cache()
+    version = _current_version()
+    entries = cache.get(CATALOGUE_KEY, version=version)
+    if entries is None:
+        entries = _entries(Stock.objects.order_by('id'))
+        cache.set(CATALOGUE_KEY, entries, timeout=_timeout(), version=version)
+    return entries
+
+
+def get_symbol(symbol):
+    """
+    The cached entry for one symbol as a list of zero or one entries.
+    """
+    if len(symbol) > Stock._meta.get_field('symbol').max_length:
+        return []
+    cache = stock_cache()
+    version = _current_version()
+    key = SYMBOL_KEY.format(symbol.upper())
+    entries = cache.get(key, version=version)
+    if entries is None:
+        entries = _entries(Stock.objects.filter(symbol=symbol.upper()))
+        cache.set(key, entries, timeout=_timeout(), version=version)
+    return entries
+
+
+def get_portfolio(user_id, build):
+    """
+    Cached portfolio of a user, built with `build()` on a miss.
+
+    Entries are keyed by the stock catalogue version and by the user's own
+    portfolio version, both shared. A price change invalidates every
+    portfolio, and a trade invalidates its user's portfolio with
+    `invalidate_portfolio`. Both versions are read before building, so a
+    portfolio built from data older than a concurrent trade is stored under
+    the superseded version and never served.
+    """
+    cache = stock_cache()
+    version, user_version = _versions(VERSION_KEY, PORTFOLIO_VERSION_KEY.format(user_id))
+    key = PORTFOLIO_KEY.format(user_id, user_version)
+    portfolio = cache.get(key, version=version)
+    if portfolio is None:
+        portfolio = build()
+        cache.set(key, portfolio, timeout=_timeout(), version=version)
+    return portfolio
+
+
+def invalidate_portfolio(user_id):
+    """
+    Drop a user's cached portfolio in every process. Call it after the
+    trade has committed.
+    """
+    version_cache().set(PORTFOLIO_VERSION_KEY.format(user_id), _fresh_version(), timeout=None)
@@ -9,4 +9,7 @@ HARDCODED_STOCKS = [
     {"symbol": "JPM",    "name": "JPMorgan Chase & Co.",       "last_price": 152.45},
     {"symbol": "BRK.A",  "name": "Berkshire Hathaway Inc.",    "last_price": 534500.00},
     {"symbol": "V",      "name": "Visa Inc.",                  "last_price": 225.10},
-]
\ No newline at end of file
+]
+
+# Upper bound on the number of trades accepted by POST transactions/batch/.
+MAX_BATCH_TRADES = 1000
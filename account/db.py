@@ -0,0 +1,101 @@
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.db import connections
+
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_stats = {'connections_opened': 0, 'health_check_failures': 0}
+
+
+def connection_stats():
+    """
+    Per-process counters: connections opened and dead persistent connections
+    dropped by the health check. A low opened/requests ratio means
+    CONN_MAX_AGE is doing its job.
+    """
+    with _lock:
+        return dict(_stats)
+
+
+def _increment(key):
+    with _lock:
+        _stats[key] += 1
+
+
+def record_connection(sender, connection, **kwargs):
+    _increment('connections_opened')
+
+
+def mark_connections_used(**kwargs):
+    """
+    Remember when each open connection last served a request, so the next
+    request only pings it after it has sat idle.
+    """
+    now = time.monotonic()
+    for conn in connections.all():
+        if conn.connection is not None:
+            conn.last_request_at = now
+
+
+def check_connections(**kwargs):
+    """
+    Drop persistent connections that died between requests (server restart,
+    pgbouncer recycling, idle timeout) so the request opens a fresh one
+    instead of failing on its first query.
+
+    Only connections idle for at least DB_CONN_HEALTH_CHECK_IDLE seconds are
+    pinged, so a busy worker doesn't pay a round trip on every request.
+    """
+    if not settings.DB_CONN_HEALTH_CHECKS:
+        return
+    now = time.monotonic()
+    for conn in connections.all():
+        if conn.connection is None or conn.in_atomic_block:
+            continue
+        if now - getattr(conn, 'last_request_at', 0) < settings.DB_CONN_HEALTH_CHECK_IDLE:
+            continue
+        if not conn.is_usable():
+            _increment('health_check_failures')
+            logger.warning("Dropping unusable database connection '%s'", conn.alias)
+            conn.close()
+
+
+def pool_stats():
+    """
+    Read SHOW POOLS from pgbouncer's admin console.
+
+    Returns:
+        list[dict]: one row per database/user pool with client/server
+        connection counts (cl_active, cl_waiting, sv_active, sv_idle, ...)
+        and maxwait; empty when DB_POOL is not 'pgbouncer'.
+
+    Raises:
+        psycopg2.Error: if the admin console is unreachable.
+    """
+    if settings.DB_POOL != 'pgbouncer':
+        return []
+    import psycopg2
+    import psycopg2.extras
+
+    db = settings.DATABASES['default']
+    conn = psycopg2.connect(
+        dbname='pgbouncer',
+        user=db['USER'],
+        password=db['PASSWORD'],
+        host=db['HOST'],
+        port=db['PORT'],
+        connect_timeout=5,
+    )
+    try:
+        # The admin console only accepts simple queries outside transactions.
+        conn.autocommit = True
+        with conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cursor:
+            cursor.execute('SHOW POOLS')
+            return [dict(row) for row in cursor.fetchall()]
+    finally:
+        conn.close()
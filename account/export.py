@@ -0,0 +1,106 @@
+import csv
+
+from asgiref.sync import sync_to_async
+from django.db import connections
+
+from .renderers import json_default, dumps
+
+
+EXPORT_FIELDS = ['stock', 'transaction_type', 'quantity', 'price_each', 'total_price', 'timestamp']
+EXPORT_COLUMNS = ['stock__symbol', 'transaction_type', 'quantity', 'price_each', 'total_price', 'timestamp']
+CHUNK_SIZE = 2000
+
+
+class Echo:
+    """
+    File-like object whose write() returns the value instead of buffering it,
+    so csv.writer can be used to produce lines for a streaming response.
+    """
+    def write(self, value):
+        return value
+
+
+def export_rows(queryset, chunk_size=CHUNK_SIZE):
+    """
+    Stream the export columns of a transaction queryset, ordered by
+    (-timestamp, -id), as tuples.
+
+    Uses a server-side cursor where the database supports it. When they are
+    disabled (DB_POOL=pgbouncer), iterator() would fetch the whole result
+    into memory, so the rows are read in keyset pages of `chunk_size`
+    instead. Each page is its own query, so a trade booked during the
+    export may be left out, but no row is repeated or skipped.
+    """
+    if connections[queryset.db].settings_dict.get('DISABLE_SERVER_SIDE_CURSORS'):
+        return _keyset_rows(queryset, chunk_size)
+    return queryset.values_list(*EXPORT_COLUMNS).iterator(chunk_size=chunk_size)
+
+
+def _keyset_rows(queryset, chunk_size):
+    position = None
+    while True:
+        page = queryset
+        if position is not None:
+            timestamp, pk = position
+            page = page.filter(timestamp__lte=timestamp).exclude(timestamp=timestamp, id__gte=pk)
+        rows = list(page.values_list('timestamp', 'id', *EXPORT_COLUMNS)[:chunk_size])
+        for row in rows:
+            yield row[2:]
+        if len(rows) < chunk_size:
+            return
+        position = rows[-1][:2]
+
+
+def _formatted(row):
+    symbol, transaction_type, quantity, price_each, total_price, timestamp = row
+    return symbol, transaction_type, quantity, str(price_each), str(total_price), json_default(timestamp)
+
+
+def iter_csv(rows, chunk_size=CHUNK_SIZE):
+    """
+    Yield a CSV export (header first) in blocks of `chunk_size` lines.
+    """
+    writer = csv.writer(Echo())
+    block = [writer.writerow(EXPORT_FIELDS)]
+    for row in rows:
+        block.append(writer.writerow(_formatted(row)))
+        if len(block) >= chunk_size:
+            yield ''.join(block)
+            block = []
+    if block:
+        yield ''.join(block)
+
+
+def iter_ndjson(rows, chunk_size=CHUNK_SIZE):
+    """
+    Yield an NDJSON export, one object per line, in blocks of `chunk_size` lines.
+    """
+    block = []
+    for row in rows:
+        block.append(dumps(dict(zip(EXPORT_FIELDS, _formatted(row)))))
+        if len(block) >= chunk_size:
+            yield b'\n'.join(block) + b'\n'
+            block = []
+    if block:
+        yield b'\n'.join(block) + b'\n'
+
+
+async def aiter_blocks(blocks):
+    """
+    Async iterator over a sync block generator such as iter_csv(). Each block
+    is produced by sync_to_async in the request's sync thread, so the
+    database cursor is never touched from the event loop and stays on the
+    connection that opened it.
+    """
+    produce = sync_to_async(next, thread_sensitive=True)
+    while True:
+        block = await produce(blocks, None)
+        if block is None:
+            return
+        yield block
+
+
+EXPORT_FORMATS = {
+    'csv': (iter_csv, 'text/csv; charset=utf-8'),
+    'ndjson': (iter_ndjson, 'application/x-ndjson'),
+}
@@ -0,0 +1,117 @@
+from collections import OrderedDict
+from functools import lru_cache
+
+from django.utils import timezone
+from rest_framework import ISO_8601, serializers
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+
+from .metrics import timed
+
+
+def _nullable(convert):
+    # ModelSerializer renders a None attribute as None without calling the field.
+    return lambda value: None if value is None else convert(value)
+
+
+def _decimal_converter(field):
+    places = -field.decimal_places
+    coerce_to_string = getattr(field, 'coerce_to_string', api_settings.COERCE_DECIMAL_TO_STRING)
+    if not coerce_to_string or field.localize:
+        return field.to_representation
+
+    def convert(value):
+        # A Decimal already at the field's scale quantizes to itself, and
+        # str() of such a value is the same as '{:f}'.format().
+        if value.as_tuple().exponent == places:
+            return str(value)
+        return field.to_representation(value)
+    return convert
+
+
+def _datetime_converter(field):
+    output_format = getattr(field, 'format', api_settings.DATETIME_FORMAT)
+    field_timezone = getattr(field, 'timezone', field.default_timezone())
+    if output_format is None or output_format.lower() != ISO_8601 or field_timezone is None:
+        return field.to_representation
+
+    def convert(value):
+        if not timezone.is_aware(value):
+            return field.to_representation(value)
+        value = value.astimezone(field_timezone).isoformat()
+        if value.endswith('+00:00'):
+            value = value[:-6] + 'Z'
+        return value
+    return convert
+
+
+def _converter(field):
+    if isinstance(field, serializers.SlugRelatedField):
+        return lambda value: value
+    if isinstance(field, serializers.DecimalField):
+        return _decimal_converter(field)
+    if isinstance(field, serializers.DateTimeField):
+        return _datetime_converter(field)
+    if isinstance(field, serializers.IntegerField):
+        return int
+    if isinstance(field, serializers.CharField) and not isinstance(field, serializers.ChoiceField):
+        return str
+    return field.to_representation
+
+
+def _column(field):
+    source = field.source.replace('.', '__')
+    if isinstance(field, serializers.SlugRelatedField):
+        return f"{source}__{field.slug_field}"
+    return source
+
+
+class RowBuilder:
+    """
+    Renders `values()` rows exactly as `serializer_class(many=True).data` would.
+
+    Fields, their source columns and their converters are resolved once per
+    serializer class, so each row costs one dict lookup and one cheap
+    conversion per field instead of DRF's per-field attribute resolution.
+    """
+
+    def __init__(self, serializer_class, exclude=()):
+        fields = [
+            (name, field) for name, field in serializer_class().fields.items()
+            if name not in exclude and not field.write_only
+        ]
+        self.names = [name for name, _ in fields]
+        self.columns = [_column(field) for _, field in fields]
+        self.converters = [_nullable(_converter(field)) for _, field in fields]
+        self.plan = list(zip(self.names, self.columns, self.converters))
+
+    def __call__(self, row):
+        return OrderedDict([(name, convert(row[column])) for name, column, convert in self.plan])
+
+
+@lru_cache(maxsize=None)
+def row_builder(serializer_class, exclude=()):
+    return RowBuilder(serializer_class, exclude)
+
+
+class FastListMixin:
+    """
+    `list()` for read-only generic views that skips serializer instances:
+    rows come from `values()` and are rendered by a precompiled RowBuilder.
+    Output is identical to the serializer path.
+    """
+    fast_exclude = ()
+
+    def list(self, request, *args, **kwargs):
+        builder = row_builder(self.get_serializer_class(), tuple(self.fast_exclude))
+        # Keyset paginators need their position columns in every row.
+        position_fields = getattr(self.paginator, 'position_fields', ())
+        columns = dict.fromkeys([*position_fields, *builder.columns])
+        queryset = self.filter_queryset(self.get_queryset()).values(*columns)
+
+        page = self.paginate_queryset(queryset)
+        with timed('serialize'):
+            data = [builder(row) for row in (queryset if page is None else page)]
+        if page is not None:
+            return self.get_paginated_response(data)
+        return Response(data)
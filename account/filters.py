@@ -0,0 +1,122 @@
+from datetime import datetime, time, timedelta
+from decimal import Decimal, InvalidOperation
+
+from django.utils import timezone
+
+from .models import Transaction
+
+
+DATE_FORMAT = "%Y-%m-%d"
+
+
+def _parse_date(value, name):
+    try:
+        return datetime.strptime(value, DATE_FORMAT).date()
+    except ValueError:
+        raise ValueError(f"Invalid {name} format. Expected YYYY-MM-DD.")
+
+
+def _parse_price(value, message):
+    # Decimal also accepts 'nan' and 'inf', which cannot be compared with prices.
+    try:
+        price = Decimal(value)
+    except InvalidOperation:
+        raise ValueError(message)
+    if not price.is_finite():
+        raise ValueError(message)
+    return price
+
+
+def _start_of_day(day):
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def filter_transactions(queryset, query_params):
+    """
+    Apply the transaction query parameters to a queryset.
+
+    Every filter is written in an index-friendly form: symbols and types are
+    normalized to upper case and compared with `=`, and dates become half-open
+    `timestamp` ranges instead of `__date` lookups, so Postgres can use the
+    (user, stock, timestamp) and (user, transaction_type, timestamp) indexes.
+
+    Query params:
+      - stock:             stock symbol (case-insensitive)
+      - transaction_type:  'BUY' or 'SELL' (case-insensitive)
+      - date_after:        transactions on or after this date (YYYY-MM-DD)
+      - date_before:       transactions on or before this date (YYYY-MM-DD)
+      - min_price:         price_each >= min_price
+      - max_price:         price_each <= max_price
+
+    Raises:
+        ValueError: If a parameter is malformed.
+    """
+    stock = query_params.get('stock')
+    if stock:
+        queryset = queryset.filter(stock__symbol=stock.upper())
+
+    transaction_type = query_params.get('transaction_type')
+    if transaction_type:
+        transaction_type = transaction_type.upper()
+        if transaction_type not in [Transaction.BUY, Transaction.SELL]:
+            raise ValueError("transaction_type must be 'BUY' or 'SELL'.")
+        queryset = queryset.filter(transaction_type=transaction_type)
+
+    date_after = query_params.get('date_after')
+    if date_after:
+        queryset = queryset.filter(timestamp__gte=_start_of_day(_parse_date(date_after, 'date_after')))
+
+    date_before = query_params.get('date_before')
+    if date_before:
+        day_after = _parse_date(date_before, 'date_before') + timedelta(days=1)
+        queryset = queryset.filter(timestamp__lt=_start_of_day(day_after))
+
+    min_price = query_params.get('min_price')
+    if min_price is not None:
+        queryset = queryset.filter(price_each__gte=_parse_price(min_price, "min_price must be a number."))
+
+    max_price = query_params.get('max_price')
+    if max_price is not None:
+        queryset = queryset.filter(price_each__lte=_parse_price(max_price, "max_price must be a number."))
+
+    return queryset
+
+
+STOCK_ORDERING = {
+    'last_price': lambda stock: stock['last_price'],
+    'symbol': lambda stock: stock['data']['symbol'],
+    'updated_at': lambda stock: stock['updated_at'],
+}
+
+
+def filter_stocks(stocks, query_params):
+    """
+    Filter and order cached catalogue entries (see account.cache) in memory.
+
+    Query params:
+      - min_price:  last_price >= this value
+      - max_price:  last_price <= this value
+      - ordering:   last_price, symbol or updated_at; prefix with '-' for DESC
+
+    Raises:
+        ValueError: If a parameter is malformed.
+    """
+    min_price = query_params.get('min_price')
+    if min_price is not None:
+        min_price = _parse_price(min_price, "min_price must be a numeric value.")
+        stocks = [stock for stock in stocks if stock['last_price'] >= min_price]
+
+    max_price = query_params.get('max_price')
+    if max_price is not None:
+        max_price = _parse_price(max_price, "max_price must be a numeric value.")
+        stocks = [stock for stock in stocks if stock['last_price'] <= max_price]
+
+    ordering = query_params.get('ordering')
+    if ordering:
+        descending = ordering.startswith('-')
+        field = ordering[1:] if descending else ordering
+        if field not in STOCK_ORDERING:
+            raise ValueError(f"Invalid ordering field: {ordering}.")
+        stocks = sorted(stocks, key=STOCK_ORDERING[field], reverse=descending)
+
+    return stocks
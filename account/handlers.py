@@ -0,0 +1,52 @@
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIHandler as DjangoASGIHandler
+from django.http import StreamingHttpResponse
+
+
+class AsyncStreamingHttpResponse(StreamingHttpResponse):
+    """
+    Streaming response whose content is an async iterator of blocks.
+
+    Django 4.0 iterates streaming content synchronously, which under ASGI
+    happens on the event loop, so content that reads from the database fails
+    with SynchronousOnlyOperation. ASGIHandler awaits this response's content
+    instead; it can only be served under ASGI.
+    """
+    streaming = True
+
+    def __init__(self, async_content, *args, **kwargs):
+        super().__init__((), *args, **kwargs)
+        self.async_content = async_content
+
+    def __iter__(self):
+        raise TypeError("AsyncStreamingHttpResponse can only be served by account.handlers.ASGIHandler.")
+
+    async def __aiter__(self):
+        async for part in self.async_content:
+            yield self.make_bytes(part)
+
+
+class ASGIHandler(DjangoASGIHandler):
+    """
+    Django's ASGI handler, plus support for AsyncStreamingHttpResponse.
+    """
+
+    async def send_response(self, response, send):
+        if not isinstance(response, AsyncStreamingHttpResponse):
+            return await super().send_response(response, send)
+
+        headers = [
+            (header.encode('ascii') if isinstance(header, str) else bytes(header),
+             value.encode('latin1') if isinstance(value, str) else bytes(value))
+            for header, value in response.items()
+        ]
+        for cookie in response.cookies.values():
+            headers.append((b'Set-Cookie', cookie.output(header='').encode('ascii').strip()))
+        await send({'type': 'http.response.start', 'status': response.status_code, 'headers': headers})
+        try:
+            async for part in response:
+                for chunk, _ in self.chunk_bytes(part):
+                    await send({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+            await send({'type': 'http.response.body'})
+        finally:
+            await sync_to_async(response.close, thread_sensitive=True)()
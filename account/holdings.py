@@ -0,0 +1,119 @@
+from collections import defaultdict
+from decimal import Decimal, ROUND_HALF_UP
+
+from django.db import connection
+from django.db.models import DecimalField, ExpressionWrapper, F
+
+from .models import Holding, Transaction, User
+
+
+ZERO = Decimal('0.00')
+
+
+def next_position(quantity, cost_basis, transaction_type, trade_quantity, total_price):
+    """
+    Apply one trade to an average-cost position.
+
+    Args:
+        quantity (int): Shares held before the trade.
+        cost_basis (Decimal): Cost basis of those shares.
+        transaction_type (str): Transaction.BUY or Transaction.SELL.
+        trade_quantity (int): Shares bought or sold.
+        total_price (Decimal): Total price of the trade.
+
+    Returns:
+        tuple: (quantity, cost_basis) after the trade.
+    """
+    if transaction_type == Transaction.BUY:
+        return quantity + trade_quantity, cost_basis + total_price
+
+    remaining = quantity - trade_quantity
+    if remaining <= 0:
+        return 0, ZERO
+    released = (cost_basis * trade_quantity / quantity).quantize(Decimal('.01'), rounding=ROUND_HALF_UP)
+    return remaining, cost_basis - released
+
+
+def compute_holdings(transactions):
+    """
+    Replay a transaction history into positions.
+
+    Args:
+        transactions: Iterable of (user_id, stock_id, transaction_type, quantity, total_price)
+            tuples in execution order.
+
+    Returns:
+        dict: {(user_id, stock_id): (quantity, cost_basis)}
+    """
+    positions = defaultdict(lambda: (0, ZERO))
+    for user_id, stock_id, transaction_type, quantity, total_price in transactions:
+        key = (user_id, stock_id)
+        positions[key] = next_position(*positions[key], transaction_type, quantity, total_price)
+    return dict(positions)
+
+
+def history_rows(queryset=None):
+    """
+    Stream a transaction history (all of it by default) in execution order as replay tuples.
+    """
+    if queryset is None:
+        queryset = Transaction.objects.all()
+    return (
+        queryset
+        .order_by('timestamp', 'id')
+        .values_list('user_id', 'stock_id', 'transaction_type', 'quantity', 'total_price')
+        .iterator(chunk_size=2000)
+    )
+
+
+def lock_ledger():
+    """
+    Block trade bookings until the current transaction ends, so the history
+    and the holdings can be read and rewritten consistently. Must be called
+    inside `transaction.atomic()`.
+
+    On PostgreSQL the holdings table is locked before the history, in the
+    order the trade engine touches them, so a waiting trade never holds a
+    lock the rebuild needs. Reads are not blocked. Other backends fall back
+    to locking every user row, the engine's per-account mutex (SQLite
+    ignores that; its first write in the transaction blocks other writers).
+    """
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute(f"LOCK TABLE {connection.ops.quote_name(Holding._meta.db_table)} IN EXCLUSIVE MODE")
+            cursor.execute(f"LOCK TABLE {connection.ops.quote_name(Transaction._meta.db_table)} IN SHARE MODE")
+    else:
+        list(User.objects.select_for_update().values_list('pk', flat=True))
+
+
+def portfolio_positions(user_id):
+    """
+    Open positions of a user valued at `Stock.last_price`, in one query.
+
+    Market value and unrealized P&L are computed by the database from the
+    maintained `Holding` rows joined to `Stock`.
+
+    Returns:
+        list: dicts with symbol, name, quantity, cost_basis, average_cost,
+        last_price, market_value and unrealized_pnl, ordered by symbol.
+    """
+    money = DecimalField(max_digits=16, decimal_places=2)
+    market_value = ExpressionWrapper(F('quantity') * F('stock__last_price'), output_field=money)
+
+    return list(
+        Holding.objects
+        .filter(user_id=user_id, quantity__gt=0)
+        .annotate(
+            symbol=F('stock__symbol'),
+            name=F('stock__name'),
+            last_price=F('stock__last_price'),
+            average_cost=ExpressionWrapper(F('cost_basis') / F('quantity'), output_field=money),
+            market_value=market_value,
+            unrealized_pnl=ExpressionWrapper(market_value - F('cost_basis'), output_field=money),
+        )
+        .values(
+            'symbol', 'name', 'quantity', 'cost_basis', 'average_cost',
+            'last_price', 'market_value', 'unrealized_pnl',
+        )
+        .order_by('symbol')
+    )
@@ -0,0 +1,211 @@
+import hashlib
+import json
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import IntegrityError, transaction
+from django.http import HttpResponse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.response import Response
+
+from .models import IdempotencyKey, User
+from .renderers import UserRenderer, dumps
+
+
+KEY_HEADER = 'Idempotency-Key'
+REPLAYED_HEADER = 'Idempotent-Replayed'
+MAX_KEY_LENGTH = 255
+CACHE_KEY = 'idempotency:{}:{}'
+CONTENT_TYPE = f'{UserRenderer.media_type}; charset={UserRenderer.charset}'
+
+
+class KeyConflict(Exception):
+    """
+    Raised inside the trade transaction when another request with the same
+    key committed first; nothing is booked, or the trades are rolled back.
+    """
+
+
+def idempotency_cache():
+    """
+    Read-through cache of stored responses. The IdempotencyKey table is the
+    source of truth, so this can be per process.
+    """
+    return caches[getattr(settings, 'IDEMPOTENCY_CACHE_ALIAS', 'default')]
+
+
+def _ttl():
+    return getattr(settings, 'IDEMPOTENCY_KEY_TTL', 86400)
+
+
+def _cache_key(user_id, key):
+    return CACHE_KEY.format(user_id, hashlib.sha256(key.encode()).hexdigest()[:40])
+
+
+def fingerprint(request):
+    """
+    Short digest of what a request asks for, so a key reused for a different
+    request can be told apart from a retry.
+    """
+    body = json.dumps(request.data, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(f"{request.method} {request.path}\n{body}".encode()).hexdigest()[:32]
+
+
+def _stored(user_id, key):
+    return IdempotencyKey.objects.filter(
+        user_id=user_id, key=key, created_at__gte=timezone.now() - timedelta(seconds=_ttl())
+    )
+
+
+def lookup(user_id, key):
+    """
+    The stored entry for a key, from the cache or the database.
+
+    Returns:
+        tuple or None: (fingerprint, status_code, content, content_type), or
+        None if the key has not booked anything within IDEMPOTENCY_KEY_TTL.
+    """
+    cache = idempotency_cache()
+    cache_key = _cache_key(user_id, key)
+    entry = cache.get(cache_key)
+    if entry is not None:
+        return entry
+
+    row = _stored(user_id, key).values_list('fingerprint', 'status_code', 'content', 'content_type', 'created_at').first()
+    if row is None:
+        return None
+    stored_fingerprint, status_code, content, content_type, created_at = row
+    entry = (stored_fingerprint, status_code, bytes(content), content_type)
+    remaining = _ttl() - (timezone.now() - created_at).total_seconds()
+    if remaining > 0:
+        cache.set(cache_key, entry, timeout=remaining)
+    return entry
+
+
+class IdempotencyClaim:
+    """
+    A keyed request on its way to the trade engine. The view sets `render`
+    to turn the engine's result into (status_code, data); the engine calls
+    `record` inside the trade transaction.
+    """
+
+    def __init__(self, user_id, key, request_fingerprint):
+        self.user_id = user_id
+        self.key = key
+        self.fingerprint = request_fingerprint
+        self.render = None
+
+    def wait(self):
+        """
+        Wait for any trade of this user that is in flight, then return the
+        stored entry for the key, if that trade stored it.
+        """
+        with transaction.atomic():
+            list(User.objects.select_for_update().filter(pk=self.user_id).values_list('pk', flat=True))
+        return lookup(self.user_id, self.key)
+
+    def check(self):
+        """
+        Called by the engine right after it locks the user row.
+
+        Raises:
+            KeyConflict: if the key is already stored.
+        """
+        if _stored(self.user_id, self.key).exists():
+            raise KeyConflict(self.key)
+
+    def record(self, result):
+        """
+        Store the response for `result` with the trades. Responses that book
+        nothing (status >= 400) are not stored, so the key can be retried.
+
+        Raises:
+            KeyConflict: if the key is already stored.
+        """
+        status_code, data = self.render(result)
+        if status_code >= 400:
+            return
+        # Expired keys of this user go, so a key can be reused after its TTL.
+        IdempotencyKey.objects.filter(
+            user_id=self.user_id, created_at__lt=timezone.now() - timedelta(seconds=_ttl())
+        ).delete()
+        try:
+            IdempotencyKey.objects.create(
+                user_id=self.user_id,
+                key=self.key,
+                fingerprint=self.fingerprint,
+                status_code=status_code,
+                content_type=CONTENT_TYPE,
+                content=dumps(data),
+            )
+        except IntegrityError as exc:
+            raise KeyConflict(self.key) from exc
+
+
+def stored_response(entry, request_fingerprint):
+    """
+    The response for a request whose key is already stored: the stored
+    result, or an error if the key was used for a different request.
+    """
+    stored_fingerprint, status_code, content, content_type = entry
+    if stored_fingerprint != request_fingerprint:
+        return Response(
+            {'error': f'This {KEY_HEADER} was already used with a different request.'},
+            status=status.HTTP_422_UNPROCESSABLE_ENTITY
+        )
+    response = HttpResponse(content, status=status_code, content_type=content_type)
+    response[REPLAYED_HEADER] = 'true'
+    return response
+
+
+class IdempotentCreateMixin:
+    """
+    Honour an `Idempotency-Key` header on POST.
+
+    A request whose key already booked trades gets the stored response back
+    without running validation or touching the trade engine; a key reused
+    with a different body gets 422. A request whose key is new first waits
+    for any trade of the user in flight, so a retry of a request that is
+    still booking gets its response rather than being validated against the
+    balance it changed. Otherwise the request runs with `self.idempotency`
+    set, and the view passes it to execute_trade or execute_batch, which
+    check the key again under the user-row lock and store it with the
+    response in the same DB transaction as the trades. A duplicate that
+    still races the first request gets the first response.
+
+    Only responses that book trades are stored; anything else can be retried
+    with the same key. Keys are scoped per user and kept for
+    IDEMPOTENCY_KEY_TTL seconds. Requests without the header are unaffected.
+
+    The view handles the POST in `create()`, as generic create views do.
+    """
+    idempotency = None
+
+    def post(self, request, *args, **kwargs):
+        key = request.headers.get(KEY_HEADER)
+        if key is None:
+            return self.create(request, *args, **kwargs)
+        if not key or len(key) > MAX_KEY_LENGTH:
+            return Response(
+                {'error': f'{KEY_HEADER} must be 1 to {MAX_KEY_LENGTH} characters.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        request_fingerprint = fingerprint(request)
+        entry = lookup(request.user.id, key)
+        if entry is not None:
+            return stored_response(entry, request_fingerprint)
+
+        self.idempotency = IdempotencyClaim(request.user.id, key, request_fingerprint)
+        entry = self.idempotency.wait()
+        if entry is not None:
+            return stored_response(entry, request_fingerprint)
+        try:
+            return self.create(request, *args, **kwargs)
+        except KeyConflict:
+            entry = lookup(request.user.id, key)
+            if entry is None:
+                raise
+            return stored_response(entry, request_fingerprint)
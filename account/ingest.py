@@ -0,0 +1,215 @@
+import csv
+import json
+import logging
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
+from functools import partial
+
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from .cache import invalidate_stocks
+from .models import PriceTick, Stock
+from .streaming import price_update, publish_prices
+
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 1000
+SYMBOL_MAX_LENGTH = Stock._meta.get_field('symbol').max_length
+NAME_MAX_LENGTH = Stock._meta.get_field('name').max_length
+MAX_PRICE = Decimal('99999999.99')
+UPSERT_ATTEMPTS = 3
+
+
+def normalize_stock(row):
+    """
+    Validate and normalize one raw stock row to (symbol, name, last_price).
+
+    Raises:
+        ValueError: If the row is missing a field or holds an invalid value.
+    """
+    if not isinstance(row, dict):
+        raise ValueError(f"expected an object, got {type(row).__name__}")
+    try:
+        symbol = str(row['symbol']).strip().upper()
+        name = str(row['name']).strip()
+        last_price = Decimal(str(row['last_price']).strip())
+        # NaN and Infinity parse, but cannot be quantized or compared.
+        if not last_price.is_finite():
+            raise InvalidOperation
+        last_price = last_price.quantize(Decimal('.01'), rounding=ROUND_HALF_UP)
+    except KeyError as exc:
+        raise ValueError(f"missing field {exc}")
+    except (InvalidOperation, TypeError):
+        raise ValueError(f"invalid last_price {row['last_price']!r}")
+
+    if not symbol or len(symbol) > SYMBOL_MAX_LENGTH:
+        raise ValueError(f"invalid symbol {symbol!r}")
+    if not name or len(name) > NAME_MAX_LENGTH:
+        raise ValueError(f"invalid name for {symbol}")
+    if not Decimal('0') <= last_price <= MAX_PRICE:
+        raise ValueError(f"last_price out of range for {symbol}")
+    return symbol, name, last_price
+
+
+def read_jsonl(path, offset=0):
+    """
+    Stream (offset_after_row, row) pairs from a JSON Lines file, starting at a byte offset.
+    """
+    with open(path, 'rb') as f:
+        f.seek(offset)
+        for line in f:
+            offset += len(line)
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError:
+                row = {}
+            yield offset, row
+
+
+def read_csv(path, offset=0):
+    """
+    Stream (offset_after_row, row) pairs from a CSV file with a header row,
+    starting at a byte offset (0 means just after the header).
+    """
+    with open(path, 'rb') as f:
+        header = next(csv.reader([f.readline().decode('utf-8-sig')]), [])
+        position = {'offset': max(offset, f.tell())}
+        f.seek(position['offset'])
+
+        def lines():
+            for line in f:
+                position['offset'] += len(line)
+                yield line.decode('utf-8')
+
+        for values in csv.reader(lines()):
+            if values:
+                yield position['offset'], dict(zip(header, values))
+
+
+READERS = {
+    'csv': read_csv,
+    'jsonl': read_jsonl,
+}
+
+
+def _validated(records, totals):
+    for position, row in records:
+        try:
+            yield position, normalize_stock(row)
+        except ValueError as exc:
+            totals['invalid'] += 1
+            logger.warning("Skipping invalid stock row before position %s: %s", position, exc)
+
+
+def _batched(records, batch_size):
+    batch, position = [], None
+    for position, row in records:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            yield batch, position
+            batch = []
+    if batch:
+        yield batch, position
+
+
+def upsert_batch(rows):
+    """
+    Insert or update one batch of normalized (symbol, name, last_price) rows.
+
+    Existing rows for the batch are read with a single query and compared in
+    memory, so unchanged rows cost nothing; new rows go through one
+    `bulk_create` and changed rows through one `bulk_update`. Every new or
+    changed price is also appended to the `PriceTick` history and, once
+    committed, published to live price stream subscribers.
+
+    If a concurrent ingest inserts one of the new symbols first, the batch
+    is rolled back and read again, so the counts only include rows this
+    call actually inserted or changed.
+
+    Returns:
+        dict: {'inserted', 'updated', 'unchanged'} counts for the batch.
+    """
+    latest = {symbol: (name, last_price) for symbol, name, last_price in rows}
+    for attempt in range(1, UPSERT_ATTEMPTS + 1):
+        try:
+            with transaction.atomic():
+                return _upsert(latest)
+        except IntegrityError:
+            if attempt == UPSERT_ATTEMPTS:
+                raise
+            logger.info("Stock symbols inserted concurrently; retrying batch (attempt %d)", attempt)
+
+
+def _upsert(latest):
+    existing = Stock.objects.in_bulk(latest.keys(), field_name='symbol')
+    now = timezone.now()
+
+    to_create, to_update, ticks, updates = [], [], [], []
+    for symbol, (name, last_price) in latest.items():
+        stock = existing.get(symbol)
+        if stock is None:
+            to_create.append(Stock(symbol=symbol, name=name, last_price=last_price))
+            updates.append(price_update(symbol, last_price, now))
+        elif stock.name != name or stock.last_price != last_price:
+            if stock.last_price != last_price:
+                ticks.append(PriceTick(stock_id=stock.pk, price=last_price, timestamp=now))
+                updates.append(price_update(symbol, last_price, now))
+            stock.name, stock.last_price, stock.updated_at = name, last_price, now
+            to_update.append(stock)
+
+    if to_create or to_update:
+        Stock.objects.bulk_create(to_create)
+        Stock.objects.bulk_update(to_update, ['name', 'last_price', 'updated_at'])
+        if to_create:
+            created_ids = Stock.objects.filter(
+                symbol__in=[stock.symbol for stock in to_create]
+            ).values_list('symbol', 'id')
+            ticks.extend(
+                PriceTick(stock_id=stock_id, price=latest[symbol][1], timestamp=now)
+                for symbol, stock_id in created_ids
+            )
+        PriceTick.objects.bulk_create(ticks)
+        transaction.on_commit(partial(publish_prices, updates))
+
+    return {
+        'inserted': len(to_create),
+        'updated': len(to_update),
+        'unchanged': len(latest) - len(to_create) - len(to_update),
+    }
+
+
+def ingest(records, batch_size=BATCH_SIZE, on_batch=None):
+    """
+    Validate and upsert a stream of (position, raw_row) records in fixed-size batches.
+
+    Only one batch is held in memory at a time. After each batch is committed
+    `on_batch(position, totals)` is called with the position of the last row
+    in the batch, which is safe to resume from.
+
+    Returns:
+        dict: {'inserted', 'updated', 'unchanged', 'invalid'} totals.
+    """
+    totals = {'inserted': 0, 'updated': 0, 'unchanged': 0, 'invalid': 0}
+    try:
+        for batch, position in _batched(_validated(records, totals), batch_size):
+            for key, count in upsert_batch(batch).items():
+                totals[key] += count
+            if on_batch is not None:
+                on_batch(position, totals)
+    finally:
+        if totals['inserted'] or totals['updated']:
+            invalidate_stocks()
+    return totals
+
+
+def upsert_stocks(rows, batch_size=BATCH_SIZE):
+    """
+    Upsert an in-memory iterable of raw stock rows ({'symbol', 'name', 'last_price'}).
+
+    Returns:
+        dict: {'inserted', 'updated', 'unchanged', 'invalid'} totals.
+    """
+    return ingest(enumerate(rows, start=1), batch_size=batch_size)
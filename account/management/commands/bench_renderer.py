@@ -0,0 +1,75 @@
+import json
+import time
+from collections import OrderedDict
+from datetime import timedelta
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.test import override_settings
+from django.utils import timezone
+from rest_framework.response import Response
+
+from account import renderers
+from account.renderers import UserRenderer
+
+
+def legacy_render(data):
+    """
+    The previous UserRenderer.render: a str() scan of the whole payload plus json.dumps.
+    """
+    if 'ErrorDetail' in str(data):
+        return json.dumps({'errors': data})
+    return json.dumps(data)
+
+
+class Command(BaseCommand):
+    """
+    python manage.py bench_renderer [--rows N] [--repeat N]
+
+    Micro-benchmark of UserRenderer against the previous str()-scanning
+    implementation on a transaction-list shaped payload.
+    """
+    help = "Compare the JSON renderer backends with the legacy renderer."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=10000)
+        parser.add_argument('--repeat', type=int, default=20)
+
+    def handle(self, *args, **options):
+        now = timezone.now()
+        data = [
+            OrderedDict([
+                ('stock', 'AAPL'),
+                ('transaction_type', 'BUY' if i % 2 else 'SELL'),
+                ('quantity', i % 100 + 1),
+                ('price_each', str(Decimal('175.25') + i % 50)),
+                ('total_price', str((Decimal('175.25') + i % 50) * (i % 100 + 1))),
+                ('timestamp', (now - timedelta(seconds=i)).isoformat().replace('+00:00', 'Z')),
+            ])
+            for i in range(options['rows'])
+        ]
+        context = {'response': Response(status=200)}
+        renderer = UserRenderer()
+
+        cases = [('legacy (str scan + json.dumps)', lambda: legacy_render(data))]
+        cases.append(('UserRenderer (stdlib)', self.with_backend('stdlib', lambda: renderer.render(data, renderer_context=context))))
+        if renderers.orjson is not None:
+            cases.append(('UserRenderer (orjson)', self.with_backend('orjson', lambda: renderer.render(data, renderer_context=context))))
+        else:
+            self.stdout.write("orjson is not installed; skipping the accelerated backend.")
+
+        baseline = None
+        for label, fn in cases:
+            fn()
+            started = time.perf_counter()
+            for _ in range(options['repeat']):
+                fn()
+            per_call = (time.perf_counter() - started) / options['repeat']
+            baseline = baseline or per_call
+            self.stdout.write(f"{label:34s} {per_call * 1000:8.2f} ms/render  {baseline / per_call:5.1f}x")
+
+    def with_backend(self, backend, fn):
+        def run():
+            with override_settings(JSON_RENDERER_BACKEND=backend):
+                return fn()
+        return run
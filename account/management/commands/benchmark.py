@@ -0,0 +1,130 @@
+import json
+import platform
+import uuid
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from account.benchmark import (
+    SCENARIOS,
+    BenchContext,
+    HttpDriver,
+    InProcessDriver,
+    compare,
+    restore,
+    run_scenario,
+    seed,
+    transaction_watermark,
+)
+
+
+class Command(BaseCommand):
+    """
+    python manage.py benchmark [--users N] [--stocks N] [--transactions N] [--seed N]
+                               [--scenario NAME ...] [--requests N] [--concurrency N] [--warmup N]
+                               [--url URL] [--save PATH] [--baseline PATH] [--tolerance F]
+
+    Seeds a reproducible dataset into the configured database (Postgres or
+    SQLite), then drives each scenario at fixed concurrency and reports
+    throughput and p50/p95/p99 latency. Requests go through Django's test
+    client in-process, or to a running server with --url.
+
+    Registrations and trades made by the run are removed afterwards, so
+    every run starts from the same dataset. A run in which any request
+    fails is an error and is neither saved nor compared. --save writes the
+    results as JSON; --baseline compares against such a file and fails if
+    throughput or p95 regress by more than --tolerance.
+    """
+    help = "Seed benchmark data and measure the account API against a baseline."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=100)
+        parser.add_argument('--stocks', type=int, default=200)
+        parser.add_argument('--transactions', type=int, default=20000)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument(
+            '--scenario', action='append', dest='scenarios', choices=sorted(SCENARIOS),
+            help="Repeatable; default runs all scenarios.",
+        )
+        parser.add_argument('--requests', type=int, default=500, help="Requests per scenario.")
+        parser.add_argument('--concurrency', type=int, default=8)
+        parser.add_argument('--warmup', type=int, default=20, help="Unmeasured requests per scenario.")
+        parser.add_argument('--url', help="Benchmark a running server instead of the in-process client.")
+        parser.add_argument('--save', help="Write results to this JSON file.")
+        parser.add_argument('--baseline', help="Compare against results saved with --save.")
+        parser.add_argument('--tolerance', type=float, default=0.10)
+
+    def handle(self, *args, **options):
+        counts = seed(options['users'], options['stocks'], options['transactions'], seed=options['seed'])
+        self.stdout.write(
+            f"Dataset: {counts['users']} users, {counts['stocks']} stocks, {counts['transactions']} transactions "
+            f"({connection.vendor})"
+        )
+
+        ctx = BenchContext(uuid.uuid4().hex[:8], seed=options['seed'])
+        driver = HttpDriver(options['url']) if options['url'] else InProcessDriver()
+        scenarios = options['scenarios'] or list(SCENARIOS)
+
+        results = {}
+        watermark = transaction_watermark()
+        try:
+            for scenario in scenarios:
+                result = run_scenario(
+                    driver, ctx, scenario, options['requests'], options['concurrency'], warmup=options['warmup'],
+                )
+                results[scenario] = result
+                self.stdout.write(self.format_result(scenario, result))
+        finally:
+            restore(watermark)
+
+        failed = {scenario: result['error_codes'] for scenario, result in results.items() if result['errors']}
+        if failed:
+            details = '; '.join(f"{scenario} {codes}" for scenario, codes in failed.items())
+            raise CommandError(f"Requests failed, not saving or comparing results (status: count): {details}")
+
+        if options['save']:
+            with open(options['save'], 'w') as fh:
+                json.dump({'meta': self.meta(options, counts), 'results': results}, fh, indent=2)
+            self.stdout.write(f"Saved results to {options['save']}")
+
+        if options['baseline']:
+            self.check_baseline(options['baseline'], results, options['tolerance'])
+
+    def format_result(self, scenario, result):
+        line = f"{scenario:<20} {result['rps']:>8.1f} req/s"
+        if 'p50_ms' in result:
+            line += f"  p50 {result['p50_ms']:.1f}ms  p95 {result['p95_ms']:.1f}ms  p99 {result['p99_ms']:.1f}ms"
+        line += f"  {result['errors']}/{result['requests']} errors"
+        return line
+
+    def meta(self, options, counts):
+        return {
+            **counts,
+            'seed': options['seed'],
+            'requests': options['requests'],
+            'concurrency': options['concurrency'],
+            'target': options['url'] or 'in-process',
+            'database': connection.vendor,
+            'python': platform.python_version(),
+        }
+
+    def check_baseline(self, path, results, tolerance):
+        try:
+            with open(path) as fh:
+                baseline = json.load(fh)
+        except (OSError, ValueError) as exc:
+            raise CommandError(f"Could not read baseline {path}: {exc}")
+
+        regressions = 0
+        self.stdout.write(f"Compared with {path} (tolerance {tolerance:.0%}):")
+        for scenario, metric, before, after, regressed in compare(baseline['results'], results, tolerance):
+            change = f"{(after - before) / before:+.1%}" if before else "n/a"
+            line = f"  {scenario:<20} {metric:<7} {before:>10} -> {after:<10} {change}"
+            if regressed:
+                regressions += 1
+                self.stdout.write(self.style.ERROR(line + "  REGRESSION"))
+            else:
+                self.stdout.write(line)
+
+        if regressions:
+            raise CommandError(f"{regressions} metric(s) regressed beyond {tolerance:.0%}.")
@@ -0,0 +1,100 @@
+import random
+import time
+import uuid
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from rest_framework.test import APIRequestFactory
+
+from account.fastpath import row_builder
+from account.models import Stock, Transaction, User
+from account.serializers import StockSerializer, TransactionListSerializer, TransactionSerializer
+
+
+class Command(BaseCommand):
+    """
+    python manage.py benchmark_fastpath [--rows N] [--repeat N]
+
+    Times the serializer bypass used by the read-only list views against
+    `Serializer(rows, many=True).data` for every serializer with a fast path.
+    Byte-for-byte parity is covered by account.tests.test_fastpath. Seed
+    data lives in a transaction that is rolled back.
+    """
+    help = "Time the values()-based fast path against the DRF serializers."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=2000)
+        parser.add_argument('--repeat', type=int, default=5)
+
+    def handle(self, *args, **options):
+        if options['rows'] < 1 or options['repeat'] < 1:
+            raise CommandError("--rows and --repeat must be positive.")
+        request = APIRequestFactory(SERVER_NAME='localhost').get('/')
+
+        with transaction.atomic():
+            user = self.seed(options['rows'])
+            transactions = Transaction.objects.filter(user=user).order_by('-timestamp', '-id')
+            stocks = Stock.objects.order_by('id')
+
+            cases = [
+                (
+                    'TransactionSerializer (GET)',
+                    lambda: TransactionSerializer(
+                        transactions.select_related('stock'), many=True, context={'request': request}
+                    ).data,
+                    transactions, row_builder(TransactionSerializer, ('user_balance',)),
+                ),
+                (
+                    'TransactionListSerializer',
+                    lambda: TransactionListSerializer(transactions.select_related('stock'), many=True).data,
+                    transactions, row_builder(TransactionListSerializer),
+                ),
+                (
+                    'StockSerializer',
+                    lambda: StockSerializer(stocks, many=True).data,
+                    stocks, row_builder(StockSerializer),
+                ),
+            ]
+
+            for label, slow, queryset, build in cases:
+                fast = lambda: [build(row) for row in queryset.values(*build.columns)]
+                slow_time = self.time(slow, options['repeat'])
+                fast_time = self.time(fast, options['repeat'])
+                self.stdout.write(
+                    f"{label:<28} serializer {slow_time * 1000:8.2f} ms   fast path {fast_time * 1000:8.2f} ms   "
+                    f"{slow_time / fast_time:5.1f}x"
+                )
+
+            transaction.set_rollback(True)
+
+    def time(self, fn, repeat):
+        started = time.perf_counter()
+        for _ in range(repeat):
+            fn()
+        return (time.perf_counter() - started) / repeat
+
+    def seed(self, rows):
+        rng = random.Random(0)
+        tag = uuid.uuid4().hex[:6]
+        user = User.objects.create(email=f"parity-{tag}@example.com", name="parity")
+        stocks = [
+            Stock.objects.create(
+                symbol=f"P{tag}{i}",
+                name=f"Parity Ünïcode {i}",
+                last_price=Decimal(rng.choice(['0.01', '5', '99999999.99', '1234.5'])),
+            )
+            for i in range(4)
+        ]
+        Transaction.objects.bulk_create(
+            Transaction(
+                user=user,
+                stock=rng.choice(stocks),
+                transaction_type=rng.choice([Transaction.BUY, Transaction.SELL]),
+                quantity=rng.randint(1, 10 ** 6),
+                price_each=Decimal(rng.randint(1, 10 ** 9)) / 100,
+                total_price=Decimal(rng.randint(1, 10 ** 11)) / 100,
+            )
+            for _ in range(rows)
+        )
+        return user
@@ -0,0 +1,36 @@
+import psycopg2
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from account.db import pool_stats
+
+
+class Command(BaseCommand):
+    """
+    python manage.py db_pool_stats
+
+    Prints the connection settings in effect and, with DB_POOL=pgbouncer,
+    pgbouncer's pool sizes and client wait times.
+    """
+    help = "Show database connection reuse settings and pgbouncer pool metrics."
+
+    COLUMNS = ('database', 'user', 'pool_mode', 'cl_active', 'cl_waiting', 'sv_active', 'sv_idle', 'maxwait')
+
+    def handle(self, *args, **options):
+        db = settings.DATABASES['default']
+        self.stdout.write(
+            f"CONN_MAX_AGE={db.get('CONN_MAX_AGE', 0)} "
+            f"health_checks={settings.DB_CONN_HEALTH_CHECKS} (idle {settings.DB_CONN_HEALTH_CHECK_IDLE}s) "
+            f"pool={settings.DB_POOL or 'none'}"
+        )
+
+        try:
+            pools = pool_stats()
+        except psycopg2.Error as exc:
+            raise CommandError(f"Could not read pgbouncer stats: {exc}")
+
+        if not pools:
+            return
+        self.stdout.write('  '.join(self.COLUMNS))
+        for row in pools:
+            self.stdout.write('  '.join(str(row.get(column, '')) for column in self.COLUMNS))
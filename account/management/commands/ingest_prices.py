@@ -0,0 +1,98 @@
+import json
+import os
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from account.cache import is_process_local, version_cache
+from account.ingest import BATCH_SIZE, READERS, ingest
+
+
+class Command(BaseCommand):
+    """
+    python manage.py ingest_prices <path> [--format csv|jsonl] [--batch-size N]
+                                          [--checkpoint FILE] [--resume]
+
+    Streams stock rows (symbol, name, last_price) from a local CSV or JSON
+    Lines file into the Stock table in fixed-size bulk batches, so memory
+    stays flat regardless of file size. After every committed batch the byte
+    offset reached is written to the checkpoint file; --resume continues from
+    it after an interruption.
+
+    Refuses to run unless the stock cache version is kept in a shared
+    cache, since that is the only way the web workers see the new prices.
+    """
+    help = "Stream-ingest stock prices from a CSV or JSONL file."
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--format', choices=sorted(READERS), help="Defaults to the file extension.")
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+        parser.add_argument('--checkpoint', help="Checkpoint file (default: <path>.checkpoint).")
+        parser.add_argument('--resume', action='store_true', help="Continue from the checkpoint file.")
+
+    def handle(self, *args, **options):
+        # The ingest runs in its own process; with a process-local version
+        # cache its invalidation would never reach the web workers.
+        if is_process_local(version_cache()):
+            raise CommandError(
+                "STOCK_VERSION_CACHE_ALIAS points at a process-local cache, so web workers would keep "
+                "serving old prices. Use a shared backend (Redis or the database cache)."
+            )
+
+        path = os.path.abspath(options['path'])
+        if not os.path.isfile(path):
+            raise CommandError(f"No such file: {path}")
+
+        fmt = options['format'] or os.path.splitext(path)[1].lstrip('.').lower()
+        if fmt == 'ndjson':
+            fmt = 'jsonl'
+        if fmt not in READERS:
+            raise CommandError(f"Cannot infer format from {path}; pass --format.")
+
+        checkpoint = options['checkpoint'] or f"{path}.checkpoint"
+        offset = self.load_checkpoint(checkpoint, path) if options['resume'] else 0
+        if offset:
+            self.stdout.write(f"Resuming {path} at byte {offset}")
+
+        started = time.perf_counter()
+        size = os.path.getsize(path)
+
+        def on_batch(position, totals):
+            self.save_checkpoint(checkpoint, path, position)
+            rows = sum(totals.values())
+            elapsed = time.perf_counter() - started
+            self.stdout.write(
+                f"{position * 100 // max(size, 1):3d}%  {rows} rows  {rows / elapsed:,.0f} rows/sec"
+            )
+
+        totals = ingest(READERS[fmt](path, offset), batch_size=options['batch_size'], on_batch=on_batch)
+
+        if os.path.exists(checkpoint):
+            os.remove(checkpoint)
+
+        elapsed = time.perf_counter() - started
+        rows = sum(totals.values())
+        self.stdout.write(self.style.SUCCESS(
+            f"Ingested {rows} rows in {elapsed:.2f}s ({rows / max(elapsed, 1e-9):,.0f} rows/sec): "
+            f"{totals['inserted']} inserted, {totals['updated']} updated, "
+            f"{totals['unchanged']} unchanged, {totals['invalid']} invalid"
+        ))
+
+    def load_checkpoint(self, checkpoint, path):
+        try:
+            with open(checkpoint) as f:
+                state = json.load(f)
+        except FileNotFoundError:
+            return 0
+        except ValueError:
+            raise CommandError(f"Corrupt checkpoint file: {checkpoint}")
+        if state.get('path') != path:
+            raise CommandError(f"Checkpoint {checkpoint} belongs to {state.get('path')}, not {path}.")
+        return int(state['offset'])
+
+    def save_checkpoint(self, checkpoint, path, offset):
+        tmp = f"{checkpoint}.tmp"
+        with open(tmp, 'w') as f:
+            json.dump({'path': path, 'offset': offset}, f)
+        os.replace(tmp, checkpoint)
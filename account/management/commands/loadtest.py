@@ -0,0 +1,63 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from account.benchmark import HttpDriver, run_requests
+
+
+class Command(BaseCommand):
+    """
+    python manage.py loadtest [--url URL] [--path PATH ...] [--requests N] [--concurrency N]
+                              [--email E --password P]
+
+    Hammers a running server over HTTP and reports requests/sec and latency
+    percentiles per path. With --email/--password it logs in first and sends
+    the access token, so authenticated endpoints can be measured too.
+    Compare `start.sh dev` against `start.sh serve` to see the difference.
+    Uses the same HTTP driver and statistics as the benchmark command.
+    """
+    help = "Measure requests/sec and latency of a running server."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', default='http://127.0.0.1:8000')
+        parser.add_argument('--path', action='append', dest='paths', help="Repeatable; default /api/user/query-stocks/.")
+        parser.add_argument('--requests', type=int, default=1000, help="Requests per path.")
+        parser.add_argument('--concurrency', type=int, default=16)
+        parser.add_argument('--timeout', type=float, default=10.0)
+        parser.add_argument('--email')
+        parser.add_argument('--password')
+
+    def handle(self, *args, **options):
+        driver = HttpDriver(options['url'], timeout=options['timeout'])
+        token = self.login(driver, options) if options['email'] else None
+
+        for path in options['paths'] or ['/api/user/query-stocks/']:
+            result = run_requests(
+                driver, lambda index: ('GET', path, token, None), options['requests'], options['concurrency'],
+            )
+            self.report(path, result)
+
+    def login(self, driver, options):
+        status_code, content = driver.fetch(
+            'POST', '/api/user/login/', body={'email': options['email'], 'password': options['password']}
+        )
+        if status_code != 200:
+            raise CommandError(f"Login failed with status {status_code}: {content[:200]!r}")
+        try:
+            return json.loads(content)['token']['access']
+        except (KeyError, TypeError, ValueError) as exc:
+            raise CommandError(f"Login failed: {exc}")
+
+    def report(self, path, result):
+        if 'p50_ms' not in result:
+            self.stdout.write(self.style.ERROR(f"{path}: all requests failed (status: count {result['error_codes']})"))
+            return
+
+        line = (
+            f"{path}: {result['rps']:.1f} req/s, "
+            f"p50 {result['p50_ms']:.1f}ms, p95 {result['p95_ms']:.1f}ms, p99 {result['p99_ms']:.1f}ms, "
+            f"{result['errors']} errors"
+        )
+        if result['errors']:
+            line += f" (status: count {result['error_codes']})"
+        self.stdout.write(line)
@@ -0,0 +1,69 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from account.holdings import compute_holdings, history_rows, lock_ledger
+from account.models import Holding
+
+
+class Command(BaseCommand):
+    """
+    python manage.py rebuild_holdings [--verify]
+
+    Replays the `Transaction` table into per-user positions and either
+    rewrites the `Holding` table from it or, with --verify, only reports
+    holdings that have drifted from the history.
+    """
+    help = "Rebuild (or verify) the Holding ledger from the Transaction history."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--verify',
+            action='store_true',
+            help="Compare holdings against the history without writing; exit non-zero on drift.",
+        )
+
+    def handle(self, *args, **options):
+        if options['verify']:
+            self.verify(compute_holdings(history_rows()))
+        else:
+            self.rebuild()
+
+    def verify(self, expected):
+        actual = {
+            (user_id, stock_id): (quantity, cost_basis)
+            for user_id, stock_id, quantity, cost_basis in Holding.objects.values_list(
+                'user_id', 'stock_id', 'quantity', 'cost_basis'
+            ).iterator(chunk_size=2000)
+        }
+
+        mismatches = 0
+        for key in expected.keys() | actual.keys():
+            # A zeroed-out holding row is equivalent to having no row at all.
+            want = expected.get(key, (0, 0))
+            have = actual.get(key, (0, 0))
+            if want != have:
+                mismatches += 1
+                user_id, stock_id = key
+                self.stderr.write(
+                    f"user={user_id} stock={stock_id}: expected {want[0]} @ {want[1]}, found {have[0]} @ {have[1]}"
+                )
+
+        if mismatches:
+            raise CommandError(f"{mismatches} holding(s) out of sync with the transaction history.")
+        self.stdout.write(self.style.SUCCESS(f"All {len(expected)} holding(s) match the transaction history."))
+
+    def rebuild(self):
+        # Trades are blocked from the lock until commit, so none can be booked
+        # between replaying the history and rewriting the holdings.
+        with transaction.atomic():
+            lock_ledger()
+            Holding.objects.all().delete()
+            expected = compute_holdings(history_rows())
+            Holding.objects.bulk_create(
+                [
+                    Holding(user_id=user_id, stock_id=stock_id, quantity=quantity, cost_basis=cost_basis)
+                    for (user_id, stock_id), (quantity, cost_basis) in expected.items()
+                ],
+                batch_size=1000,
+            )
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {len(expected)} holding(s) from the transaction history."))
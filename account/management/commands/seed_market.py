@@ -0,0 +1,77 @@
+import threading
+import time
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from account.seeding import BATCH_SIZE, SEED_EMAIL, SEED_PASSWORD, reset, seed_market
+
+
+class Command(BaseCommand):
+    """
+    python manage.py seed_market [--users N] [--symbols N] [--transactions N] [--seed N]
+                                 [--days N] [--end YYYY-MM-DD] [--user-alpha F] [--symbol-alpha F]
+                                 [--batch-size N] [--workers N] [--reset]
+
+    Generates a synthetic market for performance work: traders, a symbol
+    universe and a trade history with power-law activity per user and per
+    symbol, clustered into market-hours sessions. Trades are streamed into
+    the database in batches (COPY on PostgreSQL) by parallel writer threads;
+    holdings and balances are written to match the history, so
+    `rebuild_holdings --verify` passes.
+
+    Output is fully determined by the arguments: pass the same --seed and
+    --end to reproduce a dataset.
+    """
+    help = "Generate a large, deterministic synthetic market (users, stocks, transactions)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--symbols', type=int, default=5000)
+        parser.add_argument('--transactions', type=int, default=1000000)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--days', type=int, default=365, help="Length of the traded period.")
+        parser.add_argument('--end', type=date.fromisoformat, help="Last day of the period (default: today).")
+        parser.add_argument('--user-alpha', type=float, default=1.1, help="Power-law exponent of activity per user.")
+        parser.add_argument('--symbol-alpha', type=float, default=1.2, help="Power-law exponent of symbol popularity.")
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+        parser.add_argument('--workers', type=int, default=4, help="Writer threads (always 1 on SQLite).")
+        parser.add_argument('--reset', action='store_true', help="Delete previously seeded users and their trades first.")
+
+    def handle(self, *args, **options):
+        if min(options['users'], options['symbols'], options['batch_size']) < 1:
+            raise CommandError("--users, --symbols and --batch-size must be positive.")
+
+        if options['reset']:
+            self.stdout.write(f"Removed {reset()} seeded transaction(s).")
+
+        started = time.perf_counter()
+        lock = threading.Lock()
+        progress = {'rows': 0, 'reported': 0}
+
+        def on_written(rows):
+            with lock:
+                progress['rows'] += rows
+                if progress['rows'] - progress['reported'] < 100000:
+                    return
+                progress['reported'] = progress['rows']
+                elapsed = time.perf_counter() - started
+                self.stdout.write(f"{progress['rows']:>12,} transactions  {progress['rows'] / elapsed:,.0f} rows/sec")
+
+        try:
+            counts = seed_market(
+                options['users'], options['symbols'], options['transactions'],
+                seed=options['seed'], days=options['days'], end=options['end'],
+                user_alpha=options['user_alpha'], symbol_alpha=options['symbol_alpha'],
+                batch_size=options['batch_size'], workers=options['workers'], on_written=on_written,
+            )
+        except ValueError as exc:
+            raise CommandError(f"{exc} Pass --reset to replace them.")
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"Seeded {counts['users']} users, {counts['stocks']} stocks, {counts['transactions']:,} transactions "
+            f"and {counts['holdings']} holdings in {elapsed:.1f}s ({connection.vendor}). "
+            f"Users sign in as {SEED_EMAIL.format(0)} ... with password '{SEED_PASSWORD}'."
+        ))
@@ -0,0 +1,123 @@
+import random
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, connection
+from django.db.models import Sum
+
+from account.holdings import compute_holdings, history_rows
+from account.models import Holding, Stock, Transaction, User
+from account.trading import TradeRejected, execute_trade
+
+
+class Command(BaseCommand):
+    """
+    python manage.py stress_trades [--trades N] [--workers N] [--balance X] [--seed N] [--keep]
+
+    Fires concurrent BUY/SELL trades at a single throwaway account through the
+    trade engine, then asserts that the balance, the holding and the
+    transaction history are consistent with each other. Meant to be run
+    against Postgres; SQLite serializes writers and will mostly exercise the
+    retry path.
+    """
+    help = "Stress the trade engine with concurrent trades on one account and check invariants."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--trades', type=int, default=2000)
+        parser.add_argument('--workers', type=int, default=16)
+        parser.add_argument('--balance', type=Decimal, default=Decimal('10000.00'))
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--keep', action='store_true', help="Keep the stress account and stock afterwards.")
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        tag = uuid.uuid4().hex[:8]
+        user = User.objects.create_user(
+            email=f"stress-{tag}@example.com",
+            name="stress",
+            current_balance=options['balance'],
+        )
+        stock = Stock.objects.create(symbol=f"S{tag[:7]}".upper(), name="Stress Stock", last_price=Decimal('10.00'))
+
+        orders = [
+            (
+                rng.choice([Transaction.BUY, Transaction.SELL]),
+                rng.randint(1, 20),
+                Decimal(rng.randint(500, 1500)) / 100,
+            )
+            for _ in range(options['trades'])
+        ]
+        chunks = [orders[i::options['workers']] for i in range(options['workers'])]
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options['workers']) as pool:
+            results = list(pool.map(lambda chunk: self.run_chunk(user.pk, stock, chunk), chunks))
+        elapsed = time.perf_counter() - started
+
+        booked = sum(r['booked'] for r in results)
+        rejected = sum(r['rejected'] for r in results)
+        failed = sum(r['failed'] for r in results)
+        self.stdout.write(
+            f"{booked} booked, {rejected} rejected, {failed} failed in {elapsed:.2f}s "
+            f"({len(orders) / elapsed:.0f} trades/sec)"
+        )
+
+        try:
+            self.check_invariants(user, stock, options['balance'], booked)
+        finally:
+            if not options['keep']:
+                user.delete()
+                stock.delete()
+
+        self.stdout.write(self.style.SUCCESS("All invariants hold."))
+
+    def run_chunk(self, user_id, stock, chunk):
+        counts = {'booked': 0, 'rejected': 0, 'failed': 0}
+        try:
+            user = User.objects.get(pk=user_id)
+            for transaction_type, quantity, price_each in chunk:
+                try:
+                    execute_trade(user, stock, transaction_type, quantity, price_each)
+                    counts['booked'] += 1
+                except TradeRejected:
+                    counts['rejected'] += 1
+                except OperationalError:
+                    counts['failed'] += 1
+        finally:
+            connection.close()
+        return counts
+
+    def check_invariants(self, user, stock, initial_balance, booked):
+        user.refresh_from_db(fields=['current_balance'])
+        history = Transaction.objects.filter(user=user, stock=stock)
+        totals = {
+            row['transaction_type']: row
+            for row in history.values('transaction_type').annotate(
+                quantity=Sum('quantity'), amount=Sum('total_price')
+            )
+        }
+        bought = totals.get(Transaction.BUY, {'quantity': 0, 'amount': Decimal('0.00')})
+        sold = totals.get(Transaction.SELL, {'quantity': 0, 'amount': Decimal('0.00')})
+        holding = Holding.objects.filter(user=user, stock=stock).first()
+        held = holding.quantity if holding else 0
+
+        errors = []
+        if history.count() != booked:
+            errors.append(f"{booked} trades booked but {history.count()} rows stored")
+        if user.current_balance < 0:
+            errors.append(f"balance went negative: {user.current_balance}")
+        expected_balance = initial_balance - bought['amount'] + sold['amount']
+        if user.current_balance != expected_balance:
+            errors.append(f"balance {user.current_balance} != expected {expected_balance}")
+        if held != bought['quantity'] - sold['quantity']:
+            errors.append(f"holding {held} != bought {bought['quantity']} - sold {sold['quantity']}")
+
+        replayed = compute_holdings(history_rows(Transaction.objects.filter(user=user, stock=stock)))
+        if holding and replayed.get((user.pk, stock.pk), (0, 0)) != (holding.quantity, holding.cost_basis):
+            errors.append(f"holding {held} @ {holding.cost_basis} does not match the replayed history")
+
+        if errors:
+            raise CommandError("Invariant violations:\n  " + "\n  ".join(errors))
@@ -0,0 +1,253 @@
+import contextvars
+import logging
+import threading
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden
+
+from .db import connection_stats, pool_stats
+
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+PHASES = ('db', 'serialize', 'render')
+METRICS_ROUTE = 'metrics'
+POOL_GAUGES = {
+    'cl_active': 'Client connections linked to a server connection.',
+    'cl_waiting': 'Client connections waiting for a server connection.',
+    'sv_active': 'Server connections linked to a client.',
+    'sv_idle': 'Server connections idle and ready for a client.',
+    'sv_used': 'Server connections idle but not yet checked.',
+    'maxwait': 'Seconds the oldest waiting client has waited.',
+}
+
+_current = contextvars.ContextVar('request_metrics', default=None)
+
+
+class RequestMetrics:
+    """
+    Timings collected while one request is handled. The instance is shared
+    with threads started through sync_to_async, which copy the context.
+    """
+    __slots__ = ('queries', 'phases')
+
+    def __init__(self):
+        self.queries = 0
+        self.phases = dict.fromkeys(PHASES, 0.0)
+
+
+def start_request():
+    metrics = RequestMetrics()
+    return metrics, _current.set(metrics)
+
+
+def finish_request(token):
+    _current.reset(token)
+
+
+@contextmanager
+def timed(phase):
+    """
+    Add the time spent in the block to `phase` of the current request, minus
+    any query time inside it (e.g. a lazy queryset evaluated while
+    serializing), so phases never overlap. A no-op outside a request.
+    """
+    metrics = _current.get()
+    if metrics is None:
+        yield
+        return
+    started = time.perf_counter()
+    db_before = metrics.phases['db']
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        metrics.phases[phase] += elapsed - (metrics.phases['db'] - db_before)
+
+
+class LoginTimer:
+    """
+    Splits a login into hash and token phases for Server-Timing and logs.
+    Query time inside a phase (the user lookup, a re-hash save) is left out,
+    as in timed().
+    """
+
+    def __init__(self):
+        self.timings = {}
+
+    def measure(self, phase, fn, *args, **kwargs):
+        metrics = _current.get()
+        db_before = metrics.phases['db'] if metrics is not None else 0.0
+        started = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - started
+            if metrics is not None:
+                elapsed -= metrics.phases['db'] - db_before
+            self.timings[phase] = elapsed * 1000
+
+    def server_timing(self):
+        return ', '.join(f"{phase};dur={ms:.1f}" for phase, ms in self.timings.items())
+
+
+def record_query(execute, sql, params, many, context):
+    """
+    Database execute wrapper (installed on every connection) counting
+    queries and their time for the current request.
+    """
+    metrics = _current.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.queries += 1
+        metrics.phases['db'] += time.perf_counter() - started
+
+
+def install_query_recorder(sender, connection, **kwargs):
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+class Histogram:
+    __slots__ = ('buckets', 'counts', 'sum', 'count')
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self):
+        total = 0
+        for bound, count in zip(self.buckets, self.counts):
+            total += count
+            yield bound, total
+
+
+class Registry:
+    """
+    Per-process metrics keyed by (method, route). Routes are URL patterns,
+    not paths, so the number of series stays bounded.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = {}
+        self.latency = {}
+        self.query_counts = {}
+        self.phase_seconds = {}
+
+    def observe(self, method, route, status_code, duration, metrics):
+        key = (method, route)
+        with self._lock:
+            status_key = (method, route, status_code)
+            self.requests[status_key] = self.requests.get(status_key, 0) + 1
+            if key not in self.latency:
+                self.latency[key] = Histogram(LATENCY_BUCKETS)
+                self.query_counts[key] = Histogram(QUERY_COUNT_BUCKETS)
+                self.phase_seconds[key] = dict.fromkeys(PHASES, 0.0)
+            self.latency[key].observe(duration)
+            self.query_counts[key].observe(metrics.queries)
+            for phase, seconds in metrics.phases.items():
+                self.phase_seconds[key][phase] += seconds
+
+    def render(self):
+        """
+        Prometheus text exposition format (version 0.0.4).
+        """
+        lines = []
+        with self._lock:
+            lines += [
+                '# HELP http_requests_total Requests handled, by route and status.',
+                '# TYPE http_requests_total counter',
+            ]
+            for (method, route, status_code), count in sorted(self.requests.items()):
+                lines.append(f'http_requests_total{{method="{method}",route="{route}",status="{status_code}"}} {count}')
+
+            self._render_histograms(
+                lines, 'http_request_duration_seconds', 'Request latency.', self.latency,
+            )
+            self._render_histograms(
+                lines, 'http_request_db_queries', 'Database queries per request.', self.query_counts,
+            )
+
+            lines += [
+                '# HELP http_request_phase_seconds_total Time spent per request phase.',
+                '# TYPE http_request_phase_seconds_total counter',
+            ]
+            for (method, route), phases in sorted(self.phase_seconds.items()):
+                for phase, seconds in phases.items():
+                    lines.append(
+                        f'http_request_phase_seconds_total{{method="{method}",route="{route}",phase="{phase}"}} {round(seconds, 6)}'
+                    )
+
+        for name, value in connection_stats().items():
+            lines += [f'# TYPE db_{name}_total counter', f'db_{name}_total {value}']
+        lines += render_pool_stats()
+        return '\n'.join(lines) + '\n'
+
+    @staticmethod
+    def _render_histograms(lines, name, help_text, histograms):
+        lines += [f'# HELP {name} {help_text}', f'# TYPE {name} histogram']
+        for (method, route), histogram in sorted(histograms.items()):
+            labels = f'method="{method}",route="{route}"'
+            for bound, count in histogram.cumulative():
+                lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {count}')
+            lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {histogram.count}')
+            lines.append(f'{name}_sum{{{labels}}} {round(histogram.sum, 6)}')
+            lines.append(f'{name}_count{{{labels}}} {histogram.count}')
+
+
+registry = Registry()
+
+
+def render_pool_stats():
+    """
+    pgbouncer's pool gauges as Prometheus lines, read from its admin console
+    on every scrape. They describe the shared pool, so every worker reports
+    the same values. Empty unless DB_POOL is 'pgbouncer'.
+    """
+    if getattr(settings, 'DB_POOL', '') != 'pgbouncer':
+        return []
+    lines = ['# HELP pgbouncer_up Whether the pgbouncer admin console answered.', '# TYPE pgbouncer_up gauge']
+    try:
+        pools = pool_stats()
+    except Exception:
+        logger.warning("Could not read pgbouncer pool stats", exc_info=True)
+        return lines + ['pgbouncer_up 0']
+    lines.append('pgbouncer_up 1')
+    for name, help_text in POOL_GAUGES.items():
+        lines += [f'# HELP pgbouncer_pool_{name} {help_text}', f'# TYPE pgbouncer_pool_{name} gauge']
+        for pool in pools:
+            labels = f'database="{pool["database"]}",user="{pool["user"]}"'
+            lines.append(f'pgbouncer_pool_{name}{{{labels}}} {pool.get(name, 0)}')
+    return lines
+
+
+def metrics_view(request):
+    """
+    GET /metrics
+
+    This worker's metrics in Prometheus text format. With METRICS_TOKEN set,
+    requires `Authorization: Bearer <METRICS_TOKEN>`.
+    """
+    token = getattr(settings, 'METRICS_TOKEN', '')
+    if token and request.headers.get('Authorization') != f'Bearer {token}':
+        return HttpResponseForbidden()
+    return HttpResponse(registry.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -0,0 +1,104 @@
+import asyncio
+import time
+
+from .metrics import METRICS_ROUTE, finish_request, registry, start_request
+from .profiling import profiler
+
+
+class MetricsMiddleware:
+    """
+    Records latency, DB query count/time, serializer and render time per
+    endpoint into account.metrics.registry (served on /metrics) and adds a
+    Server-Timing header to every response.
+
+    Put it first in MIDDLEWARE so the latency covers the whole stack. It
+    works in both sync and async chains, so async views are not pushed back
+    onto a thread.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = asyncio.iscoroutinefunction(get_response)
+        if self.is_async:
+            # Mark this instance as a coroutine function for Django's handler.
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        metrics, token = start_request()
+        started = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            finish_request(token)
+        return self.finish(request, response, metrics, started)
+
+    async def __acall__(self, request):
+        metrics, token = start_request()
+        started = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            finish_request(token)
+        return self.finish(request, response, metrics, started)
+
+    def finish(self, request, response, metrics, started):
+        duration = time.perf_counter() - started
+        match = request.resolver_match
+        route = match.route if match is not None else 'unmatched'
+        if route != METRICS_ROUTE:
+            registry.observe(request.method, route, response.status_code, duration, metrics)
+
+        timings = [f"{phase};dur={seconds * 1000:.1f}" for phase, seconds in metrics.phases.items()]
+        timings.append(f"total;dur={duration * 1000:.1f}")
+        header = ', '.join(timings)
+        if response.has_header('Server-Timing'):
+            header = f"{response['Server-Timing']}, {header}"
+        response['Server-Timing'] = header
+        return response
+
+
+class ProfilingMiddleware:
+    """
+    Marks the handling thread of requests selected by the sampling profiler
+    (account.profiling) so its stacks get sampled. Costs two attribute reads
+    per request while profiling is off; the shared switch is read by a
+    background thread, started on the first request.
+
+    In an async chain the request can run on the event loop and on executor
+    threads, so every thread is sampled while it is in flight; samples can
+    then include other requests running concurrently.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = asyncio.iscoroutinefunction(get_response)
+        if self.is_async:
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        profiler.watch()
+        if not profiler.enabled or not profiler.selects(request):
+            return self.get_response(request)
+        thread_id = profiler.enter()
+        try:
+            return self.get_response(request)
+        finally:
+            profiler.exit(thread_id)
+
+    async def __acall__(self, request):
+        profiler.watch()
+        if not profiler.enabled or not profiler.selects(request):
+            return await self.get_response(request)
+        thread_id = profiler.enter(whole_process=True)
+        try:
+            return await self.get_response(request)
+        finally:
+            profiler.exit(thread_id)
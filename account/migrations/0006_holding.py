@@ -0,0 +1,64 @@
+# Generated by Django 4.0.3 on 2026-10-17 07:10
+
+from decimal import Decimal, ROUND_HALF_UP
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def backfill_holdings(apps, schema_editor):
+    # Replays the history with the average-cost rules of account.holdings,
+    # inlined so this migration does not change when that module does.
+    Holding = apps.get_model('account', 'Holding')
+    Transaction = apps.get_model('account', 'Transaction')
+    positions = {}
+    history = (
+        Transaction.objects
+        .order_by('timestamp', 'id')
+        .values_list('user_id', 'stock_id', 'transaction_type', 'quantity', 'total_price')
+        .iterator(chunk_size=2000)
+    )
+    for user_id, stock_id, transaction_type, quantity, total_price in history:
+        held, cost_basis = positions.get((user_id, stock_id), (0, Decimal('0.00')))
+        if transaction_type == 'BUY':
+            held, cost_basis = held + quantity, cost_basis + total_price
+        elif quantity >= held:
+            held, cost_basis = 0, Decimal('0.00')
+        else:
+            released = (cost_basis * quantity / held).quantize(Decimal('.01'), rounding=ROUND_HALF_UP)
+            held, cost_basis = held - quantity, cost_basis - released
+        positions[(user_id, stock_id)] = (held, cost_basis)
+
+    Holding.objects.bulk_create(
+        [
+            Holding(user_id=user_id, stock_id=stock_id, quantity=quantity, cost_basis=cost_basis)
+            for (user_id, stock_id), (quantity, cost_basis) in positions.items()
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('account', '0005_alter_user_options_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Holding',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('quantity', models.PositiveIntegerField(default=0)),
+                ('cost_basis', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=14)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('stock', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='holdings', to='account.stock')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='holdings', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='holding',
+            constraint=models.UniqueConstraint(fields=('user', 'stock'), name='unique_holding_per_user_stock'),
+        ),
+        migrations.RunPython(backfill_holdings, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 4.0.3 on 2026-10-17 07:13
+
+from django.db import migrations, models
+from django.db.models import Count
+from django.db.models.functions import Upper
+
+
+def uppercase_symbols(apps, schema_editor):
+    Stock = apps.get_model('account', 'Stock')
+    # Symbols that differ only in case ('aapl' and 'AAPL') would collide on
+    # the unique symbol column. Which row should keep the trades is a
+    # business decision, so stop and say which symbols need merging.
+    clashes = sorted(
+        Stock.objects.values(upper=Upper('symbol'))
+        .annotate(count=Count('id'))
+        .filter(count__gt=1)
+        .values_list('upper', flat=True)
+    )
+    if clashes:
+        raise RuntimeError(
+            f"Cannot uppercase stock symbols: {', '.join(clashes)} exist in more than one case. "
+            "Merge each set of rows into one Stock (moving its transactions and holdings) "
+            "or rename them, then run the migration again."
+        )
+    Stock.objects.exclude(symbol=Upper('symbol')).update(symbol=Upper('symbol'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('account', '0007_transaction_user_ts_id_idx'),
+    ]
+
+    operations = [
+        migrations.RunPython(uppercase_symbols, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['user', 'stock', '-timestamp', '-id'], name='txn_user_stock_ts_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['user', 'transaction_type', '-timestamp', '-id'], name='txn_user_type_ts_idx'),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 4.0.3 on 2026-10-17 07:16
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('account', '0008_transaction_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PriceTick',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('price', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('timestamp', models.DateTimeField()),
+                ('stock', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='ticks', to='account.stock')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='pricetick',
+            index=models.Index(fields=['stock', 'timestamp'], name='pricetick_stock_ts_idx'),
+        ),
+    ]
@@ -1,4 +1,4 @@
-from django.db import models
+from django.db import models, transaction
 from django.contrib.auth.models import BaseUserManager,AbstractBaseUser
 from django.conf import settings
 from decimal import Decimal, ROUND_DOWN
@@ -83,6 +83,24 @@ class Stock(models.Model):
     last_price = models.DecimalField(max_digits=10, decimal_places=2)
     updated_at = models.DateTimeField(auto_now=True)
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        stock = super().from_db(db, field_names, values)
+        stock._saved_price = stock.__dict__.get('last_price')
+        return stock
+
+    def save(self, *args, **kwargs):
+        # Symbols are stored upper-case so lookups can use plain equality on the unique index.
+        self.symbol = self.symbol.upper()
+        saved_price = getattr(self, '_saved_price', None)
+        price_changed = self._state.adding or saved_price is None or Decimal(str(self.last_price)) != saved_price
+        with transaction.atomic(using=kwargs.get('using')):
+            super().save(*args, **kwargs)
+            # Bulk ingest appends its own ticks; this covers single saves (admin, shell).
+            if price_changed:
+                PriceTick.objects.create(stock=self, price=self.last_price, timestamp=self.updated_at)
+        self._saved_price = Decimal(str(self.last_price))
+
     def __str__(self):
         return f"{self.symbol} ({self.last_price})"
     
@@ -102,6 +120,15 @@ class Transaction(models.Model):
     total_price = models.DecimalField(max_digits=12, decimal_places=2)
     timestamp = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            # Backs the (timestamp, id) keyset pagination of a user's history.
+            models.Index(fields=['user', '-timestamp', '-id'], name='txn_user_ts_id_idx'),
+            # Back the stock / transaction_type filters of query-transactions.
+            models.Index(fields=['user', 'stock', '-timestamp', '-id'], name='txn_user_stock_ts_idx'),
+            models.Index(fields=['user', 'transaction_type', '-timestamp', '-id'], name='txn_user_type_ts_idx'),
+        ]
+
     def save(self, *args, **kwargs):
         if not self.total_price:
             self.total_price = (self.price_each * self.quantity).quantize(
@@ -111,3 +138,71 @@ class Transaction(models.Model):
 
     def __str__(self):
         return f"{self.user.email}  {self.quantity}×{self.stock.symbol} @ {self.price_each}"
+
+
+class Holding(models.Model):
+    """
+    Materialized position of a user in a stock.
+
+    Maintained in the same DB transaction as every `Transaction` insert so
+    SELL validation is a single lookup instead of an aggregate over history.
+    `cost_basis` is the average-cost basis of the shares still held.
+    """
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='holdings')
+    stock = models.ForeignKey('Stock', on_delete=models.CASCADE, related_name='holdings')
+    quantity = models.PositiveIntegerField(default=0)
+    cost_basis = models.DecimalField(max_digits=14, decimal_places=2, default=Decimal('0.00'))
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'stock'], name='unique_holding_per_user_stock'),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id}  {self.quantity}×{self.stock_id} (cost {self.cost_basis})"
+
+
+class PriceTick(models.Model):
+    """
+    One observed price of a stock. Appended whenever a stock is created or
+    its `last_price` changes, by ingest or by `Stock.save()`, so
+    `Stock.last_price` is the latest tick. Queryset `update()` calls
+    bypass this and must add their own tick.
+    """
+    stock = models.ForeignKey('Stock', on_delete=models.CASCADE, related_name='ticks')
+    price = models.DecimalField(max_digits=10, decimal_places=2)
+    timestamp = models.DateTimeField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['stock', 'timestamp'], name='pricetick_stock_ts_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.stock_id} {self.price} @ {self.timestamp}"
+
+
+class IdempotencyKey(models.Model):
+    """
+    An Idempotency-Key that booked trades, with the response to replay.
+
+    Written by the trade engine in the same DB transaction as the trades, so
+    a key is never lost once its trades are committed, and the unique
+    constraint turns a concurrent duplicate into a rollback.
+    """
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='idempotency_keys')
+    key = models.CharField(max_length=255)
+    fingerprint = models.CharField(max_length=64)
+    status_code = models.PositiveSmallIntegerField()
+    content_type = models.CharField(max_length=100)
+    content = models.BinaryField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'key'], name='unique_idempotency_key_per_user'),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id} {self.key} → {self.status_code}"
@@ -0,0 +1,93 @@
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from collections import OrderedDict
+
+from django.conf import settings
+from django.utils.dateparse import parse_datetime
+from django.utils.translation import gettext_lazy as _
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class TransactionCursorPagination(BasePagination):
+    """
+    Keyset pagination over (timestamp, id), newest first.
+
+    The cursor is an opaque token holding the (timestamp, id) of the last row
+    on the previous page, so every page is an index range scan on
+    (user, timestamp, id) no matter how deep the client has paged.
+
+    Query params:
+      - cursor:     token from the previous page's `next` link
+      - page_size:  rows per page (capped at TRANSACTION_MAX_PAGE_SIZE)
+    """
+    ordering = ('-timestamp', '-id')
+    position_fields = ('timestamp', 'id')
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    page_size = getattr(settings, 'TRANSACTION_PAGE_SIZE', 50)
+    max_page_size = getattr(settings, 'TRANSACTION_MAX_PAGE_SIZE', 500)
+    invalid_cursor_message = _('Invalid cursor')
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        page_size = self.get_page_size(request)
+        position = self.decode_cursor(request)
+
+        queryset = queryset.order_by(*self.ordering)
+        if position is not None:
+            timestamp, pk = position
+            queryset = queryset.filter(timestamp__lte=timestamp).exclude(timestamp=timestamp, id__gte=pk)
+
+        rows = list(queryset[:page_size + 1])
+        page = rows[:page_size]
+        self.next_position = self.get_position(page[-1]) if len(rows) > page_size else None
+        return page
+
+    def get_position(self, row):
+        # Rows are model instances, or dicts when the view lists from values().
+        if isinstance(row, dict):
+            return tuple(row[field] for field in self.position_fields)
+        return tuple(getattr(row, field) for field in self.position_fields)
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('results', data),
+        ]))
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if size <= 0:
+            return self.page_size
+        return min(size, self.max_page_size)
+
+    def get_next_link(self):
+        if self.next_position is None:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.next_position))
+
+    def encode_cursor(self, position):
+        timestamp, pk = position
+        raw = f"{timestamp.isoformat()}|{pk}"
+        return urlsafe_b64encode(raw.encode('ascii')).decode('ascii')
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            raw = urlsafe_b64decode(encoded.encode('ascii')).decode('ascii')
+            timestamp, pk = raw.rsplit('|', 1)
+            timestamp = parse_datetime(timestamp)
+            pk = int(pk)
+        except (TypeError, ValueError, UnicodeError):
+            raise NotFound(self.invalid_cursor_message)
+        if timestamp is None:
+            raise NotFound(self.invalid_cursor_message)
+        return timestamp, pk
@@ -0,0 +1,57 @@
+from datetime import timedelta
+
+from django.db.models import Count, F, Max, Min, Window
+from django.db.models.functions import FirstValue, Trunc
+
+from .models import PriceTick
+
+
+# resolution → (Trunc kind, bar length, default look-back window)
+RESOLUTIONS = {
+    '1m': ('minute', timedelta(minutes=1), timedelta(days=1)),
+    '1h': ('hour', timedelta(hours=1), timedelta(days=30)),
+    '1d': ('day', timedelta(days=1), timedelta(days=365)),
+}
+# Upper bound on the bars one request may span (e.g. ~4 days of 1m bars).
+MAX_BARS = 6000
+
+
+def bar_count(resolution, start, end):
+    """
+    Number of bars [start, end) spans at `resolution`, counting partial bars.
+    """
+    _, length, _ = RESOLUTIONS[resolution]
+    return max(0, -(-(end - start) // length))
+
+
+def price_bars(stock, resolution, start, end):
+    """
+    OHLC bars for a stock, aggregated in SQL.
+
+    Ticks in [start, end) are bucketed with `Trunc`; high/low/count are
+    window aggregates over each bucket and open/close are the first and last
+    tick of the bucket, so the database returns one row per bar and Python
+    never loops over individual ticks.
+
+    Returns:
+        list: dicts with timestamp, open, high, low, close and ticks, oldest first.
+    """
+    kind, _, _ = RESOLUTIONS[resolution]
+    bucket = Trunc('timestamp', kind)
+    per_bucket = {'partition_by': [bucket]}
+
+    return list(
+        PriceTick.objects
+        .filter(stock=stock, timestamp__gte=start, timestamp__lt=end)
+        .annotate(
+            bucket=bucket,
+            open=Window(FirstValue('price'), order_by=[F('timestamp').asc(), F('id').asc()], **per_bucket),
+            close=Window(FirstValue('price'), order_by=[F('timestamp').desc(), F('id').desc()], **per_bucket),
+            high=Window(Max('price'), **per_bucket),
+            low=Window(Min('price'), **per_bucket),
+            ticks=Window(Count('id'), **per_bucket),
+        )
+        .values('bucket', 'open', 'high', 'low', 'close', 'ticks')
+        .distinct()
+        .order_by('bucket')
+    )
@@ -0,0 +1,333 @@
+import logging
+import os
+import random
+import sys
+import sysconfig
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connections
+
+
+logger = logging.getLogger(__name__)
+
+
+TRUNCATED_STACK = '[truncated]'
+CONFIG_KEY = 'profiler:config'
+SLOT_KEY = 'profiler:{}:slot:{}'
+STACKS_KEY = 'profiler:{}:stacks:{}'
+OPTIONS = ('path', 'method', 'fraction', 'interval', 'max_stacks')
+MAX_WORKERS = 256
+STATE_TIMEOUT = 7 * 86400
+_PATH_PREFIXES = sorted(
+    {sysconfig.get_paths()[key] + os.sep for key in ('purelib', 'platlib', 'stdlib')}
+    | {os.getcwd() + os.sep},
+    key=len,
+    reverse=True,
+)
+
+
+def _frame_name(code):
+    filename = code.co_filename
+    for prefix in _PATH_PREFIXES:
+        if filename.startswith(prefix):
+            filename = filename[len(prefix):]
+            break
+    return f"{filename}:{code.co_name}"
+
+
+def profiler_cache():
+    """
+    The cache holding the profiler switch and every worker's stacks. It must
+    be shared by all workers (see PROFILER_CACHE_ALIAS).
+    """
+    return caches[getattr(settings, 'PROFILER_CACHE_ALIAS', 'shared')]
+
+
+def _sync_interval():
+    return getattr(settings, 'PROFILER_SYNC_INTERVAL', 2.0)
+
+
+def _idle_sync_interval():
+    return getattr(settings, 'PROFILER_IDLE_SYNC_INTERVAL', 30.0)
+
+
+def collapse(frame):
+    """
+    One stack in collapsed (flamegraph.pl / speedscope) form, root first:
+    'module.py:outer;module.py:inner'.
+    """
+    names = []
+    while frame is not None:
+        names.append(_frame_name(frame.f_code))
+        frame = frame.f_back
+    return ';'.join(reversed(names))
+
+
+class SamplingProfiler:
+    """
+    Sampling profiler for selected requests, switched on and off for all
+    workers at once.
+
+    The switch and its options live in the shared profiler cache; a
+    background thread in each worker re-reads them every
+    PROFILER_IDLE_SYNC_INTERVAL seconds while off and every
+    PROFILER_SYNC_INTERVAL seconds while on (see `watch`). While enabled, a daemon thread in each worker wakes every
+    `interval` seconds and records the stack of each thread that is
+    currently handling a selected request (see ProfilingMiddleware). Stacks
+    are aggregated into a Counter, capped at `max_stacks` distinct stacks,
+    and published to the shared cache under a slot claimed by the worker.
+    Collection merges every worker's published stacks. When disabled there
+    is no sampler thread and the middleware only reads `enabled`.
+
+    A reset starts a new generation: workers drop their stacks and claim new
+    slots, and the old entries expire.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.config = {}
+        self.generation = None
+        self.slot = None
+        self.stacks = Counter()
+        self.samples = 0
+        self.requests = 0
+        self._dirty = False
+        self._watcher_pid = None
+        self._active = set()
+        self._whole_process = 0
+        self._lock = threading.Lock()
+        self._sync_lock = threading.RLock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def configure(self, enabled, reset=False, path=None, method=None, fraction=1.0, interval=0.005, max_stacks=10000):
+        """
+        Turn sampling on or off in every worker. When enabling, sample
+        requests whose path starts with `path` (all if None) and whose method
+        is `method` (all if None), picking `fraction` of them. `reset`
+        discards the stacks collected so far by all workers.
+
+        This worker applies the change at once; the others within
+        PROFILER_IDLE_SYNC_INTERVAL seconds when enabling and
+        PROFILER_SYNC_INTERVAL seconds when disabling.
+        """
+        cache = profiler_cache()
+        config = {**(cache.get(CONFIG_KEY) or {}), 'enabled': enabled}
+        if reset or config.get('generation') is None:
+            config['generation'] = time.time_ns()
+        if enabled:
+            config.update(
+                path=path,
+                method=method.upper() if method else None,
+                fraction=fraction,
+                interval=interval,
+                max_stacks=max_stacks,
+            )
+        cache.set(CONFIG_KEY, config, timeout=STATE_TIMEOUT)
+        self.apply(config)
+
+    def watch(self):
+        """
+        Start this process's thread that keeps it in step with the shared
+        switch, once per process (workers forked from a preloaded master
+        start their own).
+        """
+        if self._watcher_pid == os.getpid():
+            return
+        with self._sync_lock:
+            if self._watcher_pid == os.getpid():
+                return
+            self._watcher_pid = os.getpid()
+            threading.Thread(target=self._watch, name='profiler-sync', daemon=True).start()
+
+    def _watch(self):
+        while True:
+            # With the database cache, this thread keeps one connection for
+            # the life of the process and only reconnects after a failed read.
+            if not self.sync():
+                connections.close_all()
+            time.sleep(_sync_interval() if self.enabled else _idle_sync_interval())
+
+    def sync(self):
+        """
+        Apply the shared switch to this worker. A cache failure leaves the
+        worker as it is.
+
+        Returns:
+            bool: False if the switch could not be read.
+        """
+        try:
+            config = profiler_cache().get(CONFIG_KEY)
+        except Exception:
+            logger.warning("Could not read the profiler switch", exc_info=True)
+            return False
+        self.apply(config or {'enabled': False})
+        return True
+
+    def apply(self, config):
+        with self._sync_lock:
+            if config.get('generation') != self.generation:
+                self._stop_sampler()
+                with self._lock:
+                    self.generation = config.get('generation')
+                    self.slot = None
+                    self.stacks = Counter()
+                    self.samples = 0
+                    self.requests = 0
+                    self._dirty = False
+            options = {name: config.get(name) for name in OPTIONS}
+            if config['enabled'] and not (self.enabled and options == self.config):
+                self._start_sampler(options)
+            elif not config['enabled'] and self.enabled:
+                self._stop_sampler()
+
+    def _start_sampler(self, options):
+        self._stop_sampler()
+        with self._lock:
+            self.config = options
+            self._stop = threading.Event()
+            self._thread = threading.Thread(target=self._run, args=(self._stop,), name='sampling-profiler', daemon=True)
+            self.enabled = True
+        self._thread.start()
+
+    def _stop_sampler(self):
+        with self._lock:
+            was_enabled = self.enabled
+            self.enabled = False
+            thread, self._thread = self._thread, None
+            self._stop.set()
+            self._active.clear()
+            self._whole_process = 0
+        if thread is not None and thread is not threading.current_thread():
+            thread.join()
+        if was_enabled:
+            self.flush()
+
+    def selects(self, request):
+        config = self.config
+        if config.get('method') and request.method != config['method']:
+            return False
+        if config.get('path') and not request.path_info.startswith(config['path']):
+            return False
+        return config.get('fraction', 1.0) >= 1.0 or random.random() < config['fraction']
+
+    def enter(self, whole_process=False):
+        """
+        Start sampling the calling thread, or every thread when the request
+        runs on an event loop and may hop to executor threads.
+        """
+        thread_id = None if whole_process else threading.get_ident()
+        with self._lock:
+            if whole_process:
+                self._whole_process += 1
+            else:
+                self._active.add(thread_id)
+            self.requests += 1
+            self._dirty = True
+        return thread_id
+
+    def exit(self, thread_id):
+        with self._lock:
+            if thread_id is None:
+                self._whole_process = max(0, self._whole_process - 1)
+            else:
+                self._active.discard(thread_id)
+
+    def flush(self):
+        """
+        Publish this worker's stacks to the shared cache if they changed.
+        """
+        with self._lock:
+            if not self._dirty or self.generation is None:
+                return
+            generation = self.generation
+            entry = {'pid': os.getpid(), 'stacks': dict(self.stacks), 'samples': self.samples, 'requests': self.requests}
+            self._dirty = False
+        try:
+            cache = profiler_cache()
+            if self.slot is None:
+                self.slot = self._claim_slot(cache, generation)
+            cache.set(STACKS_KEY.format(generation, self.slot), entry, timeout=STATE_TIMEOUT)
+        except Exception:
+            logger.warning("Could not publish profiler stacks", exc_info=True)
+            with self._lock:
+                self._dirty = True
+
+    def _claim_slot(self, cache, generation):
+        for slot in range(MAX_WORKERS):
+            if cache.add(SLOT_KEY.format(generation, slot), os.getpid(), timeout=STATE_TIMEOUT):
+                return slot
+        raise RuntimeError(f"All {MAX_WORKERS} profiler slots are taken.")
+
+    def collect(self):
+        """
+        The shared switch and the stacks published by every worker, with
+        this worker's own stacks published first.
+
+        Returns:
+            tuple: (config, entries)
+        """
+        self.sync()
+        self.flush()
+        cache = profiler_cache()
+        config = cache.get(CONFIG_KEY) or {'enabled': False}
+        keys = [STACKS_KEY.format(config.get('generation'), slot) for slot in range(MAX_WORKERS)]
+        return config, list(cache.get_many(keys).values())
+
+    def collapsed(self):
+        """
+        Stacks aggregated over all workers as collapsed-stack text, one
+        'stack count' per line, hottest first.
+        """
+        _, entries = self.collect()
+        stacks = Counter()
+        for entry in entries:
+            stacks.update(entry['stacks'])
+        return ''.join(f"{stack} {count}\n" for stack, count in stacks.most_common())
+
+    def status(self):
+        config, entries = self.collect()
+        return {
+            'enabled': config['enabled'],
+            **{name: config.get(name) for name in OPTIONS},
+            'workers': len(entries),
+            'requests': sum(entry['requests'] for entry in entries),
+            'samples': sum(entry['samples'] for entry in entries),
+            'distinct_stacks': len(set().union(*(entry['stacks'] for entry in entries))),
+        }
+
+    def _run(self, stop):
+        own = threading.get_ident()
+        next_flush = time.monotonic() + _sync_interval()
+        try:
+            while not stop.wait(self.config['interval']):
+                if time.monotonic() >= next_flush:
+                    self.flush()
+                    next_flush = time.monotonic() + _sync_interval()
+                with self._lock:
+                    whole_process = self._whole_process > 0
+                    active = set(self._active)
+                if not (active or whole_process):
+                    continue
+                frames = sys._current_frames()
+                if whole_process:
+                    active = frames.keys()
+                active = [thread_id for thread_id in active if thread_id != own]
+                stacks = [collapse(frames[thread_id]) for thread_id in active if thread_id in frames]
+                with self._lock:
+                    for stack in stacks:
+                        if stack not in self.stacks and len(self.stacks) >= self.config['max_stacks']:
+                            stack = TRUNCATED_STACK
+                        self.stacks[stack] += 1
+                    self.samples += len(stacks)
+                    self._dirty = self._dirty or bool(stacks)
+        finally:
+            # Flushing from this thread may have opened a connection.
+            connections.close_all()
+
+
+profiler = SamplingProfiler()
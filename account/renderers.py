@@ -1,14 +1,86 @@
 from rest_framework import renderers
+from rest_framework.exceptions import ErrorDetail
+from django.conf import settings
+from django.utils.functional import Promise
+import datetime
+import decimal
 import json
+import uuid
+
+from .metrics import timed
+
+try:
+  import orjson
+except ImportError:  # optional accelerated backend
+  orjson = None
+
+
+def json_default(obj):
+  """
+  Encode the non-JSON types that reach the renderer: Decimals keep their exact
+  digits as strings, datetimes use the same ISO format as DRF's DateTimeField.
+  """
+  if isinstance(obj, datetime.datetime):
+    value = obj.isoformat()
+    if value.endswith('+00:00'):
+      value = value[:-6] + 'Z'
+    return value
+  if isinstance(obj, (datetime.date, datetime.time)):
+    return obj.isoformat()
+  if isinstance(obj, decimal.Decimal):
+    return str(obj)
+  if isinstance(obj, (uuid.UUID, Promise)):
+    return str(obj)
+  if isinstance(obj, (set, frozenset)):
+    return list(obj)
+  raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _use_orjson():
+  backend = getattr(settings, 'JSON_RENDERER_BACKEND', 'auto')
+  return orjson is not None and backend in ('auto', 'orjson')
+
+
+def dumps(data):
+  """
+  Serialize `data` to compact UTF-8 JSON bytes, with orjson when available.
+  """
+  if _use_orjson():
+    try:
+      return orjson.dumps(data, default=json_default, option=orjson.OPT_PASSTHROUGH_DATETIME)
+    except TypeError:
+      # e.g. integers wider than 64 bits; the stdlib encoder handles them.
+      pass
+  return json.dumps(data, default=json_default, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def has_error_detail(data):
+  """
+  True if `data` contains an ErrorDetail anywhere, i.e. it came from a DRF exception.
+  """
+  stack = [data]
+  while stack:
+    item = stack.pop()
+    if isinstance(item, ErrorDetail):
+      return True
+    if isinstance(item, dict):
+      stack.extend(item.values())
+    elif isinstance(item, (list, tuple)):
+      stack.extend(item)
+  return False
 
 
 class UserRenderer(renderers.JSONRenderer):
   charset='utf-8'
   def render(self, data, accepted_media_type=None, renderer_context=None):
-    response = ''
-    if 'ErrorDetail' in str(data):
-      response = json.dumps({'errors':data})
-    else:
-      response = json.dumps(data)
-    
-    return response
\ No newline at end of file
+    if data is None:
+      return b''
+
+    # Only error responses can carry ErrorDetail, so successful (and
+    # typically large) payloads are never scanned.
+    response = (renderer_context or {}).get('response')
+    if (response is None or response.status_code >= 400) and has_error_detail(data):
+      data = {'errors': data}
+
+    with timed('render'):
+      return dumps(data)
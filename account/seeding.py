@@ -0,0 +1,371 @@
+import bisect
+import csv
+import io
+import itertools
+import math
+import random
+import string
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, time, timedelta, timezone as dt_timezone
+from decimal import Decimal, ROUND_DOWN
+
+from django.contrib.auth.hashers import make_password
+from django.db import connection, transaction
+
+from .holdings import ZERO, next_position
+from .ingest import upsert_stocks
+from .models import Holding, Stock, Transaction, User
+
+
+SEED_EMAIL = 'trader-{}@seed.local'
+SEED_EMAIL_SUFFIX = '@seed.local'
+SEED_PASSWORD = 'seed-password'
+INITIAL_BALANCE = Decimal('5000000.00')
+BATCH_SIZE = 10000
+TRANSACTION_COLUMNS = ('user_id', 'stock_id', 'transaction_type', 'quantity', 'price_each', 'total_price', 'timestamp')
+
+# Trades cluster into sessions inside US market hours (13:30-20:00 UTC) on weekdays.
+SESSION_OPEN = timedelta(hours=13, minutes=30)
+SESSION_LENGTH = timedelta(hours=6, minutes=30).total_seconds()
+TRADES_PER_SESSION = 6
+TRADE_GAP_SECONDS = 90
+SELL_PROBABILITY = 0.4
+PRICE_VOLATILITY = 0.08
+MAX_WATCHLIST = 50
+MAX_ORDER_QUANTITY = 1000
+
+
+def symbol_universe(count, rng):
+    """
+    `count` distinct ticker-like symbols (2-5 letters, some with a '.X' share
+    class suffix), in a seeded order.
+    """
+    symbols, seen = [], set()
+    while len(symbols) < count:
+        symbol = ''.join(rng.choices(string.ascii_uppercase, k=rng.choice((2, 3, 3, 4, 4, 4, 5))))
+        if rng.random() < 0.02:
+            symbol += '.' + rng.choice('ABC')
+        if symbol not in seen:
+            seen.add(symbol)
+            symbols.append(symbol)
+    return symbols
+
+
+def zipf_weights(count, alpha, rng):
+    """
+    Power-law weights (rank ** -alpha), shuffled so rank is not tied to row order.
+    """
+    weights = [(rank + 1) ** -alpha for rank in range(count)]
+    rng.shuffle(weights)
+    return weights
+
+
+def allocate(total, weights):
+    """
+    Split `total` into integer shares proportional to `weights` (largest remainder).
+    """
+    scale = total / sum(weights)
+    exact = [weight * scale for weight in weights]
+    shares = [int(value) for value in exact]
+    by_remainder = sorted(range(len(weights)), key=lambda i: exact[i] - shares[i], reverse=True)
+    for i in by_remainder[:total - sum(shares)]:
+        shares[i] += 1
+    return shares
+
+
+def trading_days(start, end):
+    day = start
+    days = []
+    while day < end:
+        if day.weekday() < 5:
+            days.append(day)
+        day += timedelta(days=1)
+    return days
+
+
+class Market:
+    """
+    The fixed inputs every trader draws from: stock ids with base prices and
+    popularity, and the trading days of the seeded period.
+    """
+
+    def __init__(self, stocks, symbol_alpha, days, end, seed):
+        rng = random.Random(f"{seed}:market")
+        self.stocks = stocks
+        self.popularity = list(itertools.accumulate(zipf_weights(len(stocks), symbol_alpha, rng)))
+        end = datetime.combine(end, time.min, tzinfo=dt_timezone.utc)
+        self.days = trading_days(end - timedelta(days=days), end) or [end - timedelta(days=1)]
+        self.seed = seed
+
+    @staticmethod
+    def quote(rng, base_price):
+        return max(
+            Decimal('0.01'),
+            (base_price * Decimal(math.exp(rng.gauss(0, PRICE_VOLATILITY)))).quantize(Decimal('.01')),
+        )
+
+    def pick_stocks(self, rng, count):
+        total = self.popularity[-1]
+        picks = {self.stocks[bisect.bisect(self.popularity, rng.random() * total)] for _ in range(count)}
+        return sorted(picks)
+
+    def timestamps(self, rng, count):
+        """
+        `count` strictly increasing timestamps grouped into trading sessions:
+        a burst of trades a minute or two apart, at a random time of a random
+        trading day.
+        """
+        sessions = max(1, round(count / TRADES_PER_SESSION))
+        starts = sorted(
+            rng.choice(self.days) + SESSION_OPEN + timedelta(seconds=rng.random() * SESSION_LENGTH)
+            for _ in range(sessions)
+        )
+        sizes = allocate(count, [rng.expovariate(1) + 0.1 for _ in range(sessions)])
+        moments = []
+        for start, size in zip(starts, sizes):
+            offset = 0.0
+            for _ in range(size):
+                offset += rng.expovariate(1 / TRADE_GAP_SECONDS)
+                moments.append(start + timedelta(seconds=offset))
+        moments.sort()
+        for i in range(1, len(moments)):
+            if moments[i] <= moments[i - 1]:
+                moments[i] = moments[i - 1] + timedelta(microseconds=1)
+        return moments
+
+
+def trader_history(market, index, count):
+    """
+    Generate the trades of one seeded user, in execution order.
+
+    Every trader has a watchlist drawn by symbol popularity, buys only what
+    the running cash balance allows and only sells shares already held, so
+    the history replays cleanly through `next_position`. Seeded per user, so
+    the result does not depend on batching or worker count.
+
+    Returns:
+        tuple: (trades, positions, balance) where trades are
+        (stock_id, transaction_type, quantity, price_each, total_price, timestamp)
+        tuples and positions is {stock_id: (quantity, cost_basis)}.
+    """
+    rng = random.Random(f"{market.seed}:user:{index}")
+    watchlist = market.pick_stocks(rng, min(MAX_WATCHLIST, 2 + int(rng.paretovariate(1.2))))
+    balance = INITIAL_BALANCE
+    positions = {}
+    trades = []
+
+    for moment in market.timestamps(rng, count):
+        held = [stock for stock in watchlist if positions.get(stock[0], (0, ZERO))[0] > 0]
+        selling = held and (rng.random() < SELL_PROBABILITY)
+        stock_id, base_price = rng.choice(held if selling else watchlist)
+        price_each = market.quote(rng, base_price)
+        quantity, cost_basis = positions.get(stock_id, (0, ZERO))
+
+        if selling:
+            trade_quantity = rng.randint(1, quantity)
+            transaction_type = Transaction.SELL
+        else:
+            trade_quantity = min(int(rng.paretovariate(1.5)), MAX_ORDER_QUANTITY, int(balance / price_each))
+            transaction_type = Transaction.BUY
+            if trade_quantity < 1:
+                # Out of cash: liquidate a position instead.
+                if not held:
+                    continue
+                stock_id, base_price = rng.choice(held)
+                price_each = market.quote(rng, base_price)
+                quantity, cost_basis = positions[stock_id]
+                trade_quantity = quantity
+                transaction_type = Transaction.SELL
+
+        total_price = (price_each * trade_quantity).quantize(Decimal('.01'), rounding=ROUND_DOWN)
+        balance += total_price if transaction_type == Transaction.SELL else -total_price
+        positions[stock_id] = next_position(quantity, cost_basis, transaction_type, trade_quantity, total_price)
+        trades.append((stock_id, transaction_type, trade_quantity, price_each, total_price, moment))
+
+    return trades, positions, balance
+
+
+def _copy_rows(rows):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for user_id, stock_id, transaction_type, quantity, price_each, total_price, moment in rows:
+        writer.writerow((user_id, stock_id, transaction_type, quantity, price_each, total_price, moment.isoformat()))
+    buffer.seek(0)
+    return buffer
+
+
+def write_transactions(rows):
+    """
+    Insert one batch of transaction rows with explicit timestamps.
+
+    Goes through COPY on PostgreSQL and a plain executemany elsewhere; both
+    bypass `auto_now_add`, which would otherwise stamp every row with now.
+    """
+    table = connection.ops.quote_name(Transaction._meta.db_table)
+    columns = ', '.join(connection.ops.quote_name(column) for column in TRANSACTION_COLUMNS)
+    with transaction.atomic(), connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.copy_expert(f"COPY {table} ({columns}) FROM STDIN WITH (FORMAT csv)", _copy_rows(rows))
+        else:
+            ops = connection.ops
+            cursor.executemany(
+                f"INSERT INTO {table} ({columns}) VALUES ({', '.join(['%s'] * len(TRANSACTION_COLUMNS))})",
+                [
+                    (
+                        user_id, stock_id, transaction_type, quantity,
+                        ops.adapt_decimalfield_value(price_each), ops.adapt_decimalfield_value(total_price),
+                        ops.adapt_datetimefield_value(moment),
+                    )
+                    for user_id, stock_id, transaction_type, quantity, price_each, total_price, moment in rows
+                ],
+            )
+    return len(rows)
+
+
+class ParallelWriter:
+    """
+    Writes batches on a pool of threads, each with its own connection, while
+    the caller keeps generating. At most `workers * 2` batches are queued, so
+    memory stays bounded. SQLite allows a single writer, so it gets one.
+    """
+
+    def __init__(self, workers, on_written=None):
+        self.workers = 1 if connection.vendor == 'sqlite' else max(1, workers)
+        self.on_written = on_written
+        self._slots = threading.BoundedSemaphore(self.workers * 2)
+        self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='seed-writer')
+        self._futures = []
+
+    def submit(self, rows):
+        self._slots.acquire()
+        future = self._pool.submit(self._write, rows)
+        self._futures.append(future)
+
+    def _write(self, rows):
+        try:
+            written = write_transactions(rows)
+        finally:
+            connection.close()
+            self._slots.release()
+        if self.on_written is not None:
+            self.on_written(written)
+        return written
+
+    def close(self):
+        self._pool.shutdown(wait=True)
+        # Surface the first failed batch.
+        return sum(future.result() for future in self._futures)
+
+
+def seed_stocks(count, seed):
+    """
+    Make sure the seeded symbol universe exists. Missing symbols are inserted
+    through the regular ingest path, so they get a PriceTick like any other
+    new stock; symbols that already exist keep their current price.
+
+    Returns:
+        list: (stock_id, last_price) pairs for the whole universe.
+    """
+    rng = random.Random(f"{seed}:symbols")
+    symbols = symbol_universe(count, rng)
+    existing = set(Stock.objects.filter(symbol__in=symbols).values_list('symbol', flat=True))
+    upsert_stocks(
+        {
+            'symbol': symbol,
+            'name': f"{symbol} Holdings",
+            'last_price': f"{min(1 + math.exp(rng.gauss(3.5, 1.0)), 99999):.2f}",  # log-normal, mostly $10-$300
+        }
+        for symbol in symbols if symbol not in existing
+    )
+    return list(Stock.objects.filter(symbol__in=symbols).order_by('id').values_list('id', 'last_price'))
+
+
+def seed_users(count):
+    """
+    Create the seeded users, which all share one password.
+
+    Returns:
+        list: user ids in seed order.
+
+    Raises:
+        ValueError: If seeded users already have transactions.
+    """
+    emails = [SEED_EMAIL.format(i) for i in range(count)]
+    if Transaction.objects.filter(user__email__endswith=SEED_EMAIL_SUFFIX).exists():
+        raise ValueError("Seeded users already have transactions.")
+    existing = set(User.objects.filter(email__in=emails).values_list('email', flat=True))
+    password = make_password(SEED_PASSWORD)
+    User.objects.bulk_create(
+        [
+            User(email=email, name=f"Trader {i}", password=password, current_balance=INITIAL_BALANCE)
+            for i, email in enumerate(emails) if email not in existing
+        ],
+        batch_size=BATCH_SIZE,
+    )
+    ids = dict(User.objects.filter(email__in=emails).values_list('email', 'id'))
+    return [ids[email] for email in emails]
+
+
+def reset():
+    """
+    Delete seeded users with their transactions and holdings.
+
+    Returns:
+        int: Number of transactions removed.
+    """
+    users = User.objects.filter(email__endswith=SEED_EMAIL_SUFFIX)
+    removed, _ = Transaction.objects.filter(user__in=users).delete()
+    Holding.objects.filter(user__in=users).delete()
+    users.delete()
+    return removed
+
+
+def seed_market(users, symbols, transactions, seed=0, days=365, end=None, user_alpha=1.1, symbol_alpha=1.2,
+                batch_size=BATCH_SIZE, workers=4, on_written=None):
+    """
+    Generate a synthetic market: `users` traders, a `symbols`-wide stock
+    universe and about `transactions` trades over the `days` days before
+    `end` (a date, default today).
+
+    Activity follows a power law across users (`user_alpha`) and symbols
+    (`symbol_alpha`); trades are clustered in sessions. Transactions are
+    streamed to the database in `batch_size` batches written by `workers`
+    threads; balances and holdings are written afterwards to match the
+    generated history. The same arguments (including `end`) always produce
+    the same data.
+
+    Returns:
+        dict: {'users', 'stocks', 'transactions', 'holdings'} counts.
+    """
+    stocks = seed_stocks(symbols, seed)
+    user_ids = seed_users(users)
+    market = Market(stocks, symbol_alpha, days, end or date.today(), seed)
+    counts = allocate(transactions, zipf_weights(len(user_ids), user_alpha, random.Random(f"{seed}:users")))
+
+    writer = ParallelWriter(workers, on_written=on_written)
+    balances, holdings, batch = [], [], []
+    try:
+        for index, (user_id, count) in enumerate(zip(user_ids, counts)):
+            trades, positions, balance = trader_history(market, index, count)
+            for trade in trades:
+                batch.append((user_id, *trade))
+                if len(batch) >= batch_size:
+                    writer.submit(batch)
+                    batch = []
+            balances.append(User(id=user_id, current_balance=balance))
+            holdings.extend(
+                Holding(user_id=user_id, stock_id=stock_id, quantity=quantity, cost_basis=cost_basis)
+                for stock_id, (quantity, cost_basis) in positions.items() if quantity
+            )
+        if batch:
+            writer.submit(batch)
+    finally:
+        written = writer.close()
+
+    with transaction.atomic():
+        User.objects.bulk_update(balances, ['current_balance'], batch_size=1000)
+        Holding.objects.filter(user_id__in=user_ids).delete()
+        Holding.objects.bulk_create(holdings, batch_size=BATCH_SIZE)
+
+    return {'users': len(user_ids), 'stocks': len(stocks), 'transactions': written, 'holdings': len(holdings)}
@@ -6,10 +6,12 @@ from .models import (
     User,
     Stock,
     Transaction,
+    Holding,
 )
+from .trading import execute_trade, TradeRejected
+from .constants import MAX_BATCH_TRADES
 from django.contrib.auth.tokens import PasswordResetTokenGenerator
-from decimal import Decimal, ROUND_DOWN
-from django.db.models import Sum
+from decimal import Decimal
 from rest_framework import serializers
 
 
@@ -99,22 +101,10 @@ class TransactionSerializer(serializers.ModelSerializer):
             if user.current_balance < total_cost:
                 raise serializers.ValidationError("Insufficient balance for this purchase.")
         elif transaction_type == Transaction.SELL:
-           
-            total_bought = Transaction.objects.filter(
+            available_quantity = Holding.objects.filter(
                 user=user,
-                stock=stock,
-                transaction_type=Transaction.BUY
-            ).aggregate(total=Sum('quantity'))['total'] or 0
-
-      
-            total_sold = Transaction.objects.filter(
-                user=user,
-                stock=stock,
-                transaction_type=Transaction.SELL
-            ).aggregate(total=Sum('quantity'))['total'] or 0
-
-
-            available_quantity = total_bought - total_sold
+                stock=stock
+            ).values_list('quantity', flat=True).first() or 0
 
             if quantity > available_quantity:
                 raise serializers.ValidationError(
@@ -126,20 +116,44 @@ class TransactionSerializer(serializers.ModelSerializer):
     def create(self, validated_data):
         user = self.context['request'].user
 
-        total_price = (validated_data['price_each'] * validated_data['quantity']).quantize(
-            Decimal('.01'), rounding=ROUND_DOWN
-        )
-        validated_data['total_price'] = total_price
-
-        transaction_created = Transaction.objects.create(user=user, **validated_data)
-
-        if transaction_created.transaction_type == Transaction.BUY:
-            user.current_balance -= transaction_created.total_price
-        else:
-            user.current_balance += transaction_created.total_price
-        user.save(update_fields=['current_balance'])
-
-        return transaction_created
+        try:
+            return execute_trade(
+                user,
+                validated_data['stock'],
+                validated_data['transaction_type'],
+                validated_data['quantity'],
+                validated_data['price_each'],
+                idempotency=self.context.get('idempotency'),
+            )
+        except TradeRejected as exc:
+            raise serializers.ValidationError(str(exc))
+
+
+class TradeOrderSerializer(serializers.Serializer):
+    """
+    Shape validation for a single order inside a batch submission.
+    Balance and holdings checks happen later, under lock, in the trade engine.
+    """
+    stock = serializers.CharField(max_length=10)
+    transaction_type = serializers.ChoiceField(choices=Transaction.TYPE_CHOICES)
+    quantity = serializers.IntegerField(min_value=1)
+    price_each = serializers.DecimalField(max_digits=10, decimal_places=2, min_value=Decimal('0.01'))
+
+    def validate_stock(self, value):
+        # Symbols are stored upper-case (see Stock.save).
+        return value.upper()
+
+
+class BatchTransactionSerializer(serializers.Serializer):
+    ATOMIC = 'atomic'
+    BEST_EFFORT = 'best_effort'
+
+    mode = serializers.ChoiceField(choices=[ATOMIC, BEST_EFFORT], default=ATOMIC)
+    trades = serializers.ListField(
+        child=serializers.DictField(),
+        allow_empty=False,
+        max_length=MAX_BATCH_TRADES,
+    )
 
 
 class TransactionListSerializer(serializers.ModelSerializer):
@@ -148,3 +162,40 @@ class TransactionListSerializer(serializers.ModelSerializer):
     class Meta:
         model = Transaction
         fields = ['stock', 'transaction_type', 'quantity', 'price_each', 'total_price', 'timestamp']
+
+
+class PriceBarSerializer(serializers.Serializer):
+    timestamp = serializers.DateTimeField(source='bucket')
+    open = serializers.DecimalField(max_digits=10, decimal_places=2)
+    high = serializers.DecimalField(max_digits=10, decimal_places=2)
+    low = serializers.DecimalField(max_digits=10, decimal_places=2)
+    close = serializers.DecimalField(max_digits=10, decimal_places=2)
+    ticks = serializers.IntegerField()
+
+
+class PortfolioPositionSerializer(serializers.Serializer):
+    symbol = serializers.CharField()
+    name = serializers.CharField()
+    quantity = serializers.IntegerField()
+    average_cost = serializers.DecimalField(max_digits=16, decimal_places=2)
+    cost_basis = serializers.DecimalField(max_digits=16, decimal_places=2)
+    last_price = serializers.DecimalField(max_digits=10, decimal_places=2)
+    market_value = serializers.DecimalField(max_digits=16, decimal_places=2)
+    unrealized_pnl = serializers.DecimalField(max_digits=16, decimal_places=2)
+
+
+class PortfolioTotalsSerializer(serializers.Serializer):
+    cost_basis = serializers.DecimalField(max_digits=16, decimal_places=2)
+    market_value = serializers.DecimalField(max_digits=16, decimal_places=2)
+    unrealized_pnl = serializers.DecimalField(max_digits=16, decimal_places=2)
+
+
+class ProfilerToggleSerializer(serializers.Serializer):
+    enabled = serializers.BooleanField()
+    path = serializers.CharField(required=False, allow_null=True, default=None)
+    method = serializers.ChoiceField(
+        choices=['GET', 'POST', 'PUT', 'PATCH', 'DELETE'], required=False, allow_null=True, default=None
+    )
+    fraction = serializers.FloatField(min_value=0.0, max_value=1.0, default=1.0)
+    interval_ms = serializers.FloatField(min_value=1.0, max_value=1000.0, default=5.0)
+    reset = serializers.BooleanField(default=False)
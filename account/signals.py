@@ -0,0 +1,41 @@
+from functools import partial
+
+from django.core.signals import request_finished, request_started
+from django.db import transaction
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .authentication import invalidate_user_status
+from .cache import invalidate_stocks
+from .db import check_connections, mark_connections_used, record_connection
+from .metrics import install_query_recorder
+from .models import Stock, User
+from .streaming import price_update, publish_prices
+
+
+@receiver(post_save, sender=Stock)
+@receiver(post_delete, sender=Stock)
+def stock_changed(sender, **kwargs):
+    # After commit, so no worker can re-cache the old row under the new version.
+    transaction.on_commit(invalidate_stocks)
+
+
+@receiver(post_save, sender=Stock)
+def stock_saved(sender, instance, **kwargs):
+    update = price_update(instance.symbol, instance.last_price, instance.updated_at)
+    transaction.on_commit(partial(publish_prices, [update]))
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def user_changed(sender, instance, **kwargs):
+    invalidate_user_status(instance.pk)
+
+
+# Runs after Django's own close_old_connections, so only connections that are
+# still within CONN_MAX_AGE get pinged.
+request_started.connect(check_connections, dispatch_uid='account.check_connections')
+request_finished.connect(mark_connections_used, dispatch_uid='account.mark_connections_used')
+connection_created.connect(record_connection, dispatch_uid='account.record_connection')
+connection_created.connect(install_query_recorder, dispatch_uid='account.install_query_recorder')
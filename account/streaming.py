@@ -0,0 +1,266 @@
+import asyncio
+import io
+import json
+import logging
+import threading
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.utils.module_loading import import_string
+from rest_framework.exceptions import APIException, NotAuthenticated, ValidationError
+
+from .authentication import StatelessJWTAuthentication
+from .cache import get_symbol
+from .renderers import dumps, has_error_detail, json_default
+
+
+logger = logging.getLogger(__name__)
+
+STREAM_PATH = '/api/user/stream/prices/'
+
+
+def price_update(symbol, last_price, updated_at):
+    return {'symbol': symbol, 'last_price': str(last_price), 'updated_at': json_default(updated_at)}
+
+
+class Subscription:
+    """
+    One stream consumer. Holds at most one pending update per symbol: a newer
+    price replaces the unsent one, so a slow consumer gets the latest prices
+    instead of an ever-growing backlog.
+    """
+
+    def __init__(self, broker, symbols, loop):
+        self.broker = broker
+        self.symbols = frozenset(symbols)
+        self.loop = loop
+        self.coalesced = 0
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._ready = asyncio.Event()
+
+    def offer(self, update):
+        """
+        Queue an update; safe to call from any thread.
+        """
+        with self._lock:
+            if update['symbol'] in self._pending:
+                self.coalesced += 1
+            self._pending[update['symbol']] = update
+        self.wake()
+
+    def wake(self):
+        try:
+            self.loop.call_soon_threadsafe(self._ready.set)
+        except RuntimeError:
+            # The consumer's event loop is gone; it is about to unsubscribe.
+            pass
+
+    async def next_batch(self, timeout):
+        """
+        Wait up to `timeout` seconds for updates and drain them.
+
+        Returns:
+            list[dict]: pending updates, oldest symbol first; empty on timeout.
+        """
+        try:
+            await asyncio.wait_for(self._ready.wait(), timeout)
+        except asyncio.TimeoutError:
+            return []
+        self._ready.clear()
+        with self._lock:
+            batch, self._pending = list(self._pending.values()), {}
+        return batch
+
+    def close(self):
+        self.broker.unsubscribe(self)
+
+
+class InMemoryBroker:
+    """
+    Fans price updates out to subscriptions in this process. Enough for tests
+    and single-worker deployments; use RedisBroker across workers.
+    """
+
+    def __init__(self):
+        self._subscriptions = {}
+        self._lock = threading.Lock()
+
+    def subscribe(self, symbols, loop):
+        subscription = Subscription(self, symbols, loop)
+        with self._lock:
+            for symbol in subscription.symbols:
+                self._subscriptions.setdefault(symbol, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            for symbol in subscription.symbols:
+                subscribers = self._subscriptions.get(symbol)
+                if subscribers is not None:
+                    subscribers.discard(subscription)
+                    if not subscribers:
+                        del self._subscriptions[symbol]
+
+    def publish(self, updates):
+        self.deliver(updates)
+
+    def deliver(self, updates):
+        for update in updates:
+            with self._lock:
+                subscribers = list(self._subscriptions.get(update['symbol'], ()))
+            for subscription in subscribers:
+                subscription.offer(update)
+
+
+class RedisBroker(InMemoryBroker):
+    """
+    Publishes updates to a Redis channel; a listener thread per process
+    delivers them to that process's subscriptions. Requires the `redis` package.
+    """
+
+    def __init__(self, url=None, channel='stock-prices'):
+        super().__init__()
+        import redis
+
+        self.client = redis.Redis.from_url(url or settings.PRICE_STREAM_REDIS_URL)
+        self.channel = channel
+        self._listener = None
+        self._listener_lock = threading.Lock()
+
+    def subscribe(self, symbols, loop):
+        with self._listener_lock:
+            if self._listener is None:
+                self._listener = threading.Thread(target=self._listen, name='price-stream-redis', daemon=True)
+                self._listener.start()
+        return super().subscribe(symbols, loop)
+
+    def publish(self, updates):
+        self.client.publish(self.channel, dumps(updates))
+
+    def _listen(self):
+        pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+        pubsub.subscribe(self.channel)
+        for message in pubsub.listen():
+            try:
+                self.deliver(json.loads(message['data']))
+            except (TypeError, ValueError):
+                logger.warning("Ignoring malformed price stream message: %r", message['data'])
+
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker():
+    global _broker
+    with _broker_lock:
+        if _broker is None:
+            _broker = import_string(settings.PRICE_STREAM_BROKER)()
+        return _broker
+
+
+def publish_prices(updates):
+    """
+    Broadcast price updates (see price_update()) to stream subscribers.
+    Failures are logged, never raised, so ingest cannot fail on the stream.
+    """
+    if not updates:
+        return
+    try:
+        get_broker().publish(updates)
+    except Exception:
+        logger.exception("Failed to publish %d price updates", len(updates))
+
+
+def _snapshot(symbols):
+    updates = []
+    for symbol in symbols:
+        for entry in get_symbol(symbol):
+            updates.append(price_update(entry['data']['symbol'], entry['data']['last_price'], entry['updated_at']))
+    return updates
+
+
+def _events(updates):
+    return b''.join(b'event: price\ndata: ' + dumps(update) + b'\n\n' for update in updates)
+
+
+async def _respond_exception(send, exc):
+    # Same body as a DRF view rendered through UserRenderer.
+    data = exc.detail if isinstance(exc.detail, (list, dict)) else {'detail': exc.detail}
+    if has_error_detail(data):
+        data = {'errors': data}
+    headers = [(b'content-type', b'application/json')]
+    if exc.status_code == 401:
+        headers.append((b'www-authenticate', StatelessJWTAuthentication().authenticate_header(None).encode()))
+    await send({'type': 'http.response.start', 'status': exc.status_code, 'headers': headers})
+    await send({'type': 'http.response.body', 'body': dumps(data)})
+
+
+async def price_stream(scope, receive, send):
+    """
+    GET /api/user/stream/prices/?symbols=AAPL,MSFT
+
+    ASGI app streaming Server-Sent Events: a `price` event per symbol with
+    its current price, then one whenever ingest changes it. Updates for the
+    same symbol are coalesced over PRICE_STREAM_COALESCE_INTERVAL, and a
+    client that cannot take a write within PRICE_STREAM_SEND_TIMEOUT is
+    disconnected. A comment line is sent every PRICE_STREAM_KEEPALIVE seconds
+    when idle.
+
+    Error:
+    - 400 Bad Request if symbols is missing or lists too many symbols
+    - 401 Unauthorized without a valid access token
+    """
+    request = ASGIRequest(scope, io.BytesIO())
+    try:
+        if await StatelessJWTAuthentication().aauthenticate(request) is None:
+            raise NotAuthenticated()
+
+        raw = request.GET.get('symbols', '')
+        symbols = sorted({symbol.strip().upper() for symbol in raw.split(',') if symbol.strip()})
+        if not symbols or len(symbols) > settings.PRICE_STREAM_MAX_SYMBOLS:
+            raise ValidationError({'symbols': [
+                f"Provide between 1 and {settings.PRICE_STREAM_MAX_SYMBOLS} comma-separated symbols."
+            ]})
+    except APIException as exc:
+        return await _respond_exception(send, exc)
+
+    subscription = get_broker().subscribe(symbols, asyncio.get_running_loop())
+    disconnected = asyncio.Event()
+
+    async def watch_disconnect():
+        while (await receive())['type'] != 'http.disconnect':
+            pass
+        disconnected.set()
+        subscription.wake()
+
+    watcher = asyncio.create_task(watch_disconnect())
+    try:
+        await send({
+            'type': 'http.response.start',
+            'status': 200,
+            'headers': [
+                (b'content-type', b'text/event-stream'),
+                (b'cache-control', b'no-cache'),
+                (b'x-accel-buffering', b'no'),
+            ],
+        })
+        body = _events(await sync_to_async(_snapshot)(symbols))
+        while not disconnected.is_set():
+            try:
+                await asyncio.wait_for(
+                    send({'type': 'http.response.body', 'body': body, 'more_body': True}),
+                    settings.PRICE_STREAM_SEND_TIMEOUT,
+                )
+            except asyncio.TimeoutError:
+                logger.info("Dropping slow price stream consumer for %s", ','.join(symbols))
+                break
+            # Let rapid updates for the same symbol merge before the next write.
+            await asyncio.sleep(settings.PRICE_STREAM_COALESCE_INTERVAL)
+            batch = await subscription.next_batch(settings.PRICE_STREAM_KEEPALIVE)
+            body = _events(batch) if batch else b': keepalive\n\n'
+    finally:
+        subscription.close()
+        watcher.cancel()
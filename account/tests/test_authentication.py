@@ -0,0 +1,99 @@
+from django.core.cache import cache
+from django.test import TestCase, TransactionTestCase
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.test import APIRequestFactory
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.tokens import AccessToken
+
+from account.authentication import USER_STATUS_KEY, StatelessJWTAuthentication
+from account.models import User
+from account.utils import IsAdminUserCustom, get_tokens_for_user
+
+
+def get(token):
+    return APIRequestFactory().get('/api/user/query-stocks/', HTTP_AUTHORIZATION=f'Bearer {token}')
+
+
+class StatelessJWTAuthenticationTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(email='auth@example.com', name='auth', password='pw')
+        cls.admin = User.objects.create_superuser(email='auth-admin@example.com', name='admin', password='pw')
+
+    def setUp(self):
+        cache.clear()
+        self.authentication = StatelessJWTAuthentication()
+
+    def authenticate(self, user_or_token):
+        token = user_or_token if isinstance(user_or_token, str) else get_tokens_for_user(user_or_token)['access']
+        return self.authentication.authenticate(get(token))
+
+    def is_admin(self, user):
+        request = get(get_tokens_for_user(user)['access'])
+        request.user, _ = self.authentication.authenticate(request)
+        return IsAdminUserCustom().has_permission(request, None)
+
+    def test_cached_status_costs_no_query(self):
+        self.authenticate(self.user)
+        with self.assertNumQueries(0):
+            user, _ = self.authenticate(self.user)
+        self.assertEqual(user.id, self.user.id)
+
+    def test_deactivated_user_is_rejected_once_the_cached_status_expires(self):
+        self.authenticate(self.user)
+        # An update that bypasses the post_save invalidation.
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+        self.authenticate(self.user)
+
+        cache.delete(USER_STATUS_KEY.format(self.user.pk))
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate(self.user)
+
+    def test_deactivating_a_user_rejects_them_at_once(self):
+        self.authenticate(self.user)
+        self.user.is_active = False
+        self.user.save(update_fields=['is_active'])
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate(self.user)
+
+    def test_revoked_admin_loses_admin_access(self):
+        self.assertTrue(self.is_admin(self.admin))
+        self.admin.is_admin = False
+        self.admin.save(update_fields=['is_admin'])
+        self.assertFalse(self.is_admin(self.admin))
+
+    def test_admin_flag_without_the_claim_is_not_admin(self):
+        token = AccessToken.for_user(self.admin)
+        request = get(str(token))
+        request.user, _ = self.authentication.authenticate(request)
+        self.assertFalse(IsAdminUserCustom().has_permission(request, None))
+
+    def test_token_without_user_claim_is_rejected(self):
+        token = AccessToken()
+        token['is_admin'] = True
+        with self.assertRaises(InvalidToken):
+            self.authenticate(str(token))
+
+    def test_write_request_loads_the_user_row(self):
+        token = get_tokens_for_user(self.user)['access']
+        request = APIRequestFactory().post('/api/user/transactions/', HTTP_AUTHORIZATION=f'Bearer {token}')
+        user, _ = self.authentication.authenticate(request)
+        self.assertIsInstance(user, User)
+
+
+class AsyncStatelessJWTAuthenticationTests(TransactionTestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(email='async-auth@example.com', name='auth', password='pw')
+        self.token = get_tokens_for_user(self.user)['access']
+
+    async def test_aauthenticate(self):
+        authentication = StatelessJWTAuthentication()
+        user, _ = await authentication.aauthenticate(get(self.token))
+        self.assertEqual(user.id, self.user.id)
+
+        await cache.aset(USER_STATUS_KEY.format(self.user.pk), (False, False))
+        with self.assertRaises(AuthenticationFailed):
+            await authentication.aauthenticate(get(self.token))
@@ -0,0 +1,49 @@
+import io
+import os
+import tempfile
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import SimpleTestCase, TransactionTestCase, override_settings
+
+from account.benchmark import InProcessDriver, run_requests
+
+
+class FixedDriver:
+
+    def __init__(self, statuses):
+        self.statuses = statuses
+
+    def request(self, method, path, token, body):
+        return self.statuses[int(path)]
+
+    def finish_thread(self):
+        pass
+
+
+class RunRequestsTests(SimpleTestCase):
+
+    def test_failures_are_counted_by_status(self):
+        driver = FixedDriver([200, 201, 400, 0, 400, 200])
+        result = run_requests(driver, lambda index: ('GET', str(index), None, None), requests=6, concurrency=2)
+        self.assertEqual((result['requests'], result['errors']), (6, 3))
+        self.assertEqual(result['error_codes'], {'400': 2, '0': 1})
+        self.assertIn('p95_ms', result)
+
+
+# The test runner adds 'testserver' to ALLOWED_HOSTS; production settings don't.
+@override_settings(ALLOWED_HOSTS=['localhost'])
+class BenchmarkCommandTests(TransactionTestCase):
+
+    def test_in_process_driver_passes_host_validation(self):
+        self.assertNotEqual(InProcessDriver().request('GET', '/api/user/query-stocks/', None, None), 400)
+
+    def test_failing_run_is_not_saved(self):
+        path = os.path.join(tempfile.mkdtemp(), 'baseline.json')
+        with override_settings(ALLOWED_HOSTS=['example.com']):
+            with self.assertRaisesMessage(CommandError, "query-stocks {'400': 5}"):
+                call_command(
+                    'benchmark', users=2, stocks=2, transactions=4, scenarios=['query-stocks'],
+                    requests=5, concurrency=1, warmup=0, save=path, stdout=io.StringIO(),
+                )
+        self.assertFalse(os.path.exists(path))
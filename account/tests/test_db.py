@@ -0,0 +1,58 @@
+from unittest import mock
+
+from django.db import connection
+from django.test import SimpleTestCase, override_settings
+
+from account.db import check_connections, mark_connections_used
+from account.metrics import render_pool_stats
+
+
+@override_settings(DB_CONN_HEALTH_CHECKS=True, DB_CONN_HEALTH_CHECK_IDLE=60)
+class HealthCheckTests(SimpleTestCase):
+    databases = {'default'}
+
+    def setUp(self):
+        connection.ensure_connection()
+        self.addCleanup(lambda: connection.__dict__.pop('last_request_at', None))
+
+    def test_recently_used_connection_is_not_pinged(self):
+        mark_connections_used()
+        with mock.patch.object(connection, 'is_usable') as is_usable:
+            check_connections()
+        is_usable.assert_not_called()
+
+    def test_idle_connection_is_pinged(self):
+        connection.last_request_at = 0
+        with mock.patch.object(connection, 'is_usable', return_value=True) as is_usable:
+            check_connections()
+        is_usable.assert_called_once_with()
+
+    @override_settings(DB_CONN_HEALTH_CHECK_IDLE=0)
+    def test_zero_idle_pings_every_request(self):
+        mark_connections_used()
+        with mock.patch.object(connection, 'is_usable', return_value=True) as is_usable:
+            check_connections()
+        is_usable.assert_called_once_with()
+
+
+class PoolMetricsTests(SimpleTestCase):
+
+    @override_settings(DB_POOL='')
+    def test_nothing_without_pgbouncer(self):
+        self.assertEqual(render_pool_stats(), [])
+
+    @override_settings(DB_POOL='pgbouncer')
+    def test_pool_gauges(self):
+        pool = {'database': 'app', 'user': 'app', 'cl_active': 4, 'cl_waiting': 2, 'sv_active': 4, 'sv_idle': 0,
+                'sv_used': 1, 'maxwait': 3}
+        with mock.patch('account.metrics.pool_stats', return_value=[pool]):
+            lines = render_pool_stats()
+        self.assertIn('pgbouncer_up 1', lines)
+        self.assertIn('pgbouncer_pool_cl_waiting{database="app",user="app"} 2', lines)
+        self.assertIn('pgbouncer_pool_maxwait{database="app",user="app"} 3', lines)
+
+    @override_settings(DB_POOL='pgbouncer')
+    def test_unreachable_pgbouncer_is_reported_down(self):
+        with mock.patch('account.metrics.pool_stats', side_effect=OSError('refused')), \
+                self.assertLogs('account.metrics', 'WARNING'):
+            self.assertEqual(render_pool_stats()[-1], 'pgbouncer_up 0')
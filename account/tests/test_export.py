@@ -0,0 +1,77 @@
+from decimal import Decimal
+from unittest import mock
+
+from asgiref.sync import sync_to_async
+from asgiref.testing import ApplicationCommunicator
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
+from rest_framework.test import APIClient
+
+from account.export import export_rows
+from account.handlers import ASGIHandler
+from account.models import Stock, Transaction, User
+from account.utils import get_tokens_for_user
+
+
+def create_history(email):
+    user = User.objects.create_user(email=email, name='export', password='pw')
+    stock = Stock.objects.create(symbol='AAPL', name='Apple', last_price=Decimal('100.00'))
+    for quantity in (1, 2, 3):
+        Transaction.objects.create(
+            user=user, stock=stock, transaction_type=Transaction.BUY,
+            quantity=quantity, price_each=Decimal('100.00'),
+        )
+    return user
+
+
+class ExportTests(TestCase):
+    client_class = APIClient
+
+    def test_csv_export(self):
+        self.client.force_authenticate(user=create_history('export@example.com'))
+        response = self.client.get('/api/user/export/')
+        self.assertEqual(response.status_code, 200)
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual(lines[0], 'stock,transaction_type,quantity,price_each,total_price,timestamp')
+        self.assertEqual([line.split(',')[2] for line in lines[1:]], ['3', '2', '1'])
+
+    def test_keyset_pages_without_server_side_cursors(self):
+        user = create_history('keyset@example.com')
+        # Equal timestamps, so pages have to be split by id.
+        timestamp = Transaction.objects.get(user=user, quantity=1).timestamp
+        Transaction.objects.filter(user=user).update(timestamp=timestamp)
+        queryset = Transaction.objects.filter(user=user).order_by('-timestamp', '-id')
+
+        with mock.patch.dict(connection.settings_dict, {'DISABLE_SERVER_SIDE_CURSORS': True}):
+            with self.assertNumQueries(2):
+                rows = list(export_rows(queryset, chunk_size=2))
+        self.assertEqual([row[2] for row in rows], [3, 2, 1])
+
+
+class AsgiExportTests(TransactionTestCase):
+
+    async def request(self, path, token):
+        communicator = ApplicationCommunicator(ASGIHandler(), {
+            'type': 'http', 'method': 'GET', 'path': path, 'query_string': b'export_format=ndjson',
+            'headers': [(b'host', b'localhost'), (b'authorization', f'Bearer {token}'.encode())],
+        })
+        await communicator.send_input({'type': 'http.request', 'body': b''})
+        start = await communicator.receive_output(timeout=10)
+        body = b''
+        while True:
+            message = await communicator.receive_output(timeout=10)
+            body += message.get('body', b'')
+            if not message.get('more_body'):
+                return start, body
+
+    async def test_export_streams_under_asgi(self):
+        user = await sync_to_async(create_history)('asgi-export@example.com')
+        token = get_tokens_for_user(user)['access']
+
+        # Reading the cursor on the event loop would raise SynchronousOnlyOperation.
+        start, body = await self.request('/api/user/export/', token)
+        self.assertEqual(start['status'], 200)
+        self.assertIn((b'Content-Type', b'application/x-ndjson'), start['headers'])
+        self.assertEqual(body.count(b'\n'), 3)
+        self.assertIn(b'"quantity":3', body.splitlines()[0])
+
@@ -0,0 +1,75 @@
+import random
+from decimal import Decimal
+
+from django.test import TestCase
+from rest_framework.test import APIRequestFactory
+
+from account.fastpath import row_builder
+from account.models import Stock, Transaction, User
+from account.renderers import UserRenderer
+from account.serializers import StockSerializer, TransactionListSerializer, TransactionSerializer
+
+
+ROWS = 200
+
+
+class FastPathParityTests(TestCase):
+    """
+    For every serializer with a fast path, the precompiled RowBuilder over
+    `values()` renders byte-for-byte what `Serializer(rows, many=True).data`
+    renders.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        rng = random.Random(0)
+        cls.user = User.objects.create(email="parity@example.com", name="parity")
+        stocks = [
+            Stock.objects.create(
+                symbol=f"PAR{i}",
+                name=f"Parity Ünïcode {i}",
+                last_price=Decimal(rng.choice(['0.01', '5', '99999999.99', '1234.5'])),
+            )
+            for i in range(4)
+        ]
+        Transaction.objects.bulk_create(
+            Transaction(
+                user=cls.user,
+                stock=rng.choice(stocks),
+                transaction_type=rng.choice([Transaction.BUY, Transaction.SELL]),
+                quantity=rng.randint(1, 10 ** 6),
+                price_each=Decimal(rng.randint(1, 10 ** 9)) / 100,
+                total_price=Decimal(rng.randint(1, 10 ** 11)) / 100,
+            )
+            for _ in range(ROWS)
+        )
+
+    def assertRendersLikeSerializer(self, serializer_data, queryset, build):
+        renderer = UserRenderer()
+        expected = renderer.render(serializer_data)
+        actual = renderer.render([build(row) for row in queryset.values(*build.columns)])
+        self.assertEqual(actual, expected)
+
+    def transactions(self):
+        return Transaction.objects.filter(user=self.user).order_by('-timestamp', '-id')
+
+    def test_transaction_serializer(self):
+        request = APIRequestFactory(SERVER_NAME='localhost').get('/')
+        self.assertRendersLikeSerializer(
+            TransactionSerializer(
+                self.transactions().select_related('stock'), many=True, context={'request': request}
+            ).data,
+            self.transactions(), row_builder(TransactionSerializer, ('user_balance',)),
+        )
+
+    def test_transaction_list_serializer(self):
+        self.assertRendersLikeSerializer(
+            TransactionListSerializer(self.transactions().select_related('stock'), many=True).data,
+            self.transactions(), row_builder(TransactionListSerializer),
+        )
+
+    def test_stock_serializer(self):
+        stocks = Stock.objects.order_by('id')
+        self.assertRendersLikeSerializer(
+            StockSerializer(stocks, many=True).data, stocks, row_builder(StockSerializer),
+        )
@@ -0,0 +1,47 @@
+from decimal import Decimal
+from unittest import skipUnless
+
+from django.db import connection
+from django.test import TestCase
+
+from account.filters import filter_transactions
+from account.models import Stock, Transaction, User
+from account.pagination import TransactionCursorPagination
+
+
+@skipUnless(connection.vendor == 'postgresql', "Plans are checked against PostgreSQL's EXPLAIN output.")
+class TransactionFilterPlanTests(TestCase):
+    """
+    The first page of query-transactions must be planned on the composite
+    index matching each filter shape. Sequential scans are disabled so the
+    result does not depend on how much data the table holds.
+    """
+    # (query params, index the planner is expected to use)
+    CASES = [
+        ({}, 'txn_user_ts_id_idx'),
+        ({'date_after': '2025-01-01', 'date_before': '2025-12-31'}, 'txn_user_ts_id_idx'),
+        ({'stock': 'aapl'}, 'txn_user_stock_ts_idx'),
+        ({'stock': 'aapl', 'date_after': '2025-01-01'}, 'txn_user_stock_ts_idx'),
+        ({'transaction_type': 'sell'}, 'txn_user_type_ts_idx'),
+        ({'transaction_type': 'buy', 'min_price': '100', 'max_price': '400'}, 'txn_user_type_ts_idx'),
+    ]
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(email='plans@example.com', name='plans', password='pw')
+        stock = Stock.objects.create(symbol='AAPL', name='Apple', last_price=Decimal('150.00'))
+        Transaction.objects.create(
+            user=cls.user, stock=stock, transaction_type=Transaction.BUY,
+            quantity=1, price_each=Decimal('150.00'), total_price=Decimal('150.00'),
+        )
+
+    def test_filters_use_composite_indexes(self):
+        with connection.cursor() as cursor:
+            cursor.execute("SET LOCAL enable_seqscan = off")
+
+        page_size = TransactionCursorPagination.page_size
+        for params, index_name in self.CASES:
+            with self.subTest(**params):
+                queryset = filter_transactions(Transaction.objects.filter(user_id=self.user.id), params)
+                plan = queryset.order_by(*TransactionCursorPagination.ordering)[:page_size + 1].explain()
+                self.assertIn(index_name, plan)
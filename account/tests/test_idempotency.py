@@ -0,0 +1,140 @@
+import threading
+from decimal import Decimal
+from unittest import mock
+
+from django.core.cache import caches
+from django.db import connections
+from django.test import TestCase, TransactionTestCase
+from rest_framework.test import APIClient
+
+from account.idempotency import IdempotencyClaim, KeyConflict
+from account.models import IdempotencyKey, Stock, Transaction, User
+from account.trading import execute_trade
+
+
+BUY = {'stock': 'AAPL', 'transaction_type': 'BUY', 'quantity': 2, 'price_each': '100.00'}
+
+
+class IdempotencyKeyTests(TestCase):
+    client_class = APIClient
+
+    def setUp(self):
+        caches['default'].clear()
+        self.user = User.objects.create_user(
+            email='idem@example.com', name='idem', password='pw', current_balance=Decimal('1000.00')
+        )
+        self.stock = Stock.objects.create(symbol='AAPL', name='Apple', last_price=Decimal('100.00'))
+        self.client.force_authenticate(user=self.user)
+
+    def post(self, key, body=BUY, path='/api/user/transactions/'):
+        return self.client.post(path, body, format='json', HTTP_IDEMPOTENCY_KEY=key)
+
+    def test_retry_replays_the_stored_response(self):
+        first = self.post('order-1')
+        self.assertEqual(first.status_code, 201)
+        # Served from the table, not just the cache.
+        caches['default'].clear()
+        retry = self.post('order-1')
+
+        self.assertEqual((retry.status_code, retry.content), (201, first.content))
+        self.assertEqual(retry['Idempotent-Replayed'], 'true')
+        self.assertEqual(Transaction.objects.filter(user=self.user).count(), 1)
+
+    def test_key_reused_for_another_request_is_refused(self):
+        self.post('order-1')
+        response = self.post('order-1', {**BUY, 'quantity': 3})
+        self.assertEqual(response.status_code, 422)
+        self.assertEqual(Transaction.objects.filter(user=self.user).count(), 1)
+
+    def test_rejected_request_is_not_stored(self):
+        response = self.post('order-1', {**BUY, 'quantity': 50})
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(IdempotencyKey.objects.exists())
+
+        self.user.current_balance = Decimal('10000.00')
+        self.user.save(update_fields=['current_balance'])
+        self.assertEqual(self.post('order-1', {**BUY, 'quantity': 50}).status_code, 201)
+
+    def test_duplicate_that_loses_the_race_is_rolled_back(self):
+        self.post('order-1')
+        # A second request that got past the lookup before the first committed.
+        claim = IdempotencyClaim(self.user.id, 'order-1', 'fingerprint')
+        claim.render = lambda instance: (201, {})
+        with self.assertRaises(KeyConflict):
+            execute_trade(self.user, self.stock, Transaction.BUY, 2, Decimal('100.00'), idempotency=claim)
+
+        self.assertEqual(Transaction.objects.filter(user=self.user).count(), 1)
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.current_balance, Decimal('800.00'))
+
+    def test_duplicate_is_replayed_before_the_balance_check(self):
+        self.user.current_balance = Decimal('200.00')
+        self.user.save(update_fields=['current_balance'])
+        self.post('order-1')
+        # The first request spent the whole balance; the duplicate must not be
+        # rejected for it.
+        claim = IdempotencyClaim(self.user.id, 'order-1', 'fingerprint')
+        claim.render = lambda instance: (201, {})
+        with self.assertRaises(KeyConflict):
+            execute_trade(self.user, self.stock, Transaction.BUY, 2, Decimal('100.00'), idempotency=claim)
+
+    def test_batch_retry_replays_the_stored_response(self):
+        body = {'mode': 'atomic', 'trades': [BUY, {**BUY, 'quantity': 1}]}
+        first = self.post('batch-1', body, path='/api/user/transactions/batch/')
+        self.assertEqual(first.status_code, 201)
+        retry = self.post('batch-1', body, path='/api/user/transactions/batch/')
+
+        self.assertEqual((retry.status_code, retry.content), (201, first.content))
+        self.assertEqual(Transaction.objects.filter(user=self.user).count(), 2)
+
+
+class ConcurrentIdempotencyKeyTests(TransactionTestCase):
+
+    def setUp(self):
+        caches['default'].clear()
+        self.user = User.objects.create_user(
+            email='idem-race@example.com', name='idem', password='pw', current_balance=Decimal('200.00')
+        )
+        Stock.objects.create(symbol='AAPL', name='Apple', last_price=Decimal('100.00'))
+
+    def post(self, responses, index):
+        client = APIClient()
+        client.force_authenticate(user=User.objects.get(pk=self.user.pk))
+        try:
+            responses[index] = client.post('/api/user/transactions/', BUY, format='json', HTTP_IDEMPOTENCY_KEY='order-1')
+        finally:
+            connections.close_all()
+
+    def test_retry_of_a_request_in_flight_gets_its_response(self):
+        booking, retrying, release = threading.Event(), threading.Event(), threading.Event()
+        record, wait = IdempotencyClaim.record, IdempotencyClaim.wait
+
+        def slow_record(claim, result):
+            # Hold the first request's trade transaction open.
+            record(claim, result)
+            if not booking.is_set():
+                booking.set()
+                release.wait(10)
+
+        def signalling_wait(claim):
+            if booking.is_set():
+                retrying.set()
+            return wait(claim)
+
+        responses = [None, None]
+        with mock.patch.object(IdempotencyClaim, 'record', slow_record), \
+                mock.patch.object(IdempotencyClaim, 'wait', signalling_wait):
+            first = threading.Thread(target=self.post, args=(responses, 0))
+            first.start()
+            self.assertTrue(booking.wait(10))
+            retry = threading.Thread(target=self.post, args=(responses, 1))
+            retry.start()
+            self.assertTrue(retrying.wait(10))
+            release.set()
+            first.join(10)
+            retry.join(10)
+
+        # The retry would fail validation against the spent balance.
+        self.assertEqual([response.status_code for response in responses], [201, 201])
+        self.assertEqual(responses[1].content, responses[0].content)
+        self.assertEqual(Transaction.objects.filter(user=self.user).count(), 1)
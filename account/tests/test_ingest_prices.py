@@ -0,0 +1,87 @@
+import io
+import json
+import os
+import tempfile
+from decimal import Decimal
+from unittest import mock
+
+from django.core.management import CommandError, call_command
+from django.test import TestCase, override_settings
+
+from account.ingest import upsert_batch
+from account.models import PriceTick, Stock
+
+
+class IngestPricesCommandTests(TestCase):
+
+    def setUp(self):
+        self.path = self.write('.csv', "symbol,name,last_price\naapl,Apple,150.25\n")
+
+    def write(self, suffix, content):
+        handle, path = tempfile.mkstemp(suffix=suffix)
+        with os.fdopen(handle, 'w') as f:
+            f.write(content)
+        self.addCleanup(os.remove, path)
+        return path
+
+    def test_ingests_rows(self):
+        call_command('ingest_prices', self.path, stdout=io.StringIO())
+        self.assertEqual(Stock.objects.get(symbol='AAPL').last_price, Decimal('150.25'))
+
+    @override_settings(STOCK_VERSION_CACHE_ALIAS='default')
+    def test_refuses_process_local_version_cache(self):
+        with self.assertRaisesMessage(CommandError, 'process-local'):
+            call_command('ingest_prices', self.path)
+        self.assertFalse(Stock.objects.exists())
+
+    def test_skips_invalid_rows(self):
+        path = self.write('.jsonl', '\n'.join([
+            '{"symbol": "nan1", "name": "NaN", "last_price": "nan"}',
+            '{"symbol": "inf1", "name": "Inf", "last_price": "Infinity"}',
+            '["msft", "Microsoft", "300"]',
+            '"msft"',
+            'not json',
+            '{"symbol": "msft", "name": "Microsoft", "last_price": 300}',
+        ]) + '\n')
+        stdout = io.StringIO()
+        with self.assertLogs('account.ingest', 'WARNING'):
+            call_command('ingest_prices', path, stdout=stdout)
+
+        self.assertEqual(list(Stock.objects.values_list('symbol', flat=True)), ['MSFT'])
+        self.assertIn('1 inserted, 0 updated, 0 unchanged, 5 invalid', stdout.getvalue())
+
+    def test_resumes_from_checkpoint(self):
+        header, first = "symbol,name,last_price\n", "aapl,Apple,150.25\n"
+        path = self.write('.csv', header + first + "msft,Microsoft,300\n")
+        checkpoint = f"{path}.checkpoint"
+        with open(checkpoint, 'w') as f:
+            json.dump({'path': path, 'offset': len(header + first)}, f)
+
+        stdout = io.StringIO()
+        call_command('ingest_prices', path, '--resume', stdout=stdout)
+
+        self.assertIn(f"Resuming {path} at byte {len(header + first)}", stdout.getvalue())
+        self.assertEqual(list(Stock.objects.values_list('symbol', flat=True)), ['MSFT'])
+        self.assertFalse(os.path.exists(checkpoint))
+
+
+class UpsertBatchTests(TestCase):
+
+    def test_symbol_inserted_concurrently_is_not_counted_as_inserted(self):
+        Stock.objects.create(symbol='AAPL', name='Apple', last_price=Decimal('150.00'))
+        ticks = PriceTick.objects.count()
+        in_bulk = Stock.objects.in_bulk
+        reads = []
+
+        def racing_in_bulk(*args, **kwargs):
+            # The first read happened before another ingest inserted AAPL.
+            reads.append(args)
+            return {} if len(reads) == 1 else in_bulk(*args, **kwargs)
+
+        with mock.patch.object(Stock.objects, 'in_bulk', racing_in_bulk):
+            counts = upsert_batch([('AAPL', 'Apple', Decimal('151.00')), ('MSFT', 'Microsoft', Decimal('300.00'))])
+
+        self.assertEqual(counts, {'inserted': 1, 'updated': 1, 'unchanged': 0})
+        self.assertEqual(len(reads), 2)
+        self.assertEqual(Stock.objects.get(symbol='AAPL').last_price, Decimal('151.00'))
+        self.assertEqual(PriceTick.objects.count() - ticks, 2)
@@ -0,0 +1,38 @@
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.signals import user_login_failed
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from account.models import User
+
+
+class LoginTests(TestCase):
+    client_class = APIClient
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(email='login@example.com', name='login', password='pw')
+
+    def login(self, password):
+        return self.client.post('/api/user/login/', {'email': 'login@example.com', 'password': password}, format='json')
+
+    def test_login_reports_hash_and_token_timings(self):
+        response = self.login('pw')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('access', response.json()['token'])
+        self.assertRegex(response['Server-Timing'], r'^hash;dur=[\d.]+, token;dur=[\d.]+(, |$)')
+
+    def test_outdated_hash_is_upgraded(self):
+        User.objects.filter(pk=self.user.pk).update(password=make_password('pw', hasher='pbkdf2_sha1'))
+        self.assertEqual(self.login('pw').status_code, 200)
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.password.startswith('pbkdf2_sha256$'))
+
+    def test_failed_login_sends_signal(self):
+        failures = []
+        user_login_failed.connect(lambda **kwargs: failures.append(kwargs['credentials']['email']), weak=False,
+                                  dispatch_uid='test_failed_login')
+        self.addCleanup(user_login_failed.disconnect, dispatch_uid='test_failed_login')
+
+        self.assertEqual(self.login('wrong').status_code, 401)
+        self.assertEqual(failures, ['login@example.com'])
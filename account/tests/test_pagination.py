@@ -0,0 +1,82 @@
+from datetime import timedelta
+from decimal import Decimal
+from unittest import mock
+
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from account.models import Stock, Transaction, User
+from account.pagination import TransactionCursorPagination
+
+
+class TransactionCursorPaginationTests(TestCase):
+    """
+    Pages follow (timestamp, id) newest first; rows are told apart by quantity.
+    """
+    client_class = APIClient
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(email='pages@example.com', name='pages')
+        cls.stock = Stock.objects.create(symbol='AAPL', name='Apple', last_price=Decimal('10.00'))
+        for quantity in range(1, 6):
+            cls.trade(quantity)
+        # Rows 2-4 share a timestamp, so only the id orders them.
+        now = timezone.now()
+        for quantity in range(1, 6):
+            timestamp = now - timedelta(minutes=1) if quantity in (2, 3, 4) else now - timedelta(minutes=5 - quantity)
+            Transaction.objects.filter(user=cls.user, quantity=quantity).update(timestamp=timestamp)
+
+    @classmethod
+    def trade(cls, quantity):
+        return Transaction.objects.create(
+            user=cls.user, stock=cls.stock, transaction_type=Transaction.BUY,
+            quantity=quantity, price_each=Decimal('10.00'),
+        )
+
+    def setUp(self):
+        self.client.force_authenticate(user=self.user)
+
+    def get(self, url='/api/user/transactions/', **params):
+        # A `next` link carries its own query string, page_size included.
+        response = self.client.get(url, params or None)
+        self.assertEqual(response.status_code, 200)
+        body = response.json()
+        return [row['quantity'] for row in body['results']], body['next']
+
+    def walk(self, page_size):
+        quantities, url = self.get(page_size=page_size)
+        pages = [quantities]
+        while url:
+            quantities, url = self.get(url)
+            pages.append(quantities)
+        return pages
+
+    def test_equal_timestamps_are_ordered_by_id(self):
+        self.assertEqual(self.walk(2), [[5, 4], [3, 2], [1]])
+        self.assertEqual(self.walk(1), [[5], [4], [3], [2], [1]])
+
+    def test_pages_are_stable_across_inserts(self):
+        first, next_url = self.get(page_size=2)
+        self.trade(6)
+        second, next_url = self.get(next_url)
+        third, next_url = self.get(next_url)
+
+        self.assertEqual((first, second, third, next_url), ([5, 4], [3, 2], [1], None))
+        self.assertEqual(self.get(page_size=1)[0], [6])
+
+    def test_page_size_is_capped(self):
+        with mock.patch.object(TransactionCursorPagination, 'max_page_size', 3):
+            quantities, next_url = self.get(page_size=100)
+        self.assertEqual(quantities, [5, 4, 3])
+        self.assertIsNotNone(next_url)
+
+    def test_invalid_page_size_falls_back_to_the_default(self):
+        for page_size in ('0', '-1', 'abc'):
+            with self.subTest(page_size=page_size):
+                self.assertEqual(self.get(page_size=page_size), ([5, 4, 3, 2, 1], None))
+
+    def test_invalid_cursor_is_not_found(self):
+        response = self.client.get('/api/user/transactions/', {'cursor': 'not-a-cursor'})
+        self.assertEqual(response.status_code, 404)
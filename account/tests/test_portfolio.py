@@ -0,0 +1,50 @@
+from decimal import Decimal
+
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from account.cache import get_portfolio, invalidate_portfolio
+from account.models import Stock, User
+
+
+class PortfolioCacheTests(TestCase):
+
+    def test_build_racing_a_trade_is_not_served(self):
+        def stale_build():
+            # A trade commits (and invalidates) while this build is running.
+            invalidate_portfolio(1)
+            return 'stale'
+
+        self.assertEqual(get_portfolio(1, stale_build), 'stale')
+        self.assertEqual(get_portfolio(1, lambda: 'fresh'), 'fresh')
+        self.assertEqual(get_portfolio(1, lambda: 'rebuilt'), 'fresh')
+
+    def test_other_users_are_not_invalidated(self):
+        get_portfolio(1, lambda: 'one')
+        get_portfolio(2, lambda: 'two')
+        invalidate_portfolio(1)
+        self.assertEqual(get_portfolio(1, lambda: 'one again'), 'one again')
+        self.assertEqual(get_portfolio(2, lambda: 'rebuilt'), 'two')
+
+
+class PortfolioViewTests(TestCase):
+    client_class = APIClient
+
+    def test_trade_invalidates_the_portfolio(self):
+        user = User.objects.create_user(
+            email='portfolio@example.com', name='portfolio', password='pw', current_balance=Decimal('1000.00')
+        )
+        Stock.objects.create(symbol='AAPL', name='Apple', last_price=Decimal('100.00'))
+        self.client.force_authenticate(user=user)
+
+        self.assertEqual(self.client.get('/api/user/portfolio/').json()['positions'], [])
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                '/api/user/transactions/',
+                {'stock': 'AAPL', 'transaction_type': 'BUY', 'quantity': 2, 'price_each': '100.00'},
+                format='json',
+            )
+        self.assertEqual(response.status_code, 201)
+
+        positions = self.client.get('/api/user/portfolio/').json()['positions']
+        self.assertEqual([(p['symbol'], p['quantity']) for p in positions], [('AAPL', 2)])
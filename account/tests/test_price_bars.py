@@ -0,0 +1,54 @@
+from decimal import Decimal
+
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from account.models import PriceTick, Stock, User
+from account.prices import MAX_BARS
+
+
+class PriceTickTests(TestCase):
+
+    def test_save_appends_a_tick_when_the_price_changes(self):
+        stock = Stock.objects.create(symbol='aapl', name='Apple', last_price=Decimal('150.00'))
+        stock.name = 'Apple Inc.'
+        stock.save()
+        stock = Stock.objects.get(pk=stock.pk)
+        stock.last_price = '151.50'
+        stock.save()
+
+        self.assertEqual(list(stock.ticks.order_by('id').values_list('price', flat=True)), [Decimal('150.00'), Decimal('151.50')])
+        self.assertEqual(stock.ticks.latest('timestamp').timestamp, Stock.objects.get(pk=stock.pk).updated_at)
+
+
+class PriceBarViewTests(TestCase):
+    client_class = APIClient
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(email='bars@example.com', name='bars', password='pw')
+        Stock.objects.create(symbol='AAPL', name='Apple', last_price=Decimal('150.00'))
+
+    def setUp(self):
+        self.client.force_authenticate(user=self.user)
+
+    def test_default_window_is_served(self):
+        response = self.client.get('/api/user/price-bars/', {'symbol': 'aapl', 'resolution': '1m'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()), 1)
+        self.assertEqual(PriceTick.objects.count(), 1)
+
+    def test_range_over_max_bars_is_rejected(self):
+        response = self.client.get(
+            '/api/user/price-bars/',
+            {'symbol': 'AAPL', 'resolution': '1m', 'start': '2020-01-01', 'end': '2025-01-01'},
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertIn(str(MAX_BARS), response.json()['error'])
+
+    def test_coarse_resolution_allows_the_same_range(self):
+        response = self.client.get(
+            '/api/user/price-bars/',
+            {'symbol': 'AAPL', 'resolution': '1d', 'start': '2020-01-01', 'end': '2025-01-01'},
+        )
+        self.assertEqual(response.status_code, 200)
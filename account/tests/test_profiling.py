@@ -0,0 +1,62 @@
+import time
+
+from django.test import SimpleTestCase, override_settings
+
+from account.profiling import SamplingProfiler, profiler_cache
+
+
+@override_settings(PROFILER_CACHE_ALIAS='default', PROFILER_SYNC_INTERVAL=60)
+class SharedProfilerTests(SimpleTestCase):
+    """
+    Two SamplingProfiler instances stand in for two workers sharing a cache.
+    """
+
+    def setUp(self):
+        profiler_cache().clear()
+        self.admin_worker, self.worker = SamplingProfiler(), SamplingProfiler()
+        self.addCleanup(self.admin_worker.configure, False)
+        self.addCleanup(self.worker.apply, {'enabled': False})
+
+    def sample(self, worker):
+        thread_id = worker.enter()
+        try:
+            deadline = time.monotonic() + 5
+            while not worker.samples and time.monotonic() < deadline:
+                time.sleep(0.01)
+        finally:
+            worker.exit(thread_id)
+
+    def test_switch_reaches_other_workers(self):
+        self.admin_worker.configure(True, path='/api/user/transactions/', method='post', interval=0.001)
+        self.assertFalse(self.worker.enabled)
+
+        self.worker.sync()
+        self.assertTrue(self.worker.enabled)
+        self.assertEqual(self.worker.config['method'], 'POST')
+
+        self.admin_worker.configure(False)
+        self.worker.sync()
+        self.assertFalse(self.worker.enabled)
+
+    def test_stacks_are_merged_across_workers(self):
+        self.admin_worker.configure(True, interval=0.001)
+        self.worker.sync()
+        self.sample(self.worker)
+        self.sample(self.admin_worker)
+        self.worker.flush()
+
+        status = self.admin_worker.status()
+        self.assertEqual((status['workers'], status['requests']), (2, 2))
+        self.assertGreater(status['samples'], 1)
+        self.assertIn('test_profiling.py:sample', self.admin_worker.collapsed())
+
+    def test_reset_discards_every_workers_stacks(self):
+        self.admin_worker.configure(True, interval=0.001)
+        self.worker.sync()
+        self.sample(self.worker)
+        self.worker.flush()
+
+        self.admin_worker.configure(True, reset=True, interval=0.001)
+        self.assertEqual(self.admin_worker.collapsed(), '')
+        self.worker.sync()
+        self.assertEqual(self.worker.samples, 0)
@@ -0,0 +1,60 @@
+from decimal import Decimal
+
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from account.models import Stock, Transaction, User
+
+
+ROWS = 50
+
+
+def seed_account(tag, rows):
+    user = User.objects.create(email=f"querycount-{tag}@example.com", name="querycount")
+    stock = Stock.objects.create(symbol=f"Q{tag}".upper(), name="Query Count Stock", last_price=Decimal('10.00'))
+    Transaction.objects.bulk_create(
+        Transaction(
+            user=user,
+            stock=stock,
+            transaction_type=Transaction.BUY,
+            quantity=1,
+            price_each=Decimal('10.00'),
+            total_price=Decimal('10.00'),
+        )
+        for _ in range(rows)
+    )
+    return user, stock.symbol
+
+
+class TransactionListQueryCountTests(TestCase):
+    """
+    Every transaction list endpoint issues the same, fixed number of queries
+    for an account with one transaction and for one with many, i.e. no
+    per-row (N+1) queries.
+    """
+    client_class = APIClient
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.accounts = [(seed_account('one', 1), 1), (seed_account('many', ROWS), ROWS)]
+
+    def assert_queries(self, expected, path):
+        for (user, symbol), rows in self.accounts:
+            with self.subTest(rows=rows):
+                self.client.force_authenticate(user=user)
+                with self.assertNumQueries(expected):
+                    response = self.client.get(path.format(symbol=symbol), {'page_size': ROWS})
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(len(response.json()['results']), rows)
+
+    def test_transactions(self):
+        self.assert_queries(1, '/api/user/transactions/')
+
+    def test_query_transactions(self):
+        self.assert_queries(1, '/api/user/query-transactions/')
+
+    def test_query_transactions_by_stock(self):
+        self.assert_queries(1, '/api/user/query-transactions/?stock={symbol}')
+
+    def test_query_transactions_by_type(self):
+        self.assert_queries(1, '/api/user/query-transactions/?transaction_type=buy')
@@ -0,0 +1,64 @@
+import time
+from decimal import Decimal
+from unittest import mock
+
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from account.cache import VERSION_KEY, forget_local_version, get_symbol, version_cache
+from account.models import Stock, User
+
+
+class StockQueryTests(TestCase):
+    client_class = APIClient
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(email='stocks@example.com', name='stocks', password='pw')
+        Stock.objects.create(symbol='AAPL', name='Apple', last_price=Decimal('150.00'))
+
+    def setUp(self):
+        # The shared version rolls back with each test; drop this process's copy.
+        forget_local_version()
+        self.client.force_authenticate(user=self.user)
+
+    def test_non_finite_prices_are_rejected(self):
+        for value in ('nan', 'inf', '-Infinity', 'abc'):
+            for param in ('min_price', 'max_price'):
+                with self.subTest(**{param: value}):
+                    response = self.client.get('/api/user/query-stocks/', {param: value})
+                    self.assertEqual(response.status_code, 400)
+
+    def test_price_range(self):
+        response = self.client.get('/api/user/query-stocks/', {'min_price': '100', 'max_price': '200.5'})
+        self.assertEqual([stock['symbol'] for stock in response.json()], ['AAPL'])
+
+    def test_save_invalidates_cached_entries_on_commit(self):
+        self.assertEqual(get_symbol('AAPL')[0]['last_price'], Decimal('150.00'))
+        stock = Stock.objects.get(symbol='AAPL')
+        stock.last_price = Decimal('155.00')
+        with self.captureOnCommitCallbacks(execute=True):
+            stock.save()
+        self.assertEqual(get_symbol('AAPL')[0]['last_price'], Decimal('155.00'))
+
+    def test_version_is_read_once_per_local_ttl(self):
+        get_symbol('AAPL')
+        with self.assertNumQueries(0):
+            self.assertEqual(len(get_symbol('AAPL')), 1)
+
+    def test_version_moved_by_another_process_is_seen_after_local_ttl(self):
+        get_symbol('AAPL')
+        Stock.objects.filter(symbol='AAPL').update(last_price=Decimal('160.00'))
+        # What invalidate_stocks does in another process.
+        version_cache().set(VERSION_KEY, 1)
+        self.assertEqual(get_symbol('AAPL')[0]['last_price'], Decimal('150.00'))
+
+        with mock.patch('account.cache.time.monotonic', return_value=time.monotonic() + 3):
+            self.assertEqual(get_symbol('AAPL')[0]['last_price'], Decimal('160.00'))
+
+    @override_settings(STOCK_VERSION_LOCAL_TTL=0)
+    def test_zero_local_ttl_reads_the_version_every_time(self):
+        get_symbol('AAPL')
+        Stock.objects.filter(symbol='AAPL').update(last_price=Decimal('160.00'))
+        version_cache().set(VERSION_KEY, 1)
+        self.assertEqual(get_symbol('AAPL')[0]['last_price'], Decimal('160.00'))
@@ -0,0 +1,154 @@
+from decimal import Decimal
+from unittest import mock
+
+from django.db import OperationalError
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from account import trading
+from account.models import Holding, Stock, Transaction, User
+from account.trading import MAX_ATTEMPTS, TradeRejected, execute_batch, execute_trade
+
+
+class ExecuteTradeTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.stock = Stock.objects.create(symbol='AAPL', name='Apple', last_price=Decimal('100.00'))
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email='trade@example.com', name='trade', password='pw', current_balance=Decimal('1000.00')
+        )
+
+    def trade(self, transaction_type, quantity, price_each='100.00'):
+        return execute_trade(self.user, self.stock, transaction_type, quantity, Decimal(price_each))
+
+    def assertAccount(self, balance, held, trades):
+        self.assertEqual(User.objects.get(pk=self.user.pk).current_balance, Decimal(balance))
+        holding = Holding.objects.filter(user=self.user, stock=self.stock).first()
+        self.assertEqual(holding.quantity if holding else 0, held)
+        self.assertEqual(Transaction.objects.filter(user=self.user).count(), trades)
+
+    def test_buy_and_sell_update_balance_and_holding(self):
+        bought = self.trade(Transaction.BUY, 3, '100.01')
+        self.assertEqual(bought.total_price, Decimal('300.03'))
+        self.assertEqual(self.user.current_balance, Decimal('699.97'))
+        self.assertAccount('699.97', 3, 1)
+
+        self.trade(Transaction.SELL, 2, '110.00')
+        self.assertEqual(self.user.current_balance, Decimal('919.97'))
+        self.assertAccount('919.97', 1, 2)
+        self.assertEqual(Holding.objects.get(user=self.user).cost_basis, Decimal('100.01'))
+
+    def test_rejected_buy_changes_nothing(self):
+        with self.assertRaisesMessage(TradeRejected, 'Insufficient balance'):
+            self.trade(Transaction.BUY, 11)
+        self.assertAccount('1000.00', 0, 0)
+
+    def test_rejected_sell_changes_nothing(self):
+        self.trade(Transaction.BUY, 2)
+        with self.assertRaisesMessage(TradeRejected, 'You can only sell up to 2 shares of AAPL.'):
+            self.trade(Transaction.SELL, 3)
+        self.assertAccount('800.00', 2, 1)
+
+    @mock.patch('account.trading.time.sleep')
+    def test_lock_contention_is_retried(self, sleep):
+        book = trading._book_trade
+        attempts = []
+
+        def contended(*args):
+            attempts.append(args)
+            if len(attempts) < 3:
+                raise OperationalError('deadlock detected')
+            return book(*args)
+
+        with mock.patch('account.trading._book_trade', contended), self.assertLogs('account.trading', 'WARNING'):
+            self.trade(Transaction.BUY, 1)
+        self.assertEqual((len(attempts), sleep.call_count), (3, 2))
+        self.assertAccount('900.00', 1, 1)
+
+    @mock.patch('account.trading.time.sleep')
+    def test_persistent_contention_is_raised(self, sleep):
+        with mock.patch('account.trading._book_trade', side_effect=OperationalError('lock timeout')) as book:
+            with self.assertRaises(OperationalError), self.assertLogs('account.trading', 'WARNING') as logs:
+                self.trade(Transaction.BUY, 1)
+        self.assertEqual(book.call_count, MAX_ATTEMPTS)
+        self.assertIn(f'Giving up on trade for user {self.user.id} after {MAX_ATTEMPTS} attempts', logs.output[-1])
+        self.assertAccount('1000.00', 0, 0)
+
+
+class ExecuteBatchTests(TestCase):
+    client_class = APIClient
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.stock = Stock.objects.create(symbol='AAPL', name='Apple', last_price=Decimal('100.00'))
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email='batch@example.com', name='batch', password='pw', current_balance=Decimal('1000.00')
+        )
+        self.client.force_authenticate(user=self.user)
+
+    def order(self, index, transaction_type, quantity):
+        return index, self.stock, transaction_type, quantity, Decimal('100.00')
+
+    def batch(self, mode, *trades):
+        return self.client.post('/api/user/transactions/batch/', {
+            'mode': mode,
+            'trades': [
+                {'stock': 'AAPL', 'transaction_type': transaction_type, 'quantity': quantity, 'price_each': '100.00'}
+                for transaction_type, quantity in trades
+            ],
+        }, format='json')
+
+    def assertAccount(self, balance, held, trades):
+        self.assertEqual(User.objects.get(pk=self.user.pk).current_balance, Decimal(balance))
+        holding = Holding.objects.filter(user=self.user, stock=self.stock).first()
+        self.assertEqual(holding.quantity if holding else 0, held)
+        self.assertEqual(Transaction.objects.filter(user=self.user).count(), trades)
+
+    def test_sell_uses_shares_bought_earlier_in_the_batch(self):
+        booked, rejected = execute_batch(
+            self.user, [self.order(0, Transaction.BUY, 5), self.order(1, Transaction.SELL, 3)]
+        )
+        self.assertEqual((sorted(booked), rejected), ([0, 1], {}))
+        self.assertEqual(self.user.current_balance, Decimal('800.00'))
+        self.assertAccount('800.00', 2, 2)
+
+    def test_all_or_nothing_books_nothing_when_one_order_fails(self):
+        booked, rejected = execute_batch(
+            self.user, [self.order(0, Transaction.BUY, 5), self.order(1, Transaction.BUY, 6)]
+        )
+        self.assertEqual(booked, {})
+        self.assertEqual(rejected, {1: 'Insufficient balance for this purchase.'})
+        self.assertAccount('1000.00', 0, 0)
+
+    def test_best_effort_books_the_orders_that_pass(self):
+        booked, rejected = execute_batch(
+            self.user,
+            [self.order(0, Transaction.BUY, 5), self.order(1, Transaction.BUY, 6), self.order(2, Transaction.SELL, 2)],
+            all_or_nothing=False,
+        )
+        self.assertEqual((sorted(booked), list(rejected)), ([0, 2], [1]))
+        self.assertAccount('700.00', 3, 2)
+
+    def test_atomic_endpoint_rolls_back_and_skips_valid_trades(self):
+        response = self.batch('atomic', ('BUY', 2), ('SELL', 5))
+        self.assertEqual(response.status_code, 400)
+        body = response.json()
+        self.assertEqual((body['booked'], body['rejected']), (0, 1))
+        self.assertEqual([result['status'] for result in body['results']], ['skipped', 'rejected'])
+        self.assertAccount('1000.00', 0, 0)
+
+    def test_best_effort_endpoint_books_partially(self):
+        response = self.batch('best_effort', ('BUY', 2), ('SELL', 5), ('SELL', 1))
+        self.assertEqual(response.status_code, 201)
+        body = response.json()
+        self.assertEqual([result['status'] for result in body['results']], ['booked', 'rejected', 'booked'])
+        self.assertEqual(
+            body['results'][1]['errors'], {'non_field_errors': ['You can only sell up to 2 shares of AAPL.']}
+        )
+        self.assertEqual(body['user_balance'], 900.0)
+        self.assertAccount('900.00', 1, 2)
@@ -0,0 +1,211 @@
+import logging
+import random
+import time
+from decimal import Decimal, ROUND_DOWN
+
+from django.db import OperationalError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .cache import invalidate_portfolio
+from .holdings import next_position
+from .models import Holding, Transaction, User
+
+
+logger = logging.getLogger(__name__)
+
+# Lock waits, deadlocks and serialization failures all surface as
+# OperationalError; a trade that hits one is retried from scratch.
+MAX_ATTEMPTS = 5
+RETRY_BACKOFF = 0.02
+
+
+class TradeRejected(Exception):
+    """
+    Raised when a trade fails its balance or holdings check under lock.
+    """
+
+
+def trade_total(price_each, quantity):
+    return (price_each * quantity).quantize(Decimal('.01'), rounding=ROUND_DOWN)
+
+
+def execute_trade(user, stock, transaction_type, quantity, price_each, idempotency=None):
+    """
+    Atomically check and book a BUY or SELL.
+
+    The balance check, holdings check, `Transaction` insert, holding update and
+    balance update run in one DB transaction. The user row is locked first and
+    acts as the per-account mutex, so concurrent trades on one account are
+    serialized and always take their locks in the same order.
+
+    Must not be called inside an outer `transaction.atomic()` block, otherwise
+    a retry cannot start a fresh transaction.
+
+    Args:
+        user (User): The trading user; its `current_balance` is refreshed in place.
+        stock (Stock): The stock being traded.
+        transaction_type (str): Transaction.BUY or Transaction.SELL.
+        quantity (int): Number of shares.
+        price_each (Decimal): Price per share.
+        idempotency (IdempotencyClaim): Records the request's Idempotency-Key
+            and response in the same DB transaction (see account.idempotency).
+
+    Returns:
+        Transaction: The booked transaction.
+
+    Raises:
+        TradeRejected: If the balance or holding is insufficient.
+        KeyConflict: If the Idempotency-Key was stored by another request.
+        OperationalError: If lock contention persists after MAX_ATTEMPTS.
+    """
+    return _with_retry(_book_trade, idempotency, user, stock, transaction_type, quantity, price_each)
+
+
+def _with_retry(book, idempotency, user, *args):
+    """
+    Run `book(user, idempotency, *args)` in its own atomic block, retrying on
+    lock contention, and record the result under `idempotency` in the same block.
+    """
+    for attempt in range(1, MAX_ATTEMPTS + 1):
+        try:
+            with transaction.atomic():
+                transaction.on_commit(lambda: invalidate_portfolio(user.pk))
+                result = book(user, idempotency, *args)
+                if idempotency is not None:
+                    idempotency.record(result)
+                return result
+        except OperationalError as exc:
+            if attempt == MAX_ATTEMPTS:
+                logger.error("Giving up on trade for user %s after %d attempts: %s", user.id, attempt, exc)
+                raise
+            delay = RETRY_BACKOFF * (2 ** (attempt - 1))
+            logger.warning("Lock contention on trade for user %s (attempt %d): %s", user.id, attempt, exc)
+            time.sleep(delay + random.uniform(0, delay))
+
+
+def _lock_balance(user, idempotency):
+    """
+    Lock the user row and return its balance. A request whose key another
+    request stored while this one waited on the lock is replayed from here,
+    before any balance or holding check can reject it.
+    """
+    balance = User.objects.select_for_update().values_list('current_balance', flat=True).get(pk=user.pk)
+    if idempotency is not None:
+        idempotency.check()
+    return balance
+
+
+def _book_trade(user, idempotency, stock, transaction_type, quantity, price_each):
+    total_price = trade_total(price_each, quantity)
+
+    balance = _lock_balance(user, idempotency)
+    if transaction_type == Transaction.BUY and balance < total_price:
+        raise TradeRejected("Insufficient balance for this purchase.")
+
+    holding, _ = Holding.objects.select_for_update().get_or_create(user_id=user.pk, stock_id=stock.pk)
+    if transaction_type == Transaction.SELL and quantity > holding.quantity:
+        raise TradeRejected(f"You can only sell up to {holding.quantity} shares of {stock.symbol}.")
+
+    transaction_created = Transaction.objects.create(
+        user=user,
+        stock=stock,
+        transaction_type=transaction_type,
+        quantity=quantity,
+        price_each=price_each,
+        total_price=total_price,
+    )
+
+    holding.quantity, holding.cost_basis = next_position(
+        holding.quantity, holding.cost_basis, transaction_type, quantity, total_price
+    )
+    holding.save(update_fields=['quantity', 'cost_basis', 'updated_at'])
+
+    delta = -total_price if transaction_type == Transaction.BUY else total_price
+    User.objects.filter(pk=user.pk).update(current_balance=F('current_balance') + delta)
+    user.current_balance = balance + delta
+
+    return transaction_created
+
+
+def execute_batch(user, orders, all_or_nothing=True, idempotency=None):
+    """
+    Book a list of trades in one DB transaction.
+
+    Orders are checked in sequence against a running in-memory balance and
+    per-stock position, so a SELL may consume shares bought earlier in the
+    same batch. Accepted trades are inserted with a single `bulk_create`.
+
+    Args:
+        user (User): The trading user; its `current_balance` is refreshed in place.
+        orders (list): (index, stock, transaction_type, quantity, price_each) tuples.
+        all_or_nothing (bool): If True, any rejected order rejects the whole batch.
+        idempotency (IdempotencyClaim): As for execute_trade; it is given the
+            (booked, rejected) result.
+
+    Returns:
+        tuple: (booked, rejected) where booked maps index → Transaction and
+        rejected maps index → reason. In all-or-nothing mode `booked` is empty
+        whenever `rejected` is not.
+    """
+    return _with_retry(_book_batch, idempotency, user, orders, all_or_nothing)
+
+
+def _book_batch(user, idempotency, orders, all_or_nothing):
+    balance = _lock_balance(user, idempotency)
+    stock_ids = {stock.pk for _, stock, _, _, _ in orders}
+    holdings = {
+        holding.stock_id: holding
+        for holding in Holding.objects.select_for_update().filter(user_id=user.pk, stock_id__in=stock_ids)
+    }
+
+    running_balance = balance
+    positions = {stock_id: (h.quantity, h.cost_basis) for stock_id, h in holdings.items()}
+    booked = {}
+    rejected = {}
+
+    for index, stock, transaction_type, quantity, price_each in orders:
+        total_price = trade_total(price_each, quantity)
+        held, cost_basis = positions.get(stock.pk, (0, Decimal('0.00')))
+
+        if transaction_type == Transaction.BUY and running_balance < total_price:
+            rejected[index] = "Insufficient balance for this purchase."
+            continue
+        if transaction_type == Transaction.SELL and quantity > held:
+            rejected[index] = f"You can only sell up to {held} shares of {stock.symbol}."
+            continue
+
+        positions[stock.pk] = next_position(held, cost_basis, transaction_type, quantity, total_price)
+        running_balance += -total_price if transaction_type == Transaction.BUY else total_price
+        booked[index] = Transaction(
+            user=user,
+            stock=stock,
+            transaction_type=transaction_type,
+            quantity=quantity,
+            price_each=price_each,
+            total_price=total_price,
+        )
+
+    if rejected and all_or_nothing:
+        return {}, rejected
+    if not booked:
+        return booked, rejected
+
+    Transaction.objects.bulk_create(booked.values())
+
+    now = timezone.now()
+    to_update, to_create = [], []
+    for stock_id, (quantity, cost_basis) in positions.items():
+        holding = holdings.get(stock_id)
+        if holding is None:
+            to_create.append(Holding(user_id=user.pk, stock_id=stock_id, quantity=quantity, cost_basis=cost_basis))
+        elif (holding.quantity, holding.cost_basis) != (quantity, cost_basis):
+            holding.quantity, holding.cost_basis, holding.updated_at = quantity, cost_basis, now
+            to_update.append(holding)
+    Holding.objects.bulk_create(to_create)
+    Holding.objects.bulk_update(to_update, ['quantity', 'cost_basis', 'updated_at'])
+
+    User.objects.filter(pk=user.pk).update(current_balance=F('current_balance') + (running_balance - balance))
+    user.current_balance = running_balance
+
+    return booked, rejected
@@ -1,10 +1,19 @@
 from django.urls import path
 from .views import *
+from .async_views import AsyncQueryTransactionListView, AsyncStockQueryView, AsyncTransactionView
 urlpatterns = [
     path('register/', UserRegistrationView.as_view(), name='register'),
     path('login/', UserLoginView.as_view(), name='login'),
     path('ingest-stocks/', IngestStocksView.as_view(), name='ingest-stocks'),
     path('query-stocks/', StockQueryView.as_view(), name='stock-query'),
+    path('price-bars/', PriceBarView.as_view(), name='price-bars'),
     path('transactions/', TransactionView.as_view(), name='transactions'),
+    path('transactions/batch/', TransactionBatchView.as_view(), name='transactions-batch'),
+    path('portfolio/', PortfolioView.as_view(), name='portfolio'),
     path('query-transactions/', QueryTransactionListView.as_view(), name='query-transactions'),
+    path('export/', TransactionExportView.as_view(), name='export-transactions'),
+    path('profiler/', ProfilerView.as_view(), name='profiler'),
+    path('async/query-stocks/', AsyncStockQueryView.as_view(), name='async-stock-query'),
+    path('async/transactions/', AsyncTransactionView.as_view(), name='async-transactions'),
+    path('async/query-transactions/', AsyncQueryTransactionListView.as_view(), name='async-query-transactions'),
 ]
\ No newline at end of file
@@ -17,6 +17,9 @@ def get_tokens_for_user(user):
   """
     Generate JWT refresh and access tokens for a given user.
 
+    The tokens carry an `is_admin` claim so read-only requests can be
+    authorized from the token alone (see StatelessJWTAuthentication).
+
     Args:
         user (User): The user instance for whom the tokens are to be generated.
 
@@ -24,6 +27,7 @@ def get_tokens_for_user(user):
         dict: A dictionary containing 'refresh' and 'access' JWT tokens as strings.
   """
   refresh = RefreshToken.for_user(user)
+  refresh['is_admin'] = user.is_admin
   return {
       'refresh': str(refresh),
       'access': str(refresh.access_token),
@@ -2,15 +2,16 @@ import logging
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.views import APIView
-from django.contrib.auth import authenticate
 from account.renderers import UserRenderer
 from rest_framework import generics, permissions
 from django.utils.translation import gettext_lazy as _
 from .constants import HARDCODED_STOCKS
 from rest_framework import status
-from rest_framework.exceptions import ValidationError, AuthenticationFailed
+from rest_framework.exceptions import APIException, ValidationError, AuthenticationFailed
 from rest_framework import generics, permissions
-from datetime import datetime
+from datetime import datetime, timedelta
+from django.utils import timezone
+from django.contrib.auth import authenticate
 from django.utils.dateparse import parse_date
 from .utils import get_tokens_for_user,IsAdminUserCustom
 from rest_framework.permissions import IsAuthenticated
@@ -22,10 +23,31 @@ from django.db import DatabaseError
 from .serializers import (
     UserRegistrationSerializer,
     UserLoginSerializer,
-    StockSerializer,
     TransactionSerializer,
-    TransactionListSerializer
+    TransactionListSerializer,
+    TradeOrderSerializer,
+    BatchTransactionSerializer,
+    PriceBarSerializer,
+    PortfolioPositionSerializer,
+    PortfolioTotalsSerializer,
+    ProfilerToggleSerializer,
 )
+from .trading import execute_batch
+from .pagination import TransactionCursorPagination
+from .filters import filter_stocks, filter_transactions
+from .cache import get_catalogue, get_symbol, get_portfolio
+from .holdings import portfolio_positions
+from .export import EXPORT_FORMATS, aiter_blocks, export_rows
+from .handlers import AsyncStreamingHttpResponse
+from .fastpath import FastListMixin
+from .idempotency import IdempotentCreateMixin, KeyConflict
+from .metrics import LoginTimer, timed
+from .profiling import profiler
+from django.http import HttpResponse, StreamingHttpResponse
+from django.core.handlers.asgi import ASGIRequest
+from .ingest import upsert_stocks
+from .prices import MAX_BARS, RESOLUTIONS, bar_count, price_bars
+from decimal import Decimal
 
 
 logger = logging.getLogger(__name__)
@@ -89,6 +111,11 @@ class UserLoginView(APIView):
     - token (JWT access and refresh)
     - success message
 
+    Credentials are checked with django.contrib.auth.authenticate(), so the
+    configured backends run and failures send user_login_failed. The
+    Server-Timing header splits the request into password hashing (query
+    time excluded) and token issuance.
+
     Error:
     - 400 Bad Request for validation issues
     - 401 Unauthorized if credentials are invalid
@@ -104,17 +131,21 @@ class UserLoginView(APIView):
             email = serializer.validated_data.get('email')
             password = serializer.validated_data.get('password')
 
-            user = authenticate(email=email, password=password)
+            timer = LoginTimer()
+            user = timer.measure('hash', authenticate, request, email=email, password=password)
 
             if user is None:
                 raise AuthenticationFailed('Invalid email or password.')
 
-            token = get_tokens_for_user(user)
+            token = timer.measure('token', get_tokens_for_user, user)
+            logger.info("Login for user %s: %s", user.id, timer.server_timing())
 
-            return Response(
+            response = Response(
                 {'token': token, 'msg': 'Login Success'},
                 status=status.HTTP_200_OK
             )
+            response['Server-Timing'] = timer.server_timing()
+            return response
 
         except ValidationError as e:
             return Response(
@@ -139,7 +170,7 @@ class UserLoginView(APIView):
 class IngestStocksView(APIView):
     """
     GET → loads the HARDCODED_STOCKS into the DB (creates or updates),
-    then returns the full list from the table.
+    then returns how many stocks were inserted, updated or left unchanged.
 
     Only admin users can access this endpoint.
     """
@@ -148,22 +179,8 @@ class IngestStocksView(APIView):
 
     def get(self, request, format=None):
         try:
-            created = []
-
-            for data in HARDCODED_STOCKS:
-                obj, _ = Stock.objects.update_or_create(
-                    symbol=data['symbol'],
-                    defaults={
-                        'name': data['name'],
-                        'last_price': data['last_price']
-                    }
-                )
-                created.append(obj)
-
-            all_stocks = Stock.objects.all()
-            serializer = StockSerializer(all_stocks, many=True)
-
-            return Response(serializer.data, status=status.HTTP_200_OK)
+            counts = upsert_stocks(HARDCODED_STOCKS)
+            return Response(counts, status=status.HTTP_200_OK)
 
         except DatabaseError as e:
             logger.error("Database error while loading stocks: %s", str(e))
@@ -184,6 +201,9 @@ class StockQueryView(APIView):
     """
     GET  /api/stocks/?symbol=&min_price=&max_price=&ordering=
     
+    Served from the cached stock catalogue (see account/cache.py); the cache
+    is invalidated whenever stocks are ingested or saved.
+
     Query params:
       - symbol:     exact match on ticker (e.g. AAPL)
       - min_price:  last_price >= this value
@@ -195,93 +215,201 @@ class StockQueryView(APIView):
 
     def get(self, request, format=None):
         try:
-            stocks = Stock.objects.all()
-
             # Filter by symbol
             symbol = request.query_params.get('symbol')
-            if symbol:
-                stocks = stocks.filter(symbol__iexact=symbol)
+            stocks = get_symbol(symbol) if symbol else get_catalogue()
+
+            # Price range and ordering
+            try:
+                stocks = filter_stocks(stocks, request.query_params)
+            except ValueError as ve:
+                return Response({"detail": str(ve)}, status=status.HTTP_400_BAD_REQUEST)
+
+            return Response([stock['data'] for stock in stocks], status=status.HTTP_200_OK)
+
+        except DatabaseError as db_err:
+            logger.error("Database error while querying stocks: %s", str(db_err))
+            return Response(
+                {"error": "A database error occurred while retrieving stock data."},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+
+        except Exception as e:
+            logger.exception("Unexpected error in StockQueryView")
+            return Response(
+                {"error": "An unexpected error occurred. Please try again later."},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+
+
+class PriceBarView(APIView):
+    """
+    GET /api/user/price-bars/?symbol=&resolution=&start=&end=
+
+    OHLC bars built from the stock's price history.
+
+    Query params:
+      - symbol:      ticker (required, case-insensitive)
+      - resolution:  '1m', '1h' or '1d' (default '1h')
+      - start:       bars from this date onward (YYYY-MM-DD); defaults to a
+                     look-back window that depends on the resolution
+      - end:         bars up to and including this date (YYYY-MM-DD); defaults to now
+
+    A range spanning more than MAX_BARS bars is rejected with 400.
+    """
+    renderer_classes = [UserRenderer]
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, format=None):
+        try:
+            symbol = request.query_params.get('symbol')
+            if not symbol:
+                raise ValueError("symbol is required.")
+
+            resolution = request.query_params.get('resolution', '1h')
+            if resolution not in RESOLUTIONS:
+                raise ValueError(f"resolution must be one of: {', '.join(RESOLUTIONS)}.")
 
-            # Filter by minimum price
-            min_price = request.query_params.get('min_price')
-            if min_price is not None:
+            end = request.query_params.get('end')
+            if end:
                 try:
-                    min_price = float(min_price)
-                    stocks = stocks.filter(last_price__gte=min_price)
+                    end = timezone.make_aware(datetime.strptime(end, "%Y-%m-%d") + timedelta(days=1))
                 except ValueError:
-                    return Response(
-                        {"detail": "min_price must be a numeric value."},
-                        status=status.HTTP_400_BAD_REQUEST
-                    )
+                    raise ValueError("Invalid end format. Expected YYYY-MM-DD.")
+            else:
+                end = timezone.now()
 
-            # Filter by maximum price
-            max_price = request.query_params.get('max_price')
-            if max_price is not None:
+            start = request.query_params.get('start')
+            if start:
                 try:
-                    max_price = float(max_price)
-                    stocks = stocks.filter(last_price__lte=max_price)
+                    start = timezone.make_aware(datetime.strptime(start, "%Y-%m-%d"))
                 except ValueError:
-                    return Response(
-                        {"detail": "max_price must be a numeric value."},
-                        status=status.HTTP_400_BAD_REQUEST
-                    )
+                    raise ValueError("Invalid start format. Expected YYYY-MM-DD.")
+            else:
+                start = end - RESOLUTIONS[resolution][2]
+
+            if bar_count(resolution, start, end) > MAX_BARS:
+                raise ValueError(
+                    f"The requested range spans more than {MAX_BARS} {resolution} bars; "
+                    "narrow start/end or use a coarser resolution."
+                )
 
-            # Ordering
-            ordering = request.query_params.get('ordering')
-            allowed_ordering_fields = {
-                'last_price', '-last_price',
-                'symbol', '-symbol',
-                'updated_at', '-updated_at'
-            }
-            if ordering:
-                if ordering in allowed_ordering_fields:
-                    stocks = stocks.order_by(ordering)
-                else:
-                    return Response(
-                        {"detail": f"Invalid ordering field: {ordering}."},
-                        status=status.HTTP_400_BAD_REQUEST
-                    )
+            stock = Stock.objects.filter(symbol=symbol.upper()).first()
+            if stock is None:
+                return Response(
+                    {"detail": f"Unknown stock symbol: {symbol}."},
+                    status=status.HTTP_404_NOT_FOUND
+                )
 
-            serializer = StockSerializer(stocks, many=True)
-            return Response(serializer.data, status=status.HTTP_200_OK)
+            bars = price_bars(stock, resolution, start, end)
+            with timed('serialize'):
+                data = PriceBarSerializer(bars, many=True).data
+            return Response(data, status=status.HTTP_200_OK)
+
+        except ValueError as ve:
+            return Response(
+                {"error": str(ve)},
+                status=status.HTTP_400_BAD_REQUEST
+            )
 
         except DatabaseError as db_err:
-            logger.error("Database error while querying stocks: %s", str(db_err))
+            logger.error("Database error while building price bars: %s", str(db_err))
             return Response(
-                {"error": "A database error occurred while retrieving stock data."},
+                {"error": "A database error occurred while retrieving price history."},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
 
         except Exception as e:
-            logger.exception("Unexpected error in StockQueryView")
+            logger.exception("Unexpected error in PriceBarView")
+            return Response(
+                {"error": "An unexpected error occurred. Please try again later."},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+
+
+class PortfolioView(APIView):
+    """
+    GET /api/user/portfolio/
+
+    The authenticated user's open positions valued at the latest stock prices.
+
+    Response:
+    - positions: per symbol quantity, average_cost, cost_basis, last_price,
+                 market_value and unrealized_pnl
+    - totals:    cost_basis, market_value and unrealized_pnl over all positions
+
+    Built from the holdings ledger in a single query and cached per user until
+    the user trades or a stock price changes.
+    """
+    renderer_classes = [UserRenderer]
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, format=None):
+        try:
+            portfolio = get_portfolio(request.user.id, lambda: self.build_portfolio(request.user.id))
+            return Response(portfolio, status=status.HTTP_200_OK)
+
+        except DatabaseError as db_err:
+            logger.error(f"Database error while valuing portfolio for user {request.user.id}: {db_err}")
+            return Response(
+                {"error": "A database error occurred while retrieving the portfolio."},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+
+        except Exception as e:
+            logger.exception(f"Unexpected error while valuing portfolio for user {request.user.id}")
             return Response(
                 {"error": "An unexpected error occurred. Please try again later."},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
 
+    def build_portfolio(self, user_id):
+        positions = portfolio_positions(user_id)
+        totals = {
+            field: sum((position[field] for position in positions), Decimal('0.00'))
+            for field in ('cost_basis', 'market_value', 'unrealized_pnl')
+        }
+        with timed('serialize'):
+            return {
+                'positions': PortfolioPositionSerializer(positions, many=True).data,
+                'totals': PortfolioTotalsSerializer(totals).data,
+            }
+
 
-class TransactionView(generics.ListCreateAPIView):
+class TransactionView(IdempotentCreateMixin, FastListMixin, generics.ListCreateAPIView):
     """
-    GET  /api/transactions/           → list user's transactions
+    GET  /api/transactions/           → list user's transactions (cursor-paginated)
     POST /api/transactions/           → create (buy/sell) a transaction
+
+    POST accepts an optional Idempotency-Key header; retries with the same
+    key replay the first response instead of booking the trade again.
     """
     renderer_classes = [UserRenderer]
     permission_classes = [IsAuthenticated]
     serializer_class = TransactionSerializer
+    pagination_class = TransactionCursorPagination
+    fast_exclude = ('user_balance',)
 
     def get_queryset(self):
         try:
             # only return this user's transactions, ordered by timestamp desc
-            return Transaction.objects.filter(user=self.request.user).order_by('-timestamp')
+            return Transaction.objects.filter(user_id=self.request.user.id).select_related('stock').order_by('-timestamp', '-id')
         except DatabaseError as db_err:
             logger.error(f"Database error fetching transactions for user {self.request.user.id}: {db_err}")
             # Return empty queryset on error to avoid crashing
             return Transaction.objects.none()
 
+    def get_serializer_context(self):
+        return {**super().get_serializer_context(), 'idempotency': self.idempotency}
+
     def perform_create(self, serializer):
+        if self.idempotency is not None:
+            self.idempotency.render = lambda instance: (status.HTTP_201_CREATED, serializer.to_representation(instance))
         try:
             # pass request context so serializer knows the user
             serializer.save()
+        except KeyConflict:
+            raise
         except DatabaseError as db_err:
             logger.error(f"Database error while creating transaction for user {self.request.user.id}: {db_err}")
             raise
@@ -290,7 +418,129 @@ class TransactionView(generics.ListCreateAPIView):
             raise
 
 
-class QueryTransactionListView(generics.ListAPIView):
+class TransactionBatchView(IdempotentCreateMixin, APIView):
+    """
+    POST /api/user/transactions/batch/
+
+    Submits many BUY/SELL orders in one request. Orders are validated in
+    sequence against a running balance and position, then booked together
+    in a single DB transaction. Accepts an optional Idempotency-Key header,
+    like POST /api/transactions/.
+
+    Request body:
+    - mode:    'atomic' (default) books every trade or none of them,
+               'best_effort' books every trade that passes its checks
+    - trades:  list of {stock, transaction_type, quantity, price_each}
+
+    Response:
+    - mode, booked and rejected counts, user_balance
+    - results: one entry per submitted trade, in order, with status
+      'booked' (plus the transaction), 'rejected' (plus errors) or
+      'skipped' (valid, but not booked because the atomic batch failed)
+    """
+    renderer_classes = [UserRenderer]
+    permission_classes = [IsAuthenticated]
+
+    def create(self, request, format=None):
+        try:
+            serializer = BatchTransactionSerializer(data=request.data)
+            serializer.is_valid(raise_exception=True)
+            mode = serializer.validated_data['mode']
+            trades = serializer.validated_data['trades']
+
+            rejected = {}
+            valid = []
+            for index, item in enumerate(trades):
+                order = TradeOrderSerializer(data=item)
+                if order.is_valid():
+                    valid.append((index, order.validated_data))
+                else:
+                    rejected[index] = {
+                        field: [str(error) for error in errors] for field, errors in order.errors.items()
+                    }
+
+            stocks = Stock.objects.in_bulk({data['stock'] for _, data in valid}, field_name='symbol')
+            orders = []
+            for index, data in valid:
+                stock = stocks.get(data['stock'])
+                if stock is None:
+                    rejected[index] = {'stock': [f"Unknown stock symbol: {data['stock']}."]}
+                    continue
+                orders.append((index, stock, data['transaction_type'], data['quantity'], data['price_each']))
+
+            booked = {}
+            all_or_nothing = mode == BatchTransactionSerializer.ATOMIC
+            if orders and not (rejected and all_or_nothing):
+                if self.idempotency is not None:
+                    self.idempotency.render = lambda result: self.summarize(
+                        mode, len(trades), result[0], self.merge_refused(rejected, result[1]), request.user
+                    )
+                booked, refused = execute_batch(
+                    request.user, orders, all_or_nothing=all_or_nothing, idempotency=self.idempotency
+                )
+                rejected = self.merge_refused(rejected, refused)
+
+            status_code, data = self.summarize(mode, len(trades), booked, rejected, request.user)
+            return Response(data, status=status_code)
+
+        except KeyConflict:
+            raise
+
+        except ValidationError as e:
+            return Response(
+                {'errors': e.detail},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        except DatabaseError as db_err:
+            logger.error(f"Database error while booking trade batch for user {request.user.id}: {db_err}")
+            return Response(
+                {'error': 'A database error occurred while booking the trades.'},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+
+        except Exception as e:
+            logger.exception(f"Unexpected error while booking trade batch for user {request.user.id}")
+            return Response(
+                {'error': 'An unexpected error occurred. Please try again later.'},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+
+
+    @staticmethod
+    def merge_refused(rejected, refused):
+        return {**rejected, **{index: {'non_field_errors': [reason]} for index, reason in refused.items()}}
+
+    @staticmethod
+    def summarize(mode, count, booked, rejected, user):
+        """
+        Returns:
+            tuple: (status_code, data) of the batch response.
+        """
+        results = []
+        for index in range(count):
+            if index in booked:
+                results.append({
+                    'index': index,
+                    'status': 'booked',
+                    'transaction': TransactionListSerializer(booked[index]).data,
+                })
+            elif index in rejected:
+                results.append({'index': index, 'status': 'rejected', 'errors': rejected[index]})
+            else:
+                results.append({'index': index, 'status': 'skipped'})
+
+        data = {
+            'mode': mode,
+            'booked': len(booked),
+            'rejected': len(rejected),
+            'user_balance': float(user.current_balance),
+            'results': results,
+        }
+        return (status.HTTP_201_CREATED if booked else status.HTTP_400_BAD_REQUEST), data
+
+
+class QueryTransactionListView(FastListMixin, generics.ListAPIView):
     """
     GET /api/transactions/filter/
 
@@ -303,76 +553,26 @@ class QueryTransactionListView(generics.ListAPIView):
     - date_before:  Filter transactions up to this date (YYYY-MM-DD)
     - min_price:    Filter transactions where price_each >= min_price
     - max_price:    Filter transactions where price_each <= max_price
+    - cursor:       Opaque token from the previous page's `next` link
+    - page_size:    Number of results per page
 
     The results are automatically scoped to the authenticated user and ordered
-    by timestamp in descending order (most recent first).
+    by timestamp in descending order (most recent first), one page at a time.
     """
 
     renderer_classes = [UserRenderer]
     permission_classes = [IsAuthenticated]
     serializer_class = TransactionListSerializer
+    pagination_class = TransactionCursorPagination
 
     def get_queryset(self):
         user = self.request.user
-        queryset = Transaction.objects.filter(user=user)
+        queryset = Transaction.objects.filter(user_id=user.id).select_related('stock')
         query_params = self.request.query_params
 
         try:
-            # Filter by stock symbol
-            stock = query_params.get('stock')
-            if stock:
-                queryset = queryset.filter(stock__symbol__iexact=stock)
-
-            # Filter by transaction type
-            transaction_type = query_params.get('transaction_type')
-            if transaction_type:
-                if transaction_type.upper() not in ['BUY', 'SELL']:
-                    raise ValueError("transaction_type must be 'BUY' or 'SELL'.")
-                queryset = queryset.filter(transaction_type__iexact=transaction_type)
-
-            # Filter by date range
-            date_after = query_params.get('date_after')
-            date_before = query_params.get('date_before')
-
-            # Validate and parse dates
-            date_format = "%Y-%m-%d"
-            if date_after:
-                try:
-                    date_after_parsed = datetime.strptime(date_after, date_format).date()
-                except ValueError:
-                    raise ValueError(f"Invalid date_after format. Expected YYYY-MM-DD.")
-
-            if date_before:
-                try:
-                    date_before_parsed = datetime.strptime(date_before, date_format).date()
-                except ValueError:
-                    raise ValueError(f"Invalid date_before format. Expected YYYY-MM-DD.")
-
-            if date_after and date_before:
-                queryset = queryset.filter(timestamp__date__range=[date_after_parsed, date_before_parsed])
-            elif date_after:
-                queryset = queryset.filter(timestamp__date__gte=date_after_parsed)
-            elif date_before:
-                queryset = queryset.filter(timestamp__date__lte=date_before_parsed)
-
-            # Filter by price range
-            min_price = query_params.get('min_price')
-            if min_price is not None:
-                try:
-                    min_price_val = float(min_price)
-                    queryset = queryset.filter(price_each__gte=min_price_val)
-                except ValueError:
-                    raise ValueError("min_price must be a number.")
-
-            max_price = query_params.get('max_price')
-            if max_price is not None:
-                try:
-                    max_price_val = float(max_price)
-                    queryset = queryset.filter(price_each__lte=max_price_val)
-                except ValueError:
-                    raise ValueError("max_price must be a number.")
-
-            return queryset.order_by('-timestamp')
+            queryset = filter_transactions(queryset, query_params)
+            return queryset.order_by('-timestamp', '-id')
 
         except ValueError as ve:
            
@@ -392,6 +592,8 @@ class QueryTransactionListView(generics.ListAPIView):
                 {"error": str(ve)},
                 status=status.HTTP_400_BAD_REQUEST
             )
+        except APIException:
+            raise
         except Exception as exc:
             logger.exception(f"Unexpected error listing transactions for user {request.user.id}: {exc}")
             return Response(
@@ -399,3 +601,96 @@ class QueryTransactionListView(generics.ListAPIView):
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
 
+
+
+
+class TransactionExportView(APIView):
+    """
+    GET /api/user/export/?export_format=csv|ndjson&<filters>
+
+    Streams the authenticated user's full transaction history as CSV
+    (default) or NDJSON, newest first. Accepts the same filters as
+    query-transactions (stock, transaction_type, date_after, date_before,
+    min_price, max_price). Rows are read through a server-side cursor and
+    written out in chunks, so memory stays flat regardless of history size.
+    Under ASGI each chunk is fetched off the event loop (see
+    account.handlers.ASGIHandler).
+    """
+    renderer_classes = [UserRenderer]
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, format=None):
+        try:
+            export_format = request.query_params.get('export_format', 'csv').lower()
+            if export_format not in EXPORT_FORMATS:
+                raise ValueError(f"export_format must be one of: {', '.join(EXPORT_FORMATS)}.")
+            generate, content_type = EXPORT_FORMATS[export_format]
+
+            queryset = filter_transactions(Transaction.objects.filter(user_id=request.user.id), request.query_params)
+            rows = export_rows(queryset.order_by('-timestamp', '-id'))
+
+            if isinstance(request._request, ASGIRequest):
+                # Under ASGI the body is sent from the event loop, where the
+                # cursor can't be used; fetch each block in the sync thread.
+                response = AsyncStreamingHttpResponse(aiter_blocks(generate(rows)), content_type=content_type)
+            else:
+                response = StreamingHttpResponse(generate(rows), content_type=content_type)
+            response['Content-Disposition'] = f'attachment; filename="transactions.{export_format}"'
+            return response
+
+        except ValueError as ve:
+            return Response(
+                {"error": str(ve)},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        except Exception as exc:
+            logger.exception(f"Unexpected error exporting transactions for user {request.user.id}: {exc}")
+            return Response(
+                {"error": "An unexpected error occurred while exporting transactions."},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+
+
+class ProfilerView(APIView):
+    """
+    GET  /api/user/profiler/                    → profiler status
+    GET  /api/user/profiler/?output=collapsed   → aggregated stacks, collapsed-stack text
+    POST /api/user/profiler/                    → enable / disable sampling
+
+    Admin only. The collapsed output feeds flamegraph.pl or speedscope.
+    The switch applies to every worker (within PROFILER_IDLE_SYNC_INTERVAL) and
+    the output merges the stacks published by all of them.
+
+    Request body (POST):
+    - enabled:      true to start sampling, false to stop
+    - path:         only requests whose path starts with this (optional)
+    - method:       only requests with this HTTP method (optional)
+    - fraction:     share of matching requests to sample, 0-1 (default 1)
+    - interval_ms:  sampling interval (default 5)
+    - reset:        discard the stacks collected so far (default false)
+    """
+    renderer_classes = [UserRenderer]
+    permission_classes = [IsAuthenticated, IsAdminUserCustom]
+
+    def get(self, request, format=None):
+        if request.query_params.get('output') == 'collapsed':
+            return HttpResponse(profiler.collapsed(), content_type='text/plain; charset=utf-8')
+        return Response(profiler.status(), status=status.HTTP_200_OK)
+
+    def post(self, request, format=None):
+        serializer = ProfilerToggleSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        options = serializer.validated_data
+
+        profiler.configure(
+            options['enabled'],
+            reset=options['reset'],
+            path=options['path'],
+            method=options['method'],
+            fraction=options['fraction'],
+            interval=options['interval_ms'] / 1000,
+        )
+
+        logger.info("Profiler %s by user %s: %s", 'enabled' if options['enabled'] else 'disabled', request.user.id, options)
+        return Response(profiler.status(), status=status.HTTP_200_OK)
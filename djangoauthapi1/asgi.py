@@ -2,6 +2,10 @@
 ASGI config for djangoauthapi1 project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+The live price stream is served by a plain ASGI app (account.streaming) in
+front of Django, since Django 4.0 cannot stream from async code. Django
+itself runs under account.handlers.ASGIHandler, which can send
+AsyncStreamingHttpResponse bodies (the transaction export).
 
 For more information on this file, see
 https://docs.djangoproject.com/en/4.0/howto/deployment/asgi/
@@ -9,8 +13,19 @@ https://docs.djangoproject.com/en/4.0/howto/deployment/asgi/
 
 import os
 
-from django.core.asgi import get_asgi_application
+import django
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'djangoauthapi1.settings')
 
-application = get_asgi_application()
+django.setup(set_prefix=False)
+
+from account.handlers import ASGIHandler  # noqa: E402  (needs apps loaded)
+from account.streaming import STREAM_PATH, price_stream  # noqa: E402
+
+django_application = ASGIHandler()
+
+
+async def application(scope, receive, send):
+    if scope['type'] == 'http' and scope['path'] == STREAM_PATH:
+        return await price_stream(scope, receive, send)
+    return await django_application(scope, receive, send)
@@ -46,6 +46,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'account.middleware.MetricsMiddleware',
+    'account.middleware.ProfilingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
@@ -86,13 +88,35 @@ DATABASES = {
         "PASSWORD": os.environ.get("SQL_PASSWORD"),
         "HOST": os.environ.get("HOST"),
         "PORT": os.environ.get("PORT"),
+        # Seconds to keep a connection open across requests; 0 closes it after
+        # every request.
+        "CONN_MAX_AGE": int(os.environ.get("DB_CONN_MAX_AGE", 60)),
     }
 }
 
+# Ping reused connections at the start of a request and drop dead ones
+# (Django 4.1's CONN_HEALTH_CHECKS, see account.db). Only connections idle for
+# DB_CONN_HEALTH_CHECK_IDLE seconds are pinged; 0 pings on every request.
+DB_CONN_HEALTH_CHECKS = os.environ.get("DB_CONN_HEALTH_CHECKS", "true").lower() == "true"
+DB_CONN_HEALTH_CHECK_IDLE = float(os.environ.get("DB_CONN_HEALTH_CHECK_IDLE", 10))
+
+# DB_POOL=pgbouncer routes connections through the pgbouncer service
+# (docker compose --profile pooled) in transaction pooling mode, which is
+# safe for any number of workers. Server-side cursors don't survive
+# transaction pooling, so they are disabled; the export then reads in keyset
+# pages instead (see account.export.export_rows).
+DB_POOL = os.environ.get("DB_POOL", "")
+if DB_POOL == "pgbouncer":
+    DATABASES["default"].update({
+        "HOST": os.environ.get("PGBOUNCER_HOST", "pgbouncer"),
+        "PORT": os.environ.get("PGBOUNCER_PORT", "6432"),
+        "DISABLE_SERVER_SIDE_CURSORS": True,
+    })
+
 # JWT Configuration
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'account.authentication.StatelessJWTAuthentication',
     )
 }
 
@@ -116,6 +140,23 @@ AUTH_PASSWORD_VALIDATORS = [
 ]
 
 
+# Password hashing
+# PASSWORD_HASHER picks the hasher for new and re-hashed passwords; the others
+# stay listed so existing hashes still verify and are upgraded on next login.
+# 'argon2' requires the argon2-cffi package.
+_PASSWORD_HASHERS = {
+    'pbkdf2': 'django.contrib.auth.hashers.PBKDF2PasswordHasher',
+    'argon2': 'django.contrib.auth.hashers.Argon2PasswordHasher',
+    'scrypt': 'django.contrib.auth.hashers.ScryptPasswordHasher',
+}
+PASSWORD_HASHER = os.environ.get("PASSWORD_HASHER", "pbkdf2")
+PASSWORD_HASHERS = [_PASSWORD_HASHERS[PASSWORD_HASHER]] + [
+    hasher for name, hasher in _PASSWORD_HASHERS.items() if name != PASSWORD_HASHER
+] + [
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+]
+
+
 # Internationalization
 # https://docs.djangoproject.com/en/4.0/topics/i18n/
 
@@ -160,6 +201,10 @@ SIMPLE_JWT = {
 
 }
 
+# Seconds a user's is_active / is_admin flags are trusted by
+# StatelessJWTAuthentication before they are re-read from the DB.
+AUTH_USER_CACHE_TTL = int(os.environ.get("AUTH_USER_CACHE_TTL", 60))
+
 PASSWORD_RESET_TIMEOUT=900         
 
 ALLOWED_HOSTS = [
@@ -167,4 +212,80 @@ ALLOWED_HOSTS = [
     '127.0.0.1',         
     '0.0.0.0',          
     '[::1]',            
-]
\ No newline at end of file
+]
+# Cursor pagination for transaction listings
+TRANSACTION_PAGE_SIZE = int(os.environ.get("TRANSACTION_PAGE_SIZE", 50))
+TRANSACTION_MAX_PAGE_SIZE = int(os.environ.get("TRANSACTION_MAX_PAGE_SIZE", 500))
+
+# Caching
+# "default" holds per-process data (local memory) unless REDIS_URL is set.
+# "shared" holds state every worker and management command must agree on,
+# such as the stock catalogue version. It uses Redis when REDIS_URL is set
+# and the database cache table otherwise; `start.sh migrate` creates that
+# table.
+if os.environ.get("REDIS_URL"):
+    CACHES = {
+        alias: {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": os.environ["REDIS_URL"],
+            "TIMEOUT": 300,
+        }
+        for alias in ("default", "shared")
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "TIMEOUT": 300,
+            "OPTIONS": {"MAX_ENTRIES": 10000},
+        },
+        "shared": {
+            "BACKEND": "django.core.cache.backends.db.DatabaseCache",
+            "LOCATION": "account_shared_cache",
+            "TIMEOUT": 300,
+            # Holds one version key per user with a cached portfolio.
+            "OPTIONS": {"MAX_ENTRIES": 100000},
+        },
+    }
+
+# Catalogue entries live in STOCK_CACHE_ALIAS; the version that invalidates
+# them lives in STOCK_VERSION_CACHE_ALIAS, which must be shared. Each process
+# re-reads the version at most every STOCK_VERSION_LOCAL_TTL seconds, so a
+# price change can take that long to reach the other workers.
+STOCK_CACHE_ALIAS = "default"
+STOCK_VERSION_CACHE_ALIAS = "shared"
+STOCK_VERSION_LOCAL_TTL = float(os.environ.get("STOCK_VERSION_LOCAL_TTL", 2))
+STOCK_CACHE_TIMEOUT = int(os.environ.get("STOCK_CACHE_TIMEOUT", 300))
+
+# The profiler switch and every worker's stacks live in PROFILER_CACHE_ALIAS,
+# which must be shared. A thread in each worker re-reads the switch every
+# PROFILER_IDLE_SYNC_INTERVAL seconds while profiling is off, so enabling
+# reaches every worker within that time, and every PROFILER_SYNC_INTERVAL
+# seconds while it is on; workers publish their stacks as often.
+PROFILER_CACHE_ALIAS = "shared"
+PROFILER_SYNC_INTERVAL = float(os.environ.get("PROFILER_SYNC_INTERVAL", 2))
+PROFILER_IDLE_SYNC_INTERVAL = float(os.environ.get("PROFILER_IDLE_SYNC_INTERVAL", 30))
+
+# Idempotency-Key on trade submission. Keys and their responses are stored in
+# the database with the trades and kept for IDEMPOTENCY_KEY_TTL seconds;
+# IDEMPOTENCY_CACHE_ALIAS only caches stored responses, so it can be per process.
+IDEMPOTENCY_CACHE_ALIAS = "default"
+IDEMPOTENCY_KEY_TTL = int(os.environ.get("IDEMPOTENCY_KEY_TTL", 86400))
+
+# Live prices (account.streaming). The in-memory broker only reaches clients
+# connected to the worker that ran the ingest; Redis fans out across workers.
+PRICE_STREAM_REDIS_URL = os.environ.get("PRICE_STREAM_REDIS_URL", os.environ.get("REDIS_URL"))
+PRICE_STREAM_BROKER = os.environ.get(
+    "PRICE_STREAM_BROKER",
+    "account.streaming.RedisBroker" if PRICE_STREAM_REDIS_URL else "account.streaming.InMemoryBroker",
+)
+PRICE_STREAM_MAX_SYMBOLS = 50
+PRICE_STREAM_COALESCE_INTERVAL = float(os.environ.get("PRICE_STREAM_COALESCE_INTERVAL", 0.25))
+PRICE_STREAM_SEND_TIMEOUT = 5
+PRICE_STREAM_KEEPALIVE = 15
+
+# /metrics requires "Authorization: Bearer <METRICS_TOKEN>" when set.
+METRICS_TOKEN = os.environ.get("METRICS_TOKEN", "")
+
+# JSON rendering: 'auto' uses orjson when installed, 'stdlib' forces json.dumps.
+JSON_RENDERER_BACKEND = os.environ.get("JSON_RENDERER_BACKEND", "auto")
@@ -1,7 +1,10 @@
 from django.contrib import admin
 from django.urls import path, include
 
+from account.metrics import METRICS_ROUTE, metrics_view
+
 urlpatterns = [
     path('admin/', admin.site.urls),
-    path('api/user/', include('account.urls'))
+    path('api/user/', include('account.urls')),
+    path(METRICS_ROUTE, metrics_view, name='metrics'),
 ]
@@ -0,0 +1,55 @@
+"""
+Gunicorn settings for production launches (see start.sh).
+
+    SERVER_INTERFACE=wsgi  -> threaded workers serving djangoauthapi1.wsgi (default)
+    SERVER_INTERFACE=asgi  -> uvicorn workers serving djangoauthapi1.asgi
+
+The live price stream (SSE) is only served by the ASGI application; run
+with SERVER_INTERFACE=asgi to offer it.
+
+Send SIGHUP to the master for a graceful reload: new workers are started
+before the old ones finish their in-flight requests. With GUNICORN_PRELOAD
+the code is imported by the master, so SIGHUP only restarts workers on the
+old code; deploy new code with a full restart or a USR2 + QUIT upgrade.
+"""
+import multiprocessing
+import os
+
+
+SERVER_INTERFACE = os.environ.get("SERVER_INTERFACE", "wsgi")
+
+wsgi_app = (
+    "djangoauthapi1.asgi:application"
+    if SERVER_INTERFACE == "asgi"
+    else "djangoauthapi1.wsgi:application"
+)
+# Threaded rather than sync workers for WSGI: a sync worker that spends more
+# than `timeout` seconds on one request, such as a long CSV export, is killed
+# by the master. A gthread worker keeps reporting in while its threads serve
+# long requests, so `timeout` only catches a worker that is stuck as a whole.
+worker_class = "uvicorn.workers.UvicornWorker" if SERVER_INTERFACE == "asgi" else "gthread"
+threads = int(os.environ.get("GUNICORN_THREADS", 4))
+
+bind = os.environ.get("BIND", "0.0.0.0:8000")
+
+# (2 x cores) + 1 keeps the CPUs busy while some workers wait on Postgres.
+workers = int(os.environ.get("WEB_CONCURRENCY", multiprocessing.cpu_count() * 2 + 1))
+
+# Opt-in: import Django once in the master so workers share its memory
+# copy-on-write. Database connections are opened lazily per request, never in
+# the master. Off by default so SIGHUP picks up new code.
+preload_app = os.environ.get("GUNICORN_PRELOAD", "false").lower() in ("1", "true", "yes")
+
+# Seconds a worker may go without reporting in before it is restarted; with
+# gthread and uvicorn workers this does not limit the length of a request.
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", 30))
+graceful_timeout = int(os.environ.get("GUNICORN_GRACEFUL_TIMEOUT", 30))
+keepalive = 5
+
+# Recycle workers periodically; the jitter stops them all restarting at once.
+max_requests = int(os.environ.get("GUNICORN_MAX_REQUESTS", 1000))
+max_requests_jitter = max_requests // 10
+
+accesslog = "-"
+errorlog = "-"
+loglevel = os.environ.get("GUNICORN_LOG_LEVEL", "info")
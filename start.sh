@@ -1,6 +1,27 @@
-#!/bin/bash 
+#!/bin/bash
+# Usage: start.sh [serve|migrate|dev]
+#
+#   serve    production server: gunicorn with workers from gunicorn.conf.py (default)
+#   migrate  apply migrations, create the shared cache table and exit; run once
+#            per deploy, not per container
+#   dev      migrate, then the auto-reloading development server
+set -e
 
-python manage.py makemigrations --no-input
-python manage.py migrate --no-input
-
-python manage.py runserver 0.0.0.0:8000
\ No newline at end of file
+case "${1:-serve}" in
+  migrate)
+    python manage.py migrate --no-input
+    python manage.py createcachetable
+    ;;
+  dev)
+    python manage.py migrate --no-input
+    python manage.py createcachetable
+    exec python manage.py runserver 0.0.0.0:8000
+    ;;
+  serve)
+    exec gunicorn --config gunicorn.conf.py
+    ;;
+  *)
+    echo "Unknown mode: $1 (expected serve, migrate or dev)" >&2
+    exit 1
+    ;;
+esac